@@ -0,0 +1,10 @@
+"""
+Analysis helpers for HCIAnalysis.ipynb
+
+    from analysis import load_dataset, non_calibration, mcq_accuracy
+    df = load_dataset('survey_data.csv')
+    mcq_accuracy(non_calibration(df))
+"""
+
+from .dataset import load_dataset, parse_export, file_hash, LIKERT_COLUMNS
+from .stats import AUDIO_TYPES, non_calibration, mcq_accuracy, likert_anova, volume_summary
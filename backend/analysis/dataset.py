@@ -0,0 +1,108 @@
+"""
+Typed loader for the comprehensive export (export_all_data.py)
+Parses the CSV once, explodes the MCQ list columns into one column per question,
+and caches the result as parquet keyed by the export's content hash
+"""
+
+import hashlib
+import os
+import pandas as pd
+
+#----------------------------------------------------------------------#
+
+# bump when the parsing below changes so stale caches are ignored
+LOADER_VERSION = 1
+
+DATETIME_COLUMNS = [
+    'participant_created_at',
+    'response_submitted_at',
+    'video_session_start',
+    'video_session_end',
+    'calibration_submitted_at',
+]
+CATEGORY_COLUMNS = ['audio_type_assigned', 'video_title']
+LIKERT_COLUMNS = [
+    'likert_mental_demand',
+    'likert_tone_difficulty',
+    'likert_confidence_conversation',
+    'likert_nonlexical_preserved',
+]
+
+#----------------------------------------------------------------------#
+
+def file_hash(path):
+    """sha256 of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def explode_list_column(series, prefix):
+    """
+    Split a column of list strings like '[0, 2, None]' into
+    nullable integer columns {prefix}1, {prefix}2, ... without per-row parsing
+    """
+    cleaned = series.fillna('[]').astype(str).str.strip().str.strip('[]')
+    parts = cleaned.str.split(',', expand=True)
+    parts = parts.apply(lambda col: pd.to_numeric(col.str.strip(), errors='coerce')).astype('Int64')
+    parts.columns = [f'{prefix}{i + 1}' for i in range(parts.shape[1])]
+    return parts
+
+def parse_export(df):
+    """Apply dtypes and add exploded MCQ columns to a raw export DataFrame"""
+    df = df.copy()
+
+    for column in DATETIME_COLUMNS:
+        if column in df.columns:
+            df[column] = pd.to_datetime(df[column], errors='coerce')
+    for column in CATEGORY_COLUMNS:
+        if column in df.columns:
+            df[column] = df[column].astype('category')
+    for column in LIKERT_COLUMNS:
+        if column in df.columns:
+            df[column] = pd.to_numeric(df[column], errors='coerce').astype('Int64')
+
+    if df['is_calibration'].dtype != bool:
+        df['is_calibration'] = df['is_calibration'].astype(str).str.lower() == 'true'
+
+    answers = explode_list_column(df['mcq_answers'], 'mcq_answer_q')
+    correct = explode_list_column(df['mcq_correct_answers'], 'mcq_correct_q')
+
+    # NA where the question has no correct answer (tone questions); unanswered counts as wrong
+    is_correct = pd.DataFrame(index=df.index)
+    for i in range(1, correct.shape[1] + 1):
+        answer_column = answers.get(f'mcq_answer_q{i}')
+        correct_column = correct[f'mcq_correct_q{i}']
+        if answer_column is None:
+            answer_column = pd.Series(pd.NA, index=df.index, dtype='Int64')
+        matches = (answer_column == correct_column).fillna(False).astype('boolean')
+        is_correct[f'mcq_is_correct_q{i}'] = matches.mask(correct_column.isna())
+
+    return pd.concat([df, answers, correct, is_correct], axis=1)
+
+def load_dataset(path='survey_data.csv', cache_dir=None, use_cache=True):
+    """
+    Load the export as a typed DataFrame
+    Cached next to the CSV in .analysis_cache/ (or cache_dir) as parquet;
+    any change to the file's contents produces a new cache entry
+    """
+    if cache_dir is None:
+        cache_dir = os.path.join(os.path.dirname(os.path.abspath(path)), '.analysis_cache')
+
+    stem = os.path.splitext(os.path.basename(path))[0]
+    cache_path = os.path.join(cache_dir, f'{stem}-v{LOADER_VERSION}-{file_hash(path)[:16]}.parquet')
+
+    if use_cache and os.path.exists(cache_path):
+        return pd.read_parquet(cache_path)
+
+    df = parse_export(pd.read_csv(path))
+
+    if use_cache:
+        os.makedirs(cache_dir, exist_ok=True)
+        try:
+            df.to_parquet(cache_path, index=False)
+        except ImportError as e:
+            print(f"WARNING: not caching dataset ({e})")
+
+    return df
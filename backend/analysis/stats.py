@@ -0,0 +1,90 @@
+"""
+Vectorized statistics used by HCIAnalysis.ipynb
+All functions take the DataFrame returned by load_dataset
+"""
+
+import numpy as np
+import pandas as pd
+import scipy.stats as stats
+
+#----------------------------------------------------------------------#
+
+AUDIO_TYPES = ['full', 'muffled', 'balanced']
+
+#----------------------------------------------------------------------#
+
+def non_calibration(df):
+    """Rows for regular (non-calibration) snippets"""
+    return df[~df['is_calibration']]
+
+def mcq_accuracy(df, questions=(1, 2), by='audio_type_assigned'):
+    """
+    Per-question and total MCQ accuracy grouped by `by`
+    Only questions with a correct answer count as scorable
+    Returns one row per group with q{n}_correct, q{n}_scorable, q{n}_accuracy
+    and total_correct, total_scorable, total_accuracy (percent)
+    """
+    columns = [f'mcq_is_correct_q{q}' for q in questions]
+    is_correct = df[columns]
+    keys = df[by]
+
+    correct_counts = is_correct.fillna(False).astype(int).groupby(keys, observed=True).sum()
+    scorable_counts = is_correct.notna().astype(int).groupby(keys, observed=True).sum()
+
+    result = pd.DataFrame(index=correct_counts.index)
+    for q, column in zip(questions, columns):
+        result[f'q{q}_correct'] = correct_counts[column]
+        result[f'q{q}_scorable'] = scorable_counts[column]
+        result[f'q{q}_accuracy'] = 100 * correct_counts[column] / scorable_counts[column].replace(0, np.nan)
+
+    result['total_correct'] = correct_counts.sum(axis=1)
+    result['total_scorable'] = scorable_counts.sum(axis=1)
+    result['total_accuracy'] = 100 * result['total_correct'] / result['total_scorable'].replace(0, np.nan)
+    return result
+
+def likert_anova(df, column, groups=AUDIO_TYPES, by='audio_type_assigned', alpha=0.05):
+    """
+    Descriptive stats, one-way ANOVA and (when significant) Tukey's HSD
+    for a numeric column across groups
+    Works for Likert columns and for tone questions, e.g. 'mcq_answer_q3'
+    Returns { describe, f_stat, p_value, tukey }; tests are None when a group is empty
+    """
+    data = df.loc[df[by].isin(groups), [by, column]].dropna()
+    values = data[column].astype(float)
+    labels = data[by].astype(str)
+
+    result = {
+        'column': column,
+        'describe': values.groupby(labels).agg(['mean', 'std', 'count']).reindex(groups),
+        'f_stat': None,
+        'p_value': None,
+        'tukey': None,
+    }
+
+    samples = [values[labels == group].to_numpy() for group in groups]
+    if any(len(sample) == 0 for sample in samples):
+        return result
+
+    f_stat, p_value = stats.f_oneway(*samples)
+    result['f_stat'] = f_stat
+    result['p_value'] = p_value
+
+    if p_value < alpha:
+        from statsmodels.stats.multicomp import pairwise_tukeyhsd
+        result['tukey'] = pairwise_tukeyhsd(values.to_numpy(), labels.to_numpy(), alpha=alpha)
+
+    return result
+
+def volume_summary(df, by=None, column='optimal_volume_percent', dedupe=False):
+    """
+    Descriptive stats for optimal volume, overall or grouped by `by`
+    The export repeats each video's calibration on every snippet row;
+    dedupe=True keeps one value per (participant, video)
+    """
+    if dedupe:
+        df = df.drop_duplicates(subset=['participant_id', 'video_id'])
+
+    aggregations = ['mean', 'std', 'median', 'min', 'max', 'count']
+    if by is None:
+        return df[column].dropna().agg(aggregations)
+    return df.groupby(by, observed=True)[column].agg(aggregations)
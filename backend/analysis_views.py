@@ -0,0 +1,89 @@
+"""
+Precomputed analysis views
+Refreshes the materialized views created by the add_analysis_views migration
+so exports and the admin dashboard can read them instead of re-joining
+responses, assignments, sessions and calibrations on every run
+"""
+
+import argparse
+import sys
+import time
+from sqlalchemy import text
+
+#----------------------------------------------------------------------#
+
+RESPONSE_FACTS_VIEW = 'analysis_response_facts'
+PARTICIPANT_COMPLETION_VIEW = 'analysis_participant_completion'
+
+# refreshed in this order (completion does not depend on facts, but keep it stable)
+ANALYSIS_VIEWS = [RESPONSE_FACTS_VIEW, PARTICIPANT_COMPLETION_VIEW]
+
+# a participant is complete once every one of these videos has a submitted
+# response and a calibration (the completion view hard-codes the same list)
+REQUIRED_VIDEO_IDS = [1, 2, 3, 4, 5]
+
+#----------------------------------------------------------------------#
+
+def refresh_analysis_views(session, concurrently=True):
+    """
+    Refresh every analysis view
+    Concurrent refresh keeps the views readable while they rebuild
+    Returns {view_name: seconds_taken}
+    """
+    keyword = 'CONCURRENTLY ' if concurrently else ''
+    timings = {}
+
+    for view in ANALYSIS_VIEWS:
+        start = time.perf_counter()
+        session.execute(text(f'REFRESH MATERIALIZED VIEW {keyword}{view}'))
+        session.commit()
+        timings[view] = round(time.perf_counter() - start, 3)
+
+    return timings
+
+def views_freshness(session):
+    """
+    (refreshed_at, responses submitted since) for the analysis views
+    refreshed_at is None when the view is empty
+    """
+    row = session.execute(text(
+        f"SELECT c.refreshed_at, "
+        f"(SELECT COUNT(*) FROM snippet_responses WHERE submitted_at > c.refreshed_at) AS newer_responses "
+        f"FROM {PARTICIPANT_COMPLETION_VIEW} c LIMIT 1"
+    )).first()
+    if row is None:
+        return None, 0
+    return row.refreshed_at, row.newer_responses
+
+def fetch_participant_completion(session, complete_only=False):
+    """Read per-participant completion state from the precomputed view"""
+    query = f"SELECT * FROM {PARTICIPANT_COMPLETION_VIEW}"
+    if complete_only:
+        query += " WHERE is_complete"
+    query += " ORDER BY participant_id"
+    return session.execute(text(query)).fetchall()
+
+#----------------------------------------------------------------------#
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Refresh the precomputed analysis views',
+    )
+    parser.add_argument('--blocking', action='store_true',
+                       help='Use a plain (locking) refresh instead of CONCURRENTLY')
+    args = parser.parse_args()
+
+    from app import create_app
+    from models import db
+
+    app = create_app()
+    with app.app_context():
+        try:
+            timings = refresh_analysis_views(db.session, concurrently=not args.blocking)
+        except Exception as e:
+            db.session.rollback()
+            print(f"\n✗ Error refreshing analysis views: {e}")
+            sys.exit(1)
+
+        for view, seconds in timings.items():
+            print(f"  > Refreshed {view} in {seconds:.3f}s")
@@ -1,4 +1,5 @@
 import os
+import mimetypes
 from flask import Flask, send_from_directory, jsonify, request
 from flask_cors import CORS
 from flask_migrate import Migrate
@@ -6,10 +7,16 @@ from flask_jwt_extended import JWTManager, get_jwt_identity, jwt_required
 from config import config
 from models import db
 from routes import register_routes
+from metrics import init_metrics
 import base64
 
 #---------------------------------------------------------------------#
 
+# packaged HLS/DASH output served from /videos when testing locally
+mimetypes.add_type('application/vnd.apple.mpegurl', '.m3u8')
+mimetypes.add_type('application/dash+xml', '.mpd')
+mimetypes.add_type('video/iso.segment', '.m4s')
+
 migrate = Migrate()
 jwt = JWTManager()
 
@@ -35,6 +42,9 @@ def create_app(config_name=None):
     # register API blueprints
     register_routes(app)
 
+    # per-request latency / SQL timing
+    init_metrics(app)
+
     # upload audio recording
     @app.route('/api/upload-recording', methods=['POST'])
     @jwt_required()
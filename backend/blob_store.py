@@ -0,0 +1,174 @@
+"""
+Recording blob store
+Content-addressed storage for participant recordings kept outside the
+database: a recording's key is derived from the sha256 of its bytes, so
+writing the same recording twice stores it once and a key never changes
+meaning. Backed by a local directory, or an S3-compatible bucket when
+RECORDINGS_BUCKET is set
+"""
+
+import hashlib
+import os
+import tempfile
+from sqlalchemy import text
+
+try:
+    import boto3
+except ImportError:
+    boto3 = None
+
+#----------------------------------------------------------------------#
+
+MIME_EXTENSIONS = {
+    'audio/webm': 'webm',
+    'audio/ogg': 'ogg',
+    'audio/mpeg': 'mp3',
+    'audio/mp3': 'mp3',
+    'audio/wav': 'wav',
+    'audio/mp4': 'm4a',
+    'audio/x-m4a': 'm4a',
+}
+
+# first key of pg_advisory_xact_lock(namespace, hashtext(blob key)), held while a
+# blob key is pointed at or deleted (the two-key space is separate from SEED_LOCK_KEY's)
+BLOB_LOCK_NAMESPACE = 7302
+
+#----------------------------------------------------------------------#
+
+def blob_key(data, mime_type=None):
+    """recordings/ab/<sha256>.<ext> for a recording's bytes"""
+    digest = hashlib.sha256(data).hexdigest()
+    extension = MIME_EXTENSIONS.get((mime_type or '').split(';')[0], 'bin')
+    return f"recordings/{digest[:2]}/{digest}.{extension}"
+
+class LocalBlobStore:
+    """Blobs as files under root; writes are atomic and fsynced before put() returns"""
+
+    def __init__(self, root):
+        self.root = root
+
+    def describe(self):
+        return os.path.abspath(self.root)
+
+    def _path(self, key):
+        return os.path.join(self.root, *key.split('/'))
+
+    def put(self, data, mime_type=None):
+        key = blob_key(data, mime_type)
+        path = self._path(key)
+        if os.path.exists(path) and os.path.getsize(path) == len(data):
+            return key
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        return key
+
+    def open(self, key):
+        return open(self._path(key), 'rb')
+
+    def read(self, key):
+        with self.open(key) as f:
+            return f.read()
+
+    def size(self, key):
+        return os.path.getsize(self._path(key))
+
+    def exists(self, key):
+        return os.path.isfile(self._path(key))
+
+    def delete(self, key):
+        path = self._path(key)
+        if os.path.exists(path):
+            os.remove(path)
+
+class S3BlobStore:
+    """Blobs as objects in an S3-compatible bucket (R2, or MinIO locally)"""
+
+    def __init__(self, bucket, endpoint_url=None):
+        if boto3 is None:
+            raise RuntimeError('boto3 is required for RECORDINGS_BUCKET (pip install boto3)')
+        self.bucket = bucket
+        self.client = boto3.client('s3', endpoint_url=endpoint_url)
+
+    def describe(self):
+        return f"s3://{self.bucket}"
+
+    def put(self, data, mime_type=None):
+        key = blob_key(data, mime_type)
+        try:
+            if self.client.head_object(Bucket=self.bucket, Key=key)['ContentLength'] == len(data):
+                return key
+        except self.client.exceptions.ClientError:
+            pass
+        self.client.put_object(Bucket=self.bucket, Key=key, Body=data,
+                               ContentType=mime_type or 'application/octet-stream')
+        return key
+
+    def open(self, key):
+        return self.client.get_object(Bucket=self.bucket, Key=key)['Body']
+
+    def read(self, key):
+        return self.open(key).read()
+
+    def size(self, key):
+        return self.client.head_object(Bucket=self.bucket, Key=key)['ContentLength']
+
+    def exists(self, key):
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=key)
+            return True
+        except self.client.exceptions.ClientError as e:
+            if e.response.get('Error', {}).get('Code') in ('404', 'NoSuchKey', 'NotFound'):
+                return False
+            raise
+
+    def delete(self, key):
+        self.client.delete_object(Bucket=self.bucket, Key=key)
+
+def lock_blob_key(session, key):
+    """
+    Take the lock for one blob key for the rest of the session's transaction
+    put() hands back an existing blob without rewriting it, so pointing a row
+    at a key and deleting that key's blob must not interleave
+    """
+    session.execute(text("SELECT pg_advisory_xact_lock(:namespace, hashtext(:key))"),
+                    {'namespace': BLOB_LOCK_NAMESPACE, 'key': key})
+
+def delete_unreferenced(session, store, keys):
+    """
+    Delete the blobs for keys that no snippet_responses row points at any more
+    Keys are shared between identical recordings, so each is checked first,
+    under the key's lock, which is held until the blob is gone
+    Returns the keys that were deleted
+    """
+    deleted = []
+    for key in keys:
+        try:
+            lock_blob_key(session, key)
+            referenced = session.execute(text(
+                "SELECT 1 FROM snippet_responses WHERE audio_blob_key = :key LIMIT 1"
+            ), {'key': key}).first()
+            if not referenced:
+                store.delete(key)
+                deleted.append(key)
+            session.commit()
+        except BaseException:
+            session.rollback()
+            raise
+    return deleted
+
+def blob_store_from_config(config):
+    """Store configured by RECORDINGS_BUCKET (+ RECORDINGS_S3_ENDPOINT) or RECORDINGS_BLOB_DIR"""
+    if config.get('RECORDINGS_BUCKET'):
+        return S3BlobStore(config['RECORDINGS_BUCKET'], config.get('RECORDINGS_S3_ENDPOINT'))
+    return LocalBlobStore(config['RECORDINGS_BLOB_DIR'])
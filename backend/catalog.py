@@ -0,0 +1,325 @@
+"""
+Study catalogue
+Videos and snippets are declared in a JSON (or YAML) manifest. Seeding diffs it
+against the database and applies only the differences as bulk upserts in one
+transaction, recording a new catalogue version whenever anything changed so
+API and answer-key caches invalidate. Snippet media can be named by stem and
+filled in from the translation pipeline's manifests (measured cut durations,
+HLS/DASH URLs)
+"""
+
+import hashlib
+import json
+import os
+from datetime import datetime
+from sqlalchemy import text, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from models import Video, Snippet, SnippetResponse, ParticipantAudioAssignment, \
+    VolumeCalibration, VideoSession, CatalogVersion
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+#----------------------------------------------------------------------#
+
+AUDIO_TYPES = ['full', 'muffled', 'balanced']
+
+VIDEO_FIELDS = ['title', 'description', 'total_snippets', 'google_form_url']
+SNIPPET_FIELDS = [
+    'video_filename_full', 'video_filename_muffled', 'video_filename_balanced',
+    'video_track_filename', 'audio_track_full', 'audio_track_muffled', 'audio_track_balanced',
+    'poster_filename', 'stream_manifests', 'duration',
+    'transcript_original', 'transcript_translated', 'mcq_questions', 'is_calibration',
+]
+
+# serializes concurrent seeders (arbitrary constant key for pg_advisory_xact_lock)
+SEED_LOCK_KEY = 7301
+
+# a change to these snippet fields invalidates existing responses' scores
+SCORING_FIELDS = ['mcq_questions']
+
+DEFAULT_CATALOG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'seed_catalog.json')
+
+#----------------------------------------------------------------------#
+
+def load_catalog(path):
+    """Parse the catalogue file; returns (catalog, sha256 of its contents)"""
+    with open(path, 'rb') as f:
+        raw = f.read()
+
+    if path.lower().endswith(('.yaml', '.yml')):
+        if yaml is None:
+            raise RuntimeError('PyYAML is required for YAML catalogues (pip install pyyaml)')
+        catalog = yaml.safe_load(raw)
+    else:
+        catalog = json.loads(raw)
+
+    if not isinstance(catalog, dict) or not isinstance(catalog.get('videos'), list):
+        raise ValueError(f"{path}: expected an object with a 'videos' list")
+    return catalog, hashlib.sha256(raw).hexdigest()
+
+def load_pipeline_manifests(catalog, catalog_path, cut_manifest=None, packaging_manifest=None):
+    """
+    Cut durations and stream URLs from translations/ manifests
+    Paths come from the arguments or the catalogue's 'pipeline' section (relative
+    to the catalogue file); missing manifests just leave those fields to the catalogue
+    Returns (cuts {stem: entry}, streams {variant filename: {'hls', 'dash'}})
+    """
+    pipeline = catalog.get('pipeline') or {}
+    base_dir = os.path.dirname(os.path.abspath(catalog_path))
+
+    def read(path):
+        if not path:
+            return {}
+        path = os.path.join(base_dir, path)
+        if not os.path.exists(path):
+            print(f"    WARNING: pipeline manifest {path} not found, skipping")
+            return {}
+        with open(path, 'r') as f:
+            return json.load(f)
+
+    cuts = read(cut_manifest or pipeline.get('cut_manifest')).get('snippets', {})
+    streams = read(packaging_manifest or pipeline.get('packaging_manifest'))
+    return cuts, streams
+
+#----------------------------------------------------------------------#
+
+def media_url(base_url, filename):
+    """Prefix a bare filename with the media base URL (absolute URLs pass through)"""
+    if not filename:
+        return None
+    if filename.startswith(('http://', 'https://')) or not base_url:
+        return filename
+    return f"{base_url.rstrip('/')}/{filename}"
+
+def resolve_snippet(snippet, base_url, cuts, streams):
+    """
+    Column values for one catalogue snippet
+    'media' names the pipeline stem ({media}_{audio_type}.mp4 etc.); 'files'
+    overrides individual audio types; 'tracks' and 'poster' opt in to the
+    tracks-mode files and poster frame. A measured duration from the cut
+    manifest wins over the catalogue's 'duration'
+    """
+    media = snippet.get('media')
+    files = {t: f"{media}_{t}.mp4" for t in AUDIO_TYPES} if media else {}
+    files.update(snippet.get('files') or {})
+
+    row = {f'video_filename_{t}': media_url(base_url, files.get(t)) for t in AUDIO_TYPES}
+
+    tracks = media and snippet.get('tracks')
+    row['video_track_filename'] = media_url(base_url, f"{media}_video.mp4") if tracks else None
+    for t in AUDIO_TYPES:
+        row[f'audio_track_{t}'] = media_url(base_url, f"{media}_{t}.m4a") if tracks else None
+
+    poster = snippet.get('poster')
+    if poster is True:
+        poster = f"{media}_poster.jpg" if media else None
+    row['poster_filename'] = media_url(base_url, poster or None)
+
+    manifests = {
+        t: {kind: media_url(base_url, url) for kind, url in streams[files[t]].items()}
+        for t in AUDIO_TYPES if files.get(t) in streams
+    }
+    row['stream_manifests'] = manifests or None
+
+    cut = cuts.get(snippet.get('cut', media)) or {}
+    duration = cut.get('duration', snippet.get('duration'))
+    row['duration'] = float(duration) if duration is not None else None
+
+    row['transcript_original'] = snippet.get('transcript_original')
+    row['transcript_translated'] = snippet.get('transcript_translated')
+    row['mcq_questions'] = snippet.get('mcq_questions') or []
+    row['is_calibration'] = bool(snippet.get('is_calibration', False))
+    return row
+
+def desired_rows(catalog, base_url, cuts=None, streams=None):
+    """
+    The catalogue as rows
+    Returns (videos {video_id: row}, snippets {(video_id, snippet_index): row})
+    """
+    videos, snippets = {}, {}
+    for video in catalog['videos']:
+        video_id = video['video_id']
+        if video_id in videos:
+            raise ValueError(f"video_id {video_id} appears twice in the catalogue")
+
+        video_snippets = video.get('snippets') or []
+        videos[video_id] = {
+            'title': video['title'],
+            'description': video.get('description'),
+            'total_snippets': video.get('total_snippets', len(video_snippets)),
+            'google_form_url': video.get('google_form_url'),
+        }
+        for snippet in video_snippets:
+            key = (video_id, snippet['snippet_index'])
+            if key in snippets:
+                raise ValueError(f"video {video_id} has snippet_index {key[1]} twice")
+            snippets[key] = resolve_snippet(snippet, base_url, cuts or {}, streams or {})
+
+    return videos, snippets
+
+#----------------------------------------------------------------------#
+
+def _same(a, b):
+    if isinstance(a, float) or isinstance(b, float):
+        return a is not None and b is not None and round(a, 3) == round(b, 3)
+    return a == b
+
+def _changed_fields(current, desired, fields):
+    return [f for f in fields if not _same(current.get(f), desired.get(f))]
+
+def lock_catalog(session):
+    """
+    Take the seed lock for the rest of the session's transaction
+    Held from the diff through apply_catalog's commit, so a concurrent seeder
+    waits and then diffs against the rows this one wrote
+    """
+    session.execute(text("SELECT pg_advisory_xact_lock(:key)"), {'key': SEED_LOCK_KEY})
+
+def diff_catalog(session, videos, snippets):
+    """
+    Compare desired rows with the database
+    Takes the seed lock first: apply the diff in the same transaction, or roll back
+    Returns {'videos': {...}, 'snippets': {...}} with insert/update/delete key lists,
+    and for updates the changed field names
+    """
+    lock_catalog(session)
+    current_videos = {
+        v.video_id: {f: getattr(v, f) for f in VIDEO_FIELDS}
+        for v in session.query(Video)
+    }
+    current_snippets = {
+        (video_id, s.snippet_index): {f: getattr(s, f) for f in SNIPPET_FIELDS}
+        for s, video_id in session.query(Snippet, Video.video_id).join(Video, Snippet.video_id == Video.id)
+    }
+
+    def compare(current, desired, fields):
+        result = {'insert': [], 'update': {}, 'delete': [], 'unchanged': 0}
+        for key, row in desired.items():
+            if key not in current:
+                result['insert'].append(key)
+            else:
+                changed = _changed_fields(current[key], row, fields)
+                if changed:
+                    result['update'][key] = changed
+                else:
+                    result['unchanged'] += 1
+        result['delete'] = sorted(key for key in current if key not in desired)
+        return result
+
+    return {
+        'videos': compare(current_videos, videos, VIDEO_FIELDS),
+        'snippets': compare(current_snippets, snippets, SNIPPET_FIELDS),
+    }
+
+def diff_is_empty(diff, prune=False):
+    return not any(
+        part['insert'] or part['update'] or (prune and part['delete'])
+        for part in diff.values()
+    )
+
+def rescore_keys(diff):
+    """Keys of updated snippets whose answer keys changed (their responses need rescoring)"""
+    return [
+        key for key, fields in diff['snippets']['update'].items()
+        if any(field in SCORING_FIELDS for field in fields)
+    ]
+
+def snippet_ids_for(session, keys):
+    """Database ids of the snippets at (video_id, snippet_index) keys"""
+    if not keys:
+        return []
+    return [
+        snippet_id for snippet_id, in session.query(Snippet.id).join(Video, Snippet.video_id == Video.id)
+        .filter(tuple_(Video.video_id, Snippet.snippet_index).in_(keys))
+    ]
+
+def summarize(diff):
+    return {
+        table: {
+            'inserted': len(part['insert']),
+            'updated': len(part['update']),
+            'unchanged': part['unchanged'],
+            'not_in_catalogue': len(part['delete']),
+        }
+        for table, part in diff.items()
+    }
+
+#----------------------------------------------------------------------#
+
+def _prune(session, diff, video_pks):
+    """Delete rows missing from the catalogue; refuses if participant data references them"""
+    snippet_keys = diff['snippets']['delete']
+    video_keys = diff['videos']['delete']
+
+    snippet_ids = snippet_ids_for(session, snippet_keys)
+    video_ids = [video_pks[key] for key in video_keys]
+
+    referenced = []
+    if snippet_ids:
+        for model in (SnippetResponse, ParticipantAudioAssignment):
+            if session.query(model.id).filter(model.snippet_id.in_(snippet_ids)).first():
+                referenced.append(model.__tablename__)
+    if video_ids:
+        for model in (VolumeCalibration, VideoSession):
+            if session.query(model.id).filter(model.video_id.in_(video_ids)).first():
+                referenced.append(model.__tablename__)
+        if session.query(Snippet.id).filter(Snippet.video_id.in_(video_ids)) \
+                .filter(Snippet.id.notin_(snippet_ids)).first():
+            referenced.append('snippets')
+    if referenced:
+        raise ValueError(f"cannot prune: rows missing from the catalogue are referenced by {', '.join(referenced)}")
+
+    if snippet_ids:
+        session.query(Snippet).filter(Snippet.id.in_(snippet_ids)).delete(synchronize_session=False)
+    if video_ids:
+        session.query(Video).filter(Video.id.in_(video_ids)).delete(synchronize_session=False)
+
+def apply_catalog(session, videos, snippets, diff, manifest_hash, prune=False):
+    """
+    Apply a diff in one transaction: upsert changed videos, then changed snippets,
+    optionally prune, and record a new catalogue version
+    Must run in the transaction diff_catalog opened (which holds the seed lock)
+    Returns the catalogue version (unchanged when there was nothing to do)
+    """
+    if diff_is_empty(diff, prune):
+        return CatalogVersion.current()
+
+    # no-op when diff_catalog already took it in this transaction
+    lock_catalog(session)
+    now = datetime.utcnow()
+
+    changed_videos = diff['videos']['insert'] + list(diff['videos']['update'])
+    if changed_videos:
+        table = Video.__table__
+        stmt = insert(table).values([
+            {'video_id': video_id, 'created_at': now, **videos[video_id]} for video_id in changed_videos
+        ])
+        session.execute(stmt.on_conflict_do_update(
+            index_elements=['video_id'],
+            set_={field: stmt.excluded[field] for field in VIDEO_FIELDS},
+        ))
+
+    video_pks = {video_id: pk for pk, video_id in session.query(Video.id, Video.video_id)}
+
+    changed_snippets = diff['snippets']['insert'] + list(diff['snippets']['update'])
+    if changed_snippets:
+        table = Snippet.__table__
+        stmt = insert(table).values([
+            {'video_id': video_pks[video_id], 'snippet_index': snippet_index, **snippets[(video_id, snippet_index)]}
+            for video_id, snippet_index in changed_snippets
+        ])
+        session.execute(stmt.on_conflict_do_update(
+            constraint='unique_video_snippet',
+            set_={field: stmt.excluded[field] for field in SNIPPET_FIELDS},
+        ))
+
+    if prune:
+        _prune(session, diff, video_pks)
+
+    version = CatalogVersion(manifest_hash=manifest_hash, summary=summarize(diff), created_at=now)
+    session.add(version)
+    session.commit()
+    return version.id
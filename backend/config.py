@@ -11,6 +11,14 @@ class Config:
     JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', 'jwt-secret-key')
     ADMIN_PASSWORD = os.getenv('ADMIN_PASSWORD', 'admin')
     API_CLIENT_SECRET = os.getenv('API_CLIENT_SECRET')
+    # keys the participant ID permutation; changing it reshuffles future IDs
+    PARTICIPANT_ID_KEY = os.getenv('PARTICIPANT_ID_KEY', SECRET_KEY)
+    # static bearer token for Prometheus scrapes of /api/admin/metrics (admin JWT also works)
+    METRICS_TOKEN = os.getenv('METRICS_TOKEN')
+    # recordings moved out of snippet_responses (recordings_backfill.py); bucket wins if set
+    RECORDINGS_BLOB_DIR = os.getenv('RECORDINGS_BLOB_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'recordings'))
+    RECORDINGS_BUCKET = os.getenv('RECORDINGS_BUCKET')
+    RECORDINGS_S3_ENDPOINT = os.getenv('RECORDINGS_S3_ENDPOINT')
     
     if not API_CLIENT_SECRET or len(API_CLIENT_SECRET) < 32:
         raise ValueError("API_CLIENT_SECRET must be set and at least 32 characters long")
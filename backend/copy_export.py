@@ -0,0 +1,437 @@
+"""
+COPY-based export engine
+Streams COPY (SELECT ...) TO STDOUT WITH CSV straight to disk through psycopg2,
+one shard per video on a process pool. Every worker imports the coordinator's
+snapshot (pg_export_snapshot / SET TRANSACTION SNAPSHOT) so all shards see the
+same consistent, read-only view of the database
+READ-ONLY OPERATION
+"""
+
+import json
+import os
+import shutil
+import time
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+import psycopg2
+from analysis_views import REQUIRED_VIDEO_IDS
+
+#----------------------------------------------------------------------#
+
+EXPORT_COLUMNS = [
+    'participant_id', 'participant_created_at',
+    'video_id', 'video_title',
+    'snippet_id', 'snippet_number', 'is_calibration',
+    'audio_type_assigned',
+    'mcq_answers', 'mcq_correct_answers', 'response_audio_duration',
+    'likert_mental_demand', 'likert_tone_difficulty',
+    'likert_confidence_conversation', 'likert_nonlexical_preserved',
+    'response_submitted_at',
+    'video_session_start', 'video_session_end',
+    'video_session_duration_seconds', 'video_session_duration_minutes',
+    'optimal_volume', 'optimal_volume_percent', 'calibration_submitted_at',
+]
+
+# snippet answer key rendered like Python's str(list), e.g. [0, 2, None, None, None]
+CORRECT_ANSWERS_SQL = """'[' || array_to_string(ARRAY(
+            SELECT CASE
+                WHEN NOT (q.value::jsonb ? 'correct_answer') THEN '-1'
+                ELSE COALESCE(q.value->>'correct_answer', 'None')
+            END
+            FROM json_array_elements(COALESCE(s.mcq_questions, '[]'::json)) WITH ORDINALITY AS q(value, n)
+            ORDER BY q.n
+        ), ', ') || ']'"""
+
+# response answers rendered like Python's str(list), '[]' when missing or empty
+MCQ_ANSWERS_SQL = """CASE
+            WHEN sr.mcq_answers IS NULL OR json_typeof(sr.mcq_answers) <> 'array' THEN '[]'
+            WHEN json_array_length(sr.mcq_answers) = 0 THEN '[]'
+            ELSE '[' || array_to_string(ARRAY(
+                SELECT CASE json_typeof(a.value)
+                    WHEN 'null' THEN 'None'
+                    WHEN 'boolean' THEN initcap(a.value::text)
+                    WHEN 'string' THEN quote_literal(a.value #>> '{}')
+                    ELSE a.value::text
+                END
+                FROM json_array_elements(sr.mcq_answers) WITH ORDINALITY AS a(value, n)
+                ORDER BY a.n
+            ), ', ') || ']'
+        END"""
+
+# study participants only (excludes pilot sign-ups and the test account)
+PARTICIPANT_FILTER = "p.created_at >= '2025-11-16 00:00:00' AND p.participant_id != 'C932F261'"
+
+# participants with a calibration on every required video they submitted responses for
+# (the same definition as export_comprehensive_data and analysis_participant_completion)
+COMPLETE_PARTICIPANTS = """
+            SELECT vc.participant_id FROM volume_calibrations vc
+            WHERE vc.video_id = ANY(%(required_video_ids)s)
+                AND EXISTS (
+                    SELECT 1 FROM snippet_responses r
+                    JOIN snippets rs ON r.snippet_id = rs.id
+                    WHERE r.participant_id = vc.participant_id
+                        AND rs.video_id = vc.video_id
+                        AND r.submitted_at IS NOT NULL
+                )
+            GROUP BY vc.participant_id
+            HAVING COUNT(DISTINCT vc.video_id) = %(required_video_count)s"""
+
+def iso_sql(column):
+    """Timestamp column rendered like datetime.isoformat(): no fraction when microseconds are 0"""
+    return (f"""CASE WHEN date_trunc('second', {column}) = {column} """
+            f"""THEN to_char({column}, 'YYYY-MM-DD"T"HH24:MI:SS') """
+            f"""ELSE to_char({column}, 'YYYY-MM-DD"T"HH24:MI:SS.US') END""")
+
+def float_sql(expression, blank_zero=False):
+    """
+    float8 expression rendered like Python's str(float): 3.0 rather than 3, shortest
+    round-trip digits otherwise (extra_float_digits = 1). NULL is blank, and so is 0
+    with blank_zero, matching the python engine's `value or ''`
+    """
+    blank = f"{expression} IS NULL" + (f" OR {expression} = 0" if blank_zero else "")
+    return (f"CASE WHEN {blank} THEN NULL "
+            f"WHEN {expression} = trunc({expression}) AND abs({expression}) < 1e15 "
+            f"THEN trunc({expression})::bigint::text || '.0' "
+            f"ELSE ({expression})::text END")
+
+# same columns and value formatting as export_comprehensive_data, computed in SQL;
+# see ENGINE_DIFFERENCES for what still differs at the file level
+SHARD_QUERY = f"""
+    SELECT
+        p.participant_id,
+        {iso_sql('p.created_at')},
+        v.id,
+        NULLIF(v.title, ''),
+        s.id,
+        s.snippet_index,
+        CASE WHEN s.is_calibration THEN 'True' WHEN NOT s.is_calibration THEN 'False' END,
+        COALESCE(NULLIF(paa.audio_type, ''), 'N/A'),
+        {MCQ_ANSWERS_SQL},
+        {CORRECT_ANSWERS_SQL},
+        {float_sql('sr.audio_duration', blank_zero=True)},
+        NULLIF(sr.likert_mental_demand, 0),
+        NULLIF(sr.likert_tone_difficulty, 0),
+        NULLIF(sr.likert_confidence_conversation, 0),
+        NULLIF(sr.likert_nonlexical_preserved, 0),
+        {iso_sql('sr.submitted_at')},
+        {iso_sql('vs.session_start')},
+        {iso_sql('vs.session_end')},
+        {float_sql('vs.total_duration_seconds', blank_zero=True)},
+        {float_sql('ROUND((vs.total_duration_seconds / 60)::numeric, 2)::float8', blank_zero=True)},
+        {float_sql('vc.optimal_volume')},
+        {float_sql('ROUND((vc.optimal_volume * 100)::numeric, 1)::float8')},
+        {iso_sql('vc.created_at')}
+    FROM snippet_responses sr
+    JOIN participants p ON sr.participant_id = p.id
+    JOIN snippets s ON sr.snippet_id = s.id
+    JOIN videos v ON s.video_id = v.id
+    LEFT JOIN participant_audio_assignments paa
+        ON paa.participant_id = p.id AND paa.snippet_id = s.id
+    LEFT JOIN video_sessions vs
+        ON vs.participant_id = p.id AND vs.video_id = v.id
+    LEFT JOIN volume_calibrations vc
+        ON vc.participant_id = p.id AND vc.video_id = v.id
+    WHERE sr.submitted_at IS NOT NULL
+        AND v.id = %(video_id)s
+        AND {{PARTICIPANT_FILTER}}
+        AND p.id IN ({{COMPLETE_PARTICIPANTS}}
+        )
+    ORDER BY p.participant_id, s.snippet_index
+""".replace('{PARTICIPANT_FILTER}', PARTICIPANT_FILTER).replace('{COMPLETE_PARTICIPANTS}', COMPLETE_PARTICIPANTS)
+
+# what --engine copy still does differently from the python engine (shown in --help)
+ENGINE_DIFFERENCES = (
+    'rows are grouped by video rather than ordered by participant across videos; '
+    'lines end in LF instead of CRLF; '
+    'rounded minutes/volume percent can differ in the last digit on exact rounding ties'
+)
+
+# star-schema export: one file per table, keyed by database ids
+# (table, columns, primary key, {foreign key column: referenced table}, query)
+STUDY_PARTICIPANTS = f"SELECT p.id FROM participants p WHERE {PARTICIPANT_FILTER}"
+
+NORMALIZED_TABLES = [
+    ('participants',
+     ['participant_key', 'participant_id', 'participant_created_at', 'videos_calibrated', 'is_complete'],
+     ['participant_key'], {},
+     f"""
+    SELECT
+        p.id,
+        p.participant_id,
+        to_char(p.created_at, 'YYYY-MM-DD"T"HH24:MI:SS.US'),
+        COUNT(DISTINCT vc.video_id),
+        CASE WHEN p.id IN ({COMPLETE_PARTICIPANTS}
+        ) THEN 'True' ELSE 'False' END
+    FROM participants p
+    LEFT JOIN volume_calibrations vc ON vc.participant_id = p.id
+    WHERE {PARTICIPANT_FILTER}
+    GROUP BY p.id
+    ORDER BY p.id
+"""),
+    ('videos',
+     ['video_key', 'video_number', 'video_title', 'total_snippets'],
+     ['video_key'], {},
+     """
+    SELECT v.id, v.video_id, v.title, v.total_snippets
+    FROM videos v
+    ORDER BY v.id
+"""),
+    ('snippets',
+     ['snippet_key', 'video_key', 'snippet_number', 'is_calibration', 'mcq_correct_answers'],
+     ['snippet_key'], {'video_key': 'videos'},
+     f"""
+    SELECT
+        s.id,
+        s.video_id,
+        s.snippet_index,
+        CASE WHEN s.is_calibration THEN 'True' WHEN NOT s.is_calibration THEN 'False' END,
+        {CORRECT_ANSWERS_SQL}
+    FROM snippets s
+    ORDER BY s.id
+"""),
+    ('responses',
+     ['response_key', 'participant_key', 'snippet_key',
+      'mcq_answers', 'mcq_correct_mask', 'mcq_scorable_count', 'mcq_correct_count',
+      'response_audio_duration',
+      'likert_mental_demand', 'likert_tone_difficulty',
+      'likert_confidence_conversation', 'likert_nonlexical_preserved',
+      'response_submitted_at'],
+     ['response_key'], {'participant_key': 'participants', 'snippet_key': 'snippets'},
+     f"""
+    SELECT
+        sr.id,
+        sr.participant_id,
+        sr.snippet_id,
+        COALESCE(sr.mcq_answers::text, '[]'),
+        sr.mcq_correct_mask,
+        sr.mcq_scorable_count,
+        sr.mcq_correct_count,
+        sr.audio_duration,
+        sr.likert_mental_demand,
+        sr.likert_tone_difficulty,
+        sr.likert_confidence_conversation,
+        sr.likert_nonlexical_preserved,
+        to_char(sr.submitted_at, 'YYYY-MM-DD"T"HH24:MI:SS.US')
+    FROM snippet_responses sr
+    WHERE sr.submitted_at IS NOT NULL
+        AND sr.participant_id IN ({STUDY_PARTICIPANTS})
+    ORDER BY sr.id
+"""),
+    ('assignments',
+     ['participant_key', 'snippet_key', 'audio_type_assigned'],
+     ['participant_key', 'snippet_key'], {'participant_key': 'participants', 'snippet_key': 'snippets'},
+     f"""
+    SELECT paa.participant_id, paa.snippet_id, paa.audio_type
+    FROM participant_audio_assignments paa
+    WHERE paa.participant_id IN ({STUDY_PARTICIPANTS})
+    ORDER BY paa.participant_id, paa.snippet_id
+"""),
+    ('sessions',
+     ['participant_key', 'video_key', 'video_session_start', 'video_session_end',
+      'video_session_duration_seconds'],
+     ['participant_key', 'video_key'], {'participant_key': 'participants', 'video_key': 'videos'},
+     f"""
+    SELECT
+        vs.participant_id,
+        vs.video_id,
+        to_char(vs.session_start, 'YYYY-MM-DD"T"HH24:MI:SS.US'),
+        to_char(vs.session_end, 'YYYY-MM-DD"T"HH24:MI:SS.US'),
+        vs.total_duration_seconds
+    FROM video_sessions vs
+    WHERE vs.participant_id IN ({STUDY_PARTICIPANTS})
+    ORDER BY vs.participant_id, vs.video_id
+"""),
+    ('calibrations',
+     ['participant_key', 'video_key', 'optimal_volume', 'calibration_submitted_at'],
+     ['participant_key', 'video_key'], {'participant_key': 'participants', 'video_key': 'videos'},
+     f"""
+    SELECT
+        vc.participant_id,
+        vc.video_id,
+        vc.optimal_volume,
+        to_char(vc.created_at, 'YYYY-MM-DD"T"HH24:MI:SS.US')
+    FROM volume_calibrations vc
+    WHERE vc.participant_id IN ({STUDY_PARTICIPANTS})
+    ORDER BY vc.participant_id, vc.video_id
+"""),
+]
+
+#----------------------------------------------------------------------#
+
+def get_dsn():
+    """libpq connection string from ACTUAL_DATABASE_URL (SQLAlchemy driver suffix stripped)"""
+    database_url = os.getenv('ACTUAL_DATABASE_URL')
+    if not database_url:
+        raise ValueError("ACTUAL_DATABASE_URL not found in environment variables")
+    return database_url.replace('postgresql+psycopg2://', 'postgresql://')
+
+def begin_snapshot_transaction(conn, snapshot_id=None):
+    """Open a repeatable-read, read-only transaction, optionally importing a snapshot"""
+    # psycopg2 issues BEGIN with these settings before the first statement,
+    # so SET TRANSACTION SNAPSHOT is the first command in the transaction
+    conn.set_session(isolation_level='REPEATABLE READ', readonly=True)
+    cursor = conn.cursor()
+    if snapshot_id:
+        cursor.execute("SET TRANSACTION SNAPSHOT %s", (snapshot_id,))
+    # shortest round-trip float text, the same digits Python's str(float) prints
+    cursor.execute("SET LOCAL extra_float_digits = 1")
+    return cursor
+
+def copy_query_to_file(cursor, query, params, path, header=None):
+    """Stream COPY (query) TO STDOUT WITH CSV into path, after an optional header row"""
+    sql = cursor.mogrify(query, params).decode('utf-8')
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        if header:
+            f.write(','.join(header) + '\n')
+        cursor.copy_expert(f"COPY ({sql}) TO STDOUT WITH CSV", f)
+
+def _copy_shard(dsn, snapshot_id, query, params, path, header):
+    """Process-pool worker: export one shard inside the shared snapshot"""
+    start = time.perf_counter()
+    conn = psycopg2.connect(dsn)
+    try:
+        cursor = begin_snapshot_transaction(conn, snapshot_id)
+        copy_query_to_file(cursor, query, params, path, header)
+        conn.rollback()
+    finally:
+        conn.close()
+    return path, os.path.getsize(path), time.perf_counter() - start
+
+def run_sharded_copy(dsn, shards, workers=None):
+    """
+    Run shards [(query, params, path, header), ...] in parallel under one snapshot
+    Returns [(path, bytes, seconds), ...] in shard order
+    """
+    coordinator = psycopg2.connect(dsn)
+    try:
+        cursor = begin_snapshot_transaction(coordinator)
+        cursor.execute("SELECT pg_export_snapshot()")
+        snapshot_id = cursor.fetchone()[0]
+
+        # the snapshot stays importable while the coordinator's transaction is open
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(_copy_shard, dsn, snapshot_id, query, params, path, header)
+                for query, params, path, header in shards
+            ]
+            results = [future.result() for future in futures]
+
+        coordinator.rollback()
+    finally:
+        coordinator.close()
+
+    return results
+
+def count_csv_rows(path):
+    """Data rows in a COPY CSV with a header (exported fields contain no newlines)"""
+    lines = 0
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            lines += chunk.count(b'\n')
+    return max(lines - 1, 0)
+
+def list_video_ids(dsn):
+    conn = psycopg2.connect(dsn)
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT id FROM videos ORDER BY id")
+        return [row[0] for row in cursor.fetchall()]
+    finally:
+        conn.close()
+
+#----------------------------------------------------------------------#
+
+def export_with_copy(output_file='comprehensive_participant_data.csv', workers=None, partition=False):
+    """
+    Export the comprehensive spreadsheet with COPY, one shard per video
+    Values match export_comprehensive_data field for field; see ENGINE_DIFFERENCES
+    partition=False concatenates shards into output_file (rows grouped by video);
+    partition=True leaves one CSV per video in a directory named after output_file
+    """
+    dsn = get_dsn()
+    video_ids = list_video_ids(dsn)
+    if not video_ids:
+        print("No videos found to export")
+        return
+
+    params_base = {
+        'required_video_ids': REQUIRED_VIDEO_IDS,
+        'required_video_count': len(REQUIRED_VIDEO_IDS),
+    }
+
+    stem = os.path.splitext(output_file)[0]
+    shard_dir = stem if partition else f"{stem}.shards"
+    os.makedirs(shard_dir, exist_ok=True)
+
+    shards = [
+        (SHARD_QUERY, {**params_base, 'video_id': video_id},
+         os.path.join(shard_dir, f"video_{video_id}.csv"), EXPORT_COLUMNS if partition else None)
+        for video_id in video_ids
+    ]
+
+    print(f"Exporting {len(shards)} video shards with COPY...")
+    start = time.perf_counter()
+    results = run_sharded_copy(dsn, shards, workers=workers)
+
+    for path, size, seconds in results:
+        print(f"  > {os.path.basename(path)}: {size / 1e6:.1f} MB in {seconds:.2f}s")
+
+    if partition:
+        print(f"✓ Wrote {len(results)} partitions to {shard_dir}/")
+    else:
+        with open(output_file, 'w', encoding='utf-8', newline='') as out:
+            out.write(','.join(EXPORT_COLUMNS) + '\n')
+            for path, _, _ in results:
+                with open(path, 'r', encoding='utf-8', newline='') as shard:
+                    shutil.copyfileobj(shard, out, length=1 << 20)
+        shutil.rmtree(shard_dir)
+        print(f"✓ Exported to {output_file}")
+
+    print(f"Total export time: {time.perf_counter() - start:.2f}s")
+
+def export_normalized(output_dir='participant_data_normalized', workers=None):
+    """
+    Export a star schema: one CSV per table plus manifest.json describing
+    columns, keys and row counts. responses is the fact table; the rest are
+    dimensions joined on *_key columns. Every file comes from the same snapshot
+    Participants are not restricted to complete ones; filter on is_complete
+    """
+    dsn = get_dsn()
+    os.makedirs(output_dir, exist_ok=True)
+
+    params = {
+        'required_video_ids': REQUIRED_VIDEO_IDS,
+        'required_video_count': len(REQUIRED_VIDEO_IDS),
+    }
+    shards = [
+        (query, params, os.path.join(output_dir, f"{table}.csv"), columns)
+        for table, columns, _, _, query in NORMALIZED_TABLES
+    ]
+
+    print(f"Exporting {len(shards)} tables with COPY...")
+    start = time.perf_counter()
+    results = run_sharded_copy(dsn, shards, workers=workers)
+
+    manifest = {
+        'generated_at': datetime.utcnow().isoformat(),
+        'format': 'csv',
+        'required_video_ids': REQUIRED_VIDEO_IDS,
+        'tables': {},
+    }
+    for (table, columns, primary_key, foreign_keys, _), (path, size, seconds) in zip(NORMALIZED_TABLES, results):
+        rows = count_csv_rows(path)
+        manifest['tables'][table] = {
+            'file': os.path.basename(path),
+            'rows': rows,
+            'bytes': size,
+            'columns': columns,
+            'primary_key': primary_key,
+            'foreign_keys': {column: f"{ref}.{column}" for column, ref in foreign_keys.items()},
+        }
+        print(f"  > {table}: {rows} rows, {size / 1e6:.1f} MB in {seconds:.2f}s")
+
+    with open(os.path.join(output_dir, 'manifest.json'), 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+    print(f"✓ Exported {len(results)} tables to {output_dir}/")
+    print(f"Total export time: {time.perf_counter() - start:.2f}s")
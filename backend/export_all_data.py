@@ -3,6 +3,7 @@ Comprehensive export script for all participant data
 Includes: audio assignments, session length, MCQ answers, Likert responses, and volume calibration
 """
 
+import argparse
 import csv
 import json
 import sys
@@ -11,6 +12,8 @@ from datetime import datetime
 from sqlalchemy import create_engine, MetaData, text
 from sqlalchemy.orm import sessionmaker
 from dotenv import load_dotenv
+from copy_export import export_with_copy, export_normalized, ENGINE_DIFFERENCES
+from analysis_views import REQUIRED_VIDEO_IDS, views_freshness
 
 load_dotenv()
 
@@ -197,17 +200,7 @@ def get_read_only_session():
 #         print("\nDatabase connection closed (no writes performed)")
 
 
-def export_comprehensive_data(output_file='comprehensive_participant_data.csv'):
-    """
-    Export all participant data in a single comprehensive spreadsheet
-    One row per snippet response with all associated data
-    READ-ONLY OPERATION
-    """
-    print("Connecting to database...")
-    session, engine = get_read_only_session()
-    
-    try:
-        query = text("""
+LIVE_EXPORT_QUERY = """
         SELECT 
             -- Participant info
             p.participant_id,
@@ -258,7 +251,47 @@ def export_comprehensive_data(output_file='comprehensive_participant_data.csv'):
             AND p.created_at >= '2025-11-16 00:00:00'
             AND p.participant_id != 'C932F261'
         ORDER BY p.participant_id, v.id, s.snippet_index
-        """)
+        """
+
+# precomputed equivalent of LIVE_EXPORT_QUERY, see analysis_views.py
+VIEWS_EXPORT_QUERY = """
+        SELECT 
+            f.*,
+            c.is_complete,
+            c.calibrated_video_ids
+        FROM analysis_response_facts f
+        JOIN analysis_participant_completion c
+            ON c.participant_db_id = f.participant_db_id
+        WHERE f.participant_created_at >= '2025-11-16 00:00:00'
+            AND f.participant_id != 'C932F261'
+        ORDER BY f.participant_id, f.video_id, f.snippet_index
+        """
+
+
+def export_comprehensive_data(output_file='comprehensive_participant_data.csv', use_views=True):
+    """
+    Export all participant data in a single comprehensive spreadsheet
+    One row per snippet response with all associated data
+    Reads the precomputed analysis views unless use_views is False
+    READ-ONLY OPERATION
+    """
+    print("Connecting to database...")
+    session, engine = get_read_only_session()
+    
+    try:
+        if use_views:
+            print("Reading precomputed analysis views...")
+            refreshed_at, newer_responses = views_freshness(session)
+            if refreshed_at is None:
+                print("  WARNING: analysis views are empty; run `make refresh-views` or export with --live")
+            else:
+                print(f"  Views last refreshed at {refreshed_at.isoformat()}")
+                if newer_responses:
+                    print(f"  WARNING: {newer_responses} responses submitted since then are not included; "
+                          f"run `make refresh-views` or export with --live")
+            query = text(VIEWS_EXPORT_QUERY)
+        else:
+            query = text(LIVE_EXPORT_QUERY)
         
         result = session.execute(query)
         results = result.fetchall()
@@ -269,36 +302,51 @@ def export_comprehensive_data(output_file='comprehensive_participant_data.csv'):
         
         print(f"Found {len(results)} responses to export")
         
-        # check completion status for each participant
-        participant_completion = {}
-        for row in results:
-            pid = row.participant_id
-            vid = row.video_id
-            
-            if pid not in participant_completion:
-                participant_completion[pid] = {}
-            
-            if vid not in participant_completion[pid]:
-                participant_completion[pid][vid] = False
-            
-            # mark video as complete if calibration is submitted
-            if row.calibration_submitted_at:
-                participant_completion[pid][vid] = True
-        
         # find incomplete participants
         incomplete_participants = []
         complete_participants = []
         
-        for pid, videos in participant_completion.items():
-            # check if all 5 videos are complete
-            all_complete = all(videos.get(vid, False) for vid in [1, 2, 3, 4, 5])
+        if use_views:
+            # completion state is precomputed per participant
+            completion_rows = {}
+            for row in results:
+                completion_rows.setdefault(row.participant_id, row)
             
-            if all_complete:
-                complete_participants.append(pid)
-            else:
-                incomplete_participants.append(pid)
-                missing_videos = [vid for vid in [1, 2, 3, 4, 5] if not videos.get(vid, False)]
-                print(f"  -  {pid}: Missing videos {missing_videos}")
+            for pid, row in completion_rows.items():
+                if row.is_complete:
+                    complete_participants.append(pid)
+                else:
+                    incomplete_participants.append(pid)
+                    calibrated = set(row.calibrated_video_ids or [])
+                    missing_videos = [vid for vid in REQUIRED_VIDEO_IDS if vid not in calibrated]
+                    print(f"  -  {pid}: Missing videos {missing_videos}")
+        else:
+            # check completion status for each participant
+            participant_completion = {}
+            for row in results:
+                pid = row.participant_id
+                vid = row.video_id
+                
+                if pid not in participant_completion:
+                    participant_completion[pid] = {}
+                
+                if vid not in participant_completion[pid]:
+                    participant_completion[pid][vid] = False
+                
+                # mark video as complete if calibration is submitted
+                if row.calibration_submitted_at:
+                    participant_completion[pid][vid] = True
+            
+            for pid, videos in participant_completion.items():
+                # check if every required video is complete
+                all_complete = all(videos.get(vid, False) for vid in REQUIRED_VIDEO_IDS)
+                
+                if all_complete:
+                    complete_participants.append(pid)
+                else:
+                    incomplete_participants.append(pid)
+                    missing_videos = [vid for vid in REQUIRED_VIDEO_IDS if not videos.get(vid, False)]
+                    print(f"  -  {pid}: Missing videos {missing_videos}")
         
         print(f"\n{'='*60}")
         print(f"COMPLETION STATUS")
@@ -312,7 +360,8 @@ def export_comprehensive_data(output_file='comprehensive_participant_data.csv'):
                 print(f"  - {pid}")
         
         # filter results to only complete participants
-        filtered_results = [row for row in results if row.participant_id in complete_participants]
+        complete_set = set(complete_participants)
+        filtered_results = [row for row in results if row.participant_id in complete_set]
         
         print(f"\n{'='*60}")
         print(f"Exporting {len(filtered_results)} responses from {len(complete_participants)} complete participants...")
@@ -518,13 +567,36 @@ if __name__ == '__main__':
     print("=" * 60)
     print()
     
-    output_file = sys.argv[1] if len(sys.argv) > 1 else 'comprehensive_participant_data.csv'
+    parser = argparse.ArgumentParser(description='Export all participant data')
+    parser.add_argument('output_file', nargs='?', default='comprehensive_participant_data.csv',
+                       help='Output CSV path (default: comprehensive_participant_data.csv)')
+    parser.add_argument('--live', action='store_true',
+                       help='Join the live tables instead of reading the precomputed analysis views')
+    parser.add_argument('--engine', choices=['python', 'copy'], default='python',
+                       help='python: row-by-row csv writer; copy: parallel COPY per video with the same '
+                            f'columns and values, except: {ENGINE_DIFFERENCES} (default: python)')
+    parser.add_argument('--workers', type=int, default=None,
+                       help='Processes for the copy engine (default: CPU count)')
+    parser.add_argument('--partition', action='store_true',
+                       help='With the copy engine, keep one CSV per video instead of concatenating')
+    parser.add_argument('--normalized', action='store_true',
+                       help='Write fact/dimension CSVs and a manifest into a directory (always uses COPY)')
+    args = parser.parse_args()
+    
+    output_file = args.output_file
+    if args.normalized and output_file == 'comprehensive_participant_data.csv':
+        output_file = 'participant_data_normalized'
     
     print(f"Exporting all participant data to {output_file}...")
     print()
     
     try:
-        export_comprehensive_data(output_file)
+        if args.normalized:
+            export_normalized(output_file, workers=args.workers)
+        elif args.engine == 'copy':
+            export_with_copy(output_file, workers=args.workers, partition=args.partition)
+        else:
+            export_comprehensive_data(output_file, use_views=not args.live)
     except Exception as e:
         print(f"\n Error: {e}")
         sys.exit(1)
@@ -0,0 +1,80 @@
+"""
+Background jobs
+Runs long admin operations on a worker thread and records their progress in
+background_jobs, so whichever gunicorn worker serves the status poll can answer.
+The worker thread dies with its process (deploy, OOM kill), so a job that has
+not reported in for STALE_AFTER is marked failed when it is next polled
+"""
+
+import threading
+import traceback
+from datetime import datetime, timedelta
+from flask import current_app
+from models import db, BackgroundJob
+
+#----------------------------------------------------------------------#
+
+# a running job that has not reported for this long (or a pending job that
+# never started) is assumed to have lost its worker
+STALE_AFTER = timedelta(minutes=10)
+
+#----------------------------------------------------------------------#
+
+def start_job(kind, target, fn, **kwargs):
+    """
+    Record a pending job and run fn(report=..., **kwargs) on a daemon thread
+    fn calls report(**fields) to merge fields into the job's progress
+    and returns a JSON-serializable result
+    """
+    job = BackgroundJob(kind=kind, target=str(target), status='pending', progress={})
+    db.session.add(job)
+    db.session.commit()
+
+    app = current_app._get_current_object()
+    thread = threading.Thread(target=_run_job, args=(app, job.id, fn, kwargs), daemon=True)
+    thread.start()
+
+    return job
+
+def _run_job(app, job_id, fn, kwargs):
+    with app.app_context():
+        job = db.session.get(BackgroundJob, job_id)
+        job.status = 'running'
+        job.started_at = job.heartbeat_at = datetime.utcnow()
+        db.session.commit()
+
+        def report(**fields):
+            # reassign so the JSON column change is detected
+            job.progress = {**(job.progress or {}), **fields}
+            job.heartbeat_at = datetime.utcnow()
+            db.session.commit()
+
+        try:
+            job.result = fn(report=report, **kwargs)
+            job.status = 'done'
+        except Exception as e:
+            db.session.rollback()
+            print(f"Job {job_id} ({job.kind}) failed: {e}")
+            traceback.print_exc()
+            job.status = 'failed'
+            job.error = str(e)
+
+        job.finished_at = datetime.utcnow()
+        db.session.commit()
+        db.session.remove()
+
+def mark_if_stale(job, now=None):
+    """Fail a pending/running job whose worker stopped reporting; returns True if it was marked"""
+    if job.status not in ('pending', 'running'):
+        return False
+    now = now or datetime.utcnow()
+    last_seen = job.heartbeat_at or job.started_at or job.created_at
+    if now - last_seen < STALE_AFTER:
+        return False
+
+    job.status = 'failed'
+    job.error = (f"worker stopped reporting (last seen {last_seen.isoformat()}); "
+                 f"the process probably restarted, retry the operation")
+    job.finished_at = now
+    db.session.commit()
+    return True
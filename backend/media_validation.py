@@ -0,0 +1,218 @@
+"""
+Media reference validation
+Checks every file a seeded catalogue points at against a media index before
+anything is written: the object must exist and be non-empty, and video/audio
+must probe to a duration consistent with the snippet. The index is a local
+directory (a mirror of the bucket, or the pipeline output) or an S3-compatible
+bucket (R2 itself or a local MinIO stand-in). Files are checked concurrently
+and each distinct file only once
+"""
+
+import json
+import os
+import shutil
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import unquote
+
+try:
+    import boto3
+except ImportError:
+    boto3 = None
+
+#----------------------------------------------------------------------#
+
+MEDIA_FIELDS = [
+    'video_filename_full', 'video_filename_muffled', 'video_filename_balanced',
+    'video_track_filename', 'audio_track_full', 'audio_track_muffled', 'audio_track_balanced',
+    'poster_filename',
+]
+PROBED_EXTENSIONS = ('.mp4', '.mov', '.m4a', '.mkv', '.webm')
+
+# a media file may be this much shorter than the snippet's duration
+DURATION_SHORT_TOLERANCE = 1.0
+# variants run past the cut by the dub delay (at most 10s) plus the dub's overhang
+DURATION_LONG_TOLERANCE = 20.0
+
+PROBE_TIMEOUT_SECONDS = 30
+DEFAULT_WORKERS = 16
+
+#----------------------------------------------------------------------#
+
+class LocalMediaIndex:
+    """Objects are files under root, at the same relative path as under the media base URL"""
+
+    def __init__(self, root):
+        if not os.path.isdir(root):
+            raise FileNotFoundError(f"media directory {root} does not exist")
+        self.root = root
+
+    def describe(self):
+        return os.path.abspath(self.root)
+
+    def size(self, key):
+        path = os.path.join(self.root, key)
+        return os.path.getsize(path) if os.path.isfile(path) else None
+
+    def probe_target(self, key):
+        return os.path.join(self.root, key)
+
+class S3MediaIndex:
+    """Objects in an S3-compatible bucket; durations are probed through presigned URLs"""
+
+    def __init__(self, bucket, endpoint_url=None):
+        if boto3 is None:
+            raise RuntimeError('boto3 is required for bucket validation (pip install boto3)')
+        self.bucket = bucket
+        self.client = boto3.client('s3', endpoint_url=endpoint_url)
+
+    def describe(self):
+        return f"s3://{self.bucket} ({self.client.meta.endpoint_url})"
+
+    def size(self, key):
+        try:
+            return self.client.head_object(Bucket=self.bucket, Key=key)['ContentLength']
+        except self.client.exceptions.ClientError as e:
+            if e.response.get('Error', {}).get('Code') in ('404', 'NoSuchKey', 'NotFound'):
+                return None
+            raise
+
+    def probe_target(self, key):
+        return self.client.generate_presigned_url(
+            'get_object', Params={'Bucket': self.bucket, 'Key': key}, ExpiresIn=300)
+
+def media_index_from_env(media_dir=None, bucket=None, endpoint_url=None):
+    """Index from arguments or MEDIA_INDEX_DIR / MEDIA_BUCKET / MEDIA_S3_ENDPOINT (None if unset)"""
+    media_dir = media_dir or os.getenv('MEDIA_INDEX_DIR')
+    bucket = bucket or os.getenv('MEDIA_BUCKET')
+    if media_dir:
+        return LocalMediaIndex(media_dir)
+    if bucket:
+        return S3MediaIndex(bucket, endpoint_url or os.getenv('MEDIA_S3_ENDPOINT'))
+    return None
+
+#----------------------------------------------------------------------#
+
+def probe_duration(target):
+    """Container duration in seconds via ffprobe (None if it cannot be read)"""
+    try:
+        result = subprocess.run([
+            'ffprobe', '-v', 'error',
+            '-show_entries', 'format=duration',
+            '-of', 'default=noprint_wrappers=1:nokey=1',
+            target
+        ], capture_output=True, text=True, timeout=PROBE_TIMEOUT_SECONDS)
+    except subprocess.TimeoutExpired:
+        return None
+    try:
+        return float(result.stdout.strip())
+    except ValueError:
+        return None
+
+def media_key(url, base_url):
+    """
+    Object key for a catalogue URL (None when it is not served from base_url)
+    Percent-encoding is undone, so 'My%20Clip.mp4' is looked up as 'My Clip.mp4'
+    """
+    if not base_url:
+        return unquote(url) if not url.startswith(('http://', 'https://')) else None
+    prefix = base_url.rstrip('/') + '/'
+    return unquote(url[len(prefix):]) if url.startswith(prefix) else None
+
+def collect_references(snippets):
+    """{url: [(video_id, snippet_index, field, expected_duration), ...]} over every media field"""
+    references = {}
+    for (video_id, snippet_index), row in sorted(snippets.items()):
+        for field in MEDIA_FIELDS:
+            if row.get(field):
+                references.setdefault(row[field], []).append((video_id, snippet_index, field, row.get('duration')))
+        for audio_type, urls in (row.get('stream_manifests') or {}).items():
+            for kind, url in urls.items():
+                references.setdefault(url, []).append(
+                    (video_id, snippet_index, f'stream_manifests.{audio_type}.{kind}', None))
+    return references
+
+def check_reference(index, url, base_url, uses, probe):
+    """
+    Thread-pool worker: existence, size and duration checks for one file
+    Errors (denied or throttled requests, I/O errors, presigning) are recorded
+    as problems on this reference rather than aborting the whole validation
+    """
+    result = {'url': url, 'key': None, 'used_by': [list(use[:3]) for use in uses], 'problems': []}
+    try:
+        return _check_reference(index, url, base_url, uses, probe, result)
+    except Exception as e:
+        result['problems'].append(f'could not be checked: {type(e).__name__}: {e}')
+        return result
+
+def _check_reference(index, url, base_url, uses, probe, result):
+    key = media_key(url, base_url)
+    result['key'] = key
+
+    if key is None:
+        result['problems'].append('not under the media base URL, cannot be checked')
+        return result
+
+    size = index.size(key)
+    result['size'] = size
+    if size is None:
+        result['problems'].append('missing from the media index')
+        return result
+    if size == 0:
+        result['problems'].append('empty file')
+        return result
+
+    if probe and key.lower().endswith(PROBED_EXTENSIONS):
+        duration = probe_duration(index.probe_target(key))
+        result['duration'] = duration
+        if duration is None:
+            result['problems'].append('ffprobe could not read the file')
+            return result
+        for video_id, snippet_index, field, expected in uses:
+            if expected is None:
+                continue
+            if duration < expected - DURATION_SHORT_TOLERANCE:
+                result['problems'].append(
+                    f'{duration:.2f}s but video {video_id} snippet {snippet_index} ({field}) lasts {expected:.2f}s')
+            elif duration > expected + DURATION_LONG_TOLERANCE:
+                result['problems'].append(
+                    f'{duration:.2f}s, far longer than video {video_id} snippet {snippet_index} ({field}) at {expected:.2f}s')
+
+    return result
+
+def validate_media(snippets, base_url, index, workers=DEFAULT_WORKERS):
+    """
+    Check every media reference of the resolved snippet rows against index
+    Returns a report dict; report['ok'] is False when any reference has a problem
+    """
+    references = collect_references(snippets)
+    probe = shutil.which('ffprobe') is not None
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(
+            lambda item: check_reference(index, item[0], base_url, item[1], probe),
+            references.items()
+        ))
+
+    failed = [r for r in results if r['problems']]
+    return {
+        'ok': not failed,
+        'index': index.describe(),
+        'checked': len(results),
+        'durations_probed': probe,
+        'failed': failed,
+    }
+
+def print_report(report):
+    print(f"\n  Media validation against {report['index']}: "
+          f"{report['checked'] - len(report['failed'])}/{report['checked']} files OK")
+    if not report['durations_probed']:
+        print("    WARNING: ffprobe not found, durations were not checked")
+    for result in report['failed']:
+        users = ', '.join(f"video {v} snippet {i} {field}" for v, i, field in result['used_by'])
+        print(f"    ✗ {result['key'] or result['url']}: {'; '.join(result['problems'])}")
+        print(f"        used by {users}")
+
+def write_report(report, path):
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
@@ -0,0 +1,125 @@
+"""
+Request instrumentation
+Records per-endpoint latency, SQL statement counts/durations and response sizes,
+adds a Server-Timing header to every response, and renders everything in
+Prometheus text format for /api/admin/metrics
+Metrics are per process; under gunicorn each worker reports its own share
+"""
+
+import threading
+import time
+from flask import g, request, has_request_context
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+#----------------------------------------------------------------------#
+
+LATENCY_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0]
+SQL_COUNT_BUCKETS = [0, 1, 2, 5, 10, 20, 50, 100]
+SQL_DURATION_BUCKETS = LATENCY_BUCKETS
+SIZE_BUCKETS = [1_000, 10_000, 100_000, 1_000_000, 10_000_000]
+
+# requests issuing more statements than this are logged as likely N+1 patterns
+QUERY_WARN_THRESHOLD = 25
+
+#----------------------------------------------------------------------#
+
+class Histogram:
+    """Cumulative-bucket histogram keyed by label tuple"""
+
+    def __init__(self, name, help_text, buckets, label_names):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self.label_names = label_names
+        self.series = {}
+
+    def observe(self, labels, value):
+        counts, total = self.series.get(labels, ([0] * (len(self.buckets) + 1), 0.0))
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                counts[i] += 1
+        counts[-1] += 1
+        self.series[labels] = (counts, total + value)
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        for labels, (counts, total) in sorted(self.series.items()):
+            label_text = ','.join(f'{k}="{v}"' for k, v in zip(self.label_names, labels))
+            for bound, count in zip(self.buckets, counts):
+                lines.append(f'{self.name}_bucket{{{label_text},le="{bound}"}} {count}')
+            lines.append(f'{self.name}_bucket{{{label_text},le="+Inf"}} {counts[-1]}')
+            lines.append(f'{self.name}_sum{{{label_text}}} {total}')
+            lines.append(f'{self.name}_count{{{label_text}}} {counts[-1]}')
+        return lines
+
+_lock = threading.Lock()
+_label_names = ('endpoint', 'method')
+_histograms = [
+    Histogram('http_request_duration_seconds', 'Request latency', LATENCY_BUCKETS, _label_names),
+    Histogram('http_request_sql_statements', 'SQL statements executed per request', SQL_COUNT_BUCKETS, _label_names),
+    Histogram('http_request_sql_duration_seconds', 'Time spent in SQL per request', SQL_DURATION_BUCKETS, _label_names),
+    Histogram('http_response_size_bytes', 'Response payload size', SIZE_BUCKETS, _label_names),
+]
+_latency, _sql_count, _sql_duration, _response_size = _histograms
+
+#----------------------------------------------------------------------#
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context():
+        g._sql_started = time.perf_counter()
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context() and hasattr(g, '_sql_started'):
+        g.sql_count = g.get('sql_count', 0) + 1
+        g.sql_time = g.get('sql_time', 0.0) + (time.perf_counter() - g._sql_started)
+
+def _before_request():
+    g.request_started = time.perf_counter()
+    g.sql_count = 0
+    g.sql_time = 0.0
+
+def _after_request(response):
+    started = g.get('request_started')
+    if started is None:
+        return response
+
+    elapsed = time.perf_counter() - started
+    sql_count = g.get('sql_count', 0)
+    sql_time = g.get('sql_time', 0.0)
+    size = response.content_length
+    if size is None and not response.direct_passthrough and not response.is_streamed:
+        size = len(response.get_data())
+
+    labels = (request.endpoint or 'unmatched', request.method)
+    with _lock:
+        _latency.observe(labels, elapsed)
+        _sql_count.observe(labels, sql_count)
+        _sql_duration.observe(labels, sql_time)
+        if size is not None:
+            _response_size.observe(labels, size)
+
+    response.headers.add(
+        'Server-Timing',
+        f'app;dur={elapsed * 1000:.1f}, db;dur={sql_time * 1000:.1f};desc="{sql_count} queries"'
+    )
+
+    if sql_count > QUERY_WARN_THRESHOLD:
+        print(f"WARNING: {labels[1]} {request.path} ran {sql_count} SQL statements ({sql_time * 1000:.0f}ms)")
+
+    return response
+
+def init_metrics(app):
+    """Install request timing hooks on the app"""
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+
+def render_prometheus():
+    """Current metrics in Prometheus text exposition format"""
+    with _lock:
+        lines = []
+        for histogram in _histograms:
+            lines.extend(histogram.render())
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,27 @@
+"""add background job heartbeat
+
+Revision ID: 1f6b3d9a5c28
+Revises: e8b4c2d96f17
+Create Date: 2026-10-20 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '1f6b3d9a5c28'
+down_revision = 'e8b4c2d96f17'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # ### last time the job's worker thread reported in (stale jobs are reported as failed)
+    with op.batch_alter_table('background_jobs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('heartbeat_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    # ### remove heartbeat
+    with op.batch_alter_table('background_jobs', schema=None) as batch_op:
+        batch_op.drop_column('heartbeat_at')
@@ -0,0 +1,106 @@
+"""add analysis views
+
+Revision ID: 3b7e91c4f2a6
+Revises: 8c3f7a1b2d4e
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '3b7e91c4f2a6'
+down_revision = '8c3f7a1b2d4e'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # ### one row per submitted response, pre-joined with assignment, session and calibration
+    op.execute("""
+    CREATE MATERIALIZED VIEW analysis_response_facts AS
+    SELECT
+        sr.id AS response_id,
+        p.id AS participant_db_id,
+        p.participant_id,
+        p.created_at AS participant_created_at,
+        v.id AS video_id,
+        v.title AS video_title,
+        s.id AS snippet_id,
+        s.snippet_index,
+        s.is_calibration,
+        s.mcq_questions,
+        paa.audio_type AS audio_type_assigned,
+        sr.mcq_answers,
+        sr.audio_duration AS response_audio_duration,
+        sr.likert_mental_demand,
+        sr.likert_tone_difficulty,
+        sr.likert_confidence_conversation,
+        sr.likert_nonlexical_preserved,
+        sr.submitted_at AS response_submitted_at,
+        vs.session_start AS video_session_start,
+        vs.session_end AS video_session_end,
+        vs.total_duration_seconds AS video_session_duration_seconds,
+        vc.optimal_volume,
+        vc.created_at AS calibration_submitted_at
+    FROM snippet_responses sr
+    JOIN participants p ON sr.participant_id = p.id
+    JOIN snippets s ON sr.snippet_id = s.id
+    JOIN videos v ON s.video_id = v.id
+    LEFT JOIN participant_audio_assignments paa
+        ON paa.participant_id = p.id AND paa.snippet_id = s.id
+    LEFT JOIN video_sessions vs
+        ON vs.participant_id = p.id AND vs.video_id = v.id
+    LEFT JOIN volume_calibrations vc
+        ON vc.participant_id = p.id AND vc.video_id = v.id
+    WHERE sr.submitted_at IS NOT NULL
+    WITH DATA
+    """)
+    # unique index is required for REFRESH ... CONCURRENTLY
+    op.execute("CREATE UNIQUE INDEX ux_analysis_response_facts_response_id ON analysis_response_facts (response_id)")
+    op.execute("CREATE INDEX ix_analysis_response_facts_order ON analysis_response_facts (participant_id, video_id, snippet_index)")
+
+    # ### one row per participant with progress counters and completion state
+    op.execute("""
+    CREATE MATERIALIZED VIEW analysis_participant_completion AS
+    SELECT
+        p.id AS participant_db_id,
+        p.participant_id,
+        p.email,
+        p.created_at AS participant_created_at,
+        COALESCE(r.responses_submitted, 0) AS responses_submitted,
+        COALESCE(c.videos_calibrated, 0) AS videos_calibrated,
+        COALESCE(c.calibrated_video_ids, ARRAY[]::integer[]) AS calibrated_video_ids,
+        COALESCE(ss.total_session_seconds, 0) AS total_session_seconds,
+        t.videos_total,
+        COALESCE(c.videos_calibrated, 0) >= t.videos_total AS is_complete
+    FROM participants p
+    CROSS JOIN (SELECT COUNT(*) AS videos_total FROM videos) t
+    LEFT JOIN (
+        SELECT participant_id, COUNT(*) AS responses_submitted
+        FROM snippet_responses
+        WHERE submitted_at IS NOT NULL
+        GROUP BY participant_id
+    ) r ON r.participant_id = p.id
+    LEFT JOIN (
+        SELECT participant_id,
+               COUNT(DISTINCT video_id) AS videos_calibrated,
+               ARRAY_AGG(DISTINCT video_id) AS calibrated_video_ids
+        FROM volume_calibrations
+        GROUP BY participant_id
+    ) c ON c.participant_id = p.id
+    LEFT JOIN (
+        SELECT participant_id, SUM(total_duration_seconds) AS total_session_seconds
+        FROM video_sessions
+        GROUP BY participant_id
+    ) ss ON ss.participant_id = p.id
+    WITH DATA
+    """)
+    op.execute("CREATE UNIQUE INDEX ux_analysis_participant_completion_db_id ON analysis_participant_completion (participant_db_id)")
+    op.execute("CREATE INDEX ix_analysis_participant_completion_complete ON analysis_participant_completion (is_complete)")
+
+
+def downgrade():
+    # ### drop analysis views (indexes go with them)
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS analysis_participant_completion")
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS analysis_response_facts")
@@ -0,0 +1,25 @@
+"""add participant code sequence
+
+Revision ID: 5d2a8f0e6c13
+Revises: 3b7e91c4f2a6
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '5d2a8f0e6c13'
+down_revision = '3b7e91c4f2a6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # ### counter feeding the keyed participant ID permutation (see provisioning.py)
+    op.execute("CREATE SEQUENCE participant_code_seq MINVALUE 0 START WITH 0")
+
+
+def downgrade():
+    # ### drop participant ID counter
+    op.execute("DROP SEQUENCE IF EXISTS participant_code_seq")
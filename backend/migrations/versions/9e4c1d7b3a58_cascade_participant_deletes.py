@@ -0,0 +1,63 @@
+"""cascade participant deletes and add background jobs
+
+Revision ID: 9e4c1d7b3a58
+Revises: 5d2a8f0e6c13
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '9e4c1d7b3a58'
+down_revision = '5d2a8f0e6c13'
+branch_labels = None
+depends_on = None
+
+# tables whose participant_id FK should follow the participant row
+PARTICIPANT_CHILD_TABLES = [
+    'snippet_responses',
+    'participant_audio_assignments',
+    'video_sessions',
+    'volume_calibrations',
+]
+
+
+def upgrade():
+    # ### recreate participant FKs with ON DELETE CASCADE (init schema left them unnamed,
+    # so they carry Postgres' default <table>_participant_id_fkey names)
+    for table in PARTICIPANT_CHILD_TABLES:
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.drop_constraint(f'{table}_participant_id_fkey', type_='foreignkey')
+            batch_op.create_foreign_key(
+                f'{table}_participant_id_fkey', 'participants',
+                ['participant_id'], ['id'], ondelete='CASCADE'
+            )
+
+    # ### progress tracking for admin jobs run outside the request
+    op.create_table('background_jobs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('kind', sa.String(length=50), nullable=False),
+    sa.Column('target', sa.String(length=100), nullable=True),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('progress', sa.JSON(), nullable=True),
+    sa.Column('result', sa.JSON(), nullable=True),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('started_at', sa.DateTime(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade():
+    # ### drop background jobs and restore plain participant FKs
+    op.drop_table('background_jobs')
+
+    for table in PARTICIPANT_CHILD_TABLES:
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.drop_constraint(f'{table}_participant_id_fkey', type_='foreignkey')
+            batch_op.create_foreign_key(
+                f'{table}_participant_id_fkey', 'participants',
+                ['participant_id'], ['id']
+            )
@@ -0,0 +1,35 @@
+"""add snippet track columns
+
+Revision ID: a4d8e2f61c37
+Revises: c71f4e2a9b05
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'a4d8e2f61c37'
+down_revision = 'c71f4e2a9b05'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # ### separate video/audio tracks per snippet (pipeline --tracks mode) and poster frames
+    with op.batch_alter_table('snippets', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('video_track_filename', sa.String(length=500), nullable=True))
+        batch_op.add_column(sa.Column('audio_track_full', sa.String(length=500), nullable=True))
+        batch_op.add_column(sa.Column('audio_track_muffled', sa.String(length=500), nullable=True))
+        batch_op.add_column(sa.Column('audio_track_balanced', sa.String(length=500), nullable=True))
+        batch_op.add_column(sa.Column('poster_filename', sa.String(length=500), nullable=True))
+
+
+def downgrade():
+    # ### remove track columns
+    with op.batch_alter_table('snippets', schema=None) as batch_op:
+        batch_op.drop_column('poster_filename')
+        batch_op.drop_column('audio_track_balanced')
+        batch_op.drop_column('audio_track_muffled')
+        batch_op.drop_column('audio_track_full')
+        batch_op.drop_column('video_track_filename')
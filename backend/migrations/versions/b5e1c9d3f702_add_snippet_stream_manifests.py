@@ -0,0 +1,27 @@
+"""add snippet stream manifests
+
+Revision ID: b5e1c9d3f702
+Revises: a4d8e2f61c37
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'b5e1c9d3f702'
+down_revision = 'a4d8e2f61c37'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # ### HLS/DASH manifest URLs per audio type
+    with op.batch_alter_table('snippets', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('stream_manifests', sa.JSON(), nullable=True))
+
+
+def downgrade():
+    # ### remove stream manifests
+    with op.batch_alter_table('snippets', schema=None) as batch_op:
+        batch_op.drop_column('stream_manifests')
@@ -0,0 +1,35 @@
+"""add mcq score columns
+
+Revision ID: c71f4e2a9b05
+Revises: 9e4c1d7b3a58
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'c71f4e2a9b05'
+down_revision = '9e4c1d7b3a58'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # ### denormalized MCQ scores (filled at submit time, backfilled by scoring.py)
+    with op.batch_alter_table('snippet_responses', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('mcq_correct_mask', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('mcq_scorable_count', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('mcq_correct_count', sa.Integer(), nullable=True))
+        batch_op.create_index(batch_op.f('ix_snippet_responses_mcq_scorable_count'), ['mcq_scorable_count'], unique=False)
+        batch_op.create_index(batch_op.f('ix_snippet_responses_mcq_correct_count'), ['mcq_correct_count'], unique=False)
+
+
+def downgrade():
+    # ### remove MCQ score columns
+    with op.batch_alter_table('snippet_responses', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_snippet_responses_mcq_correct_count'))
+        batch_op.drop_index(batch_op.f('ix_snippet_responses_mcq_scorable_count'))
+        batch_op.drop_column('mcq_correct_count')
+        batch_op.drop_column('mcq_scorable_count')
+        batch_op.drop_column('mcq_correct_mask')
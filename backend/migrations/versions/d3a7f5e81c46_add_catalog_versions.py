@@ -0,0 +1,31 @@
+"""add catalog versions
+
+Revision ID: d3a7f5e81c46
+Revises: b5e1c9d3f702
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'd3a7f5e81c46'
+down_revision = 'b5e1c9d3f702'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # ### catalogue version bumped by the seeder on every change to videos/snippets
+    op.create_table('catalog_versions',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('manifest_hash', sa.String(length=64), nullable=False),
+    sa.Column('summary', sa.JSON(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade():
+    # ### remove catalog versions
+    op.drop_table('catalog_versions')
@@ -0,0 +1,93 @@
+"""align completion view with the live export
+
+Revision ID: e8b4c2d96f17
+Revises: f2c8a6d41b93
+Create Date: 2026-10-20 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'e8b4c2d96f17'
+down_revision = 'f2c8a6d41b93'
+branch_labels = None
+depends_on = None
+
+# must match analysis_views.REQUIRED_VIDEO_IDS (migrations do not import app modules)
+REQUIRED_VIDEO_IDS = [1, 2, 3, 4, 5]
+
+COMPLETION_VIEW_SQL = """
+    CREATE MATERIALIZED VIEW analysis_participant_completion AS
+    SELECT
+        p.id AS participant_db_id,
+        p.participant_id,
+        p.email,
+        p.created_at AS participant_created_at,
+        COALESCE(r.responses_submitted, 0) AS responses_submitted,
+        COALESCE(c.videos_calibrated, 0) AS videos_calibrated,
+        COALESCE(c.calibrated_video_ids, ARRAY[]::integer[]) AS calibrated_video_ids,
+        COALESCE(ss.total_session_seconds, 0) AS total_session_seconds,
+        {videos_total} AS videos_total,
+        {is_complete} AS is_complete{refreshed_at}
+    FROM participants p
+    LEFT JOIN (
+        SELECT participant_id, COUNT(*) AS responses_submitted
+        FROM snippet_responses
+        WHERE submitted_at IS NOT NULL
+        GROUP BY participant_id
+    ) r ON r.participant_id = p.id
+    LEFT JOIN (
+        SELECT vc.participant_id,
+               COUNT(DISTINCT vc.video_id) AS videos_calibrated,
+               ARRAY_AGG(DISTINCT vc.video_id) AS calibrated_video_ids
+        FROM volume_calibrations vc
+        {calibration_filter}
+        GROUP BY vc.participant_id
+    ) c ON c.participant_id = p.id
+    LEFT JOIN (
+        SELECT participant_id, SUM(total_duration_seconds) AS total_session_seconds
+        FROM video_sessions
+        GROUP BY participant_id
+    ) ss ON ss.participant_id = p.id
+    {extra_join}
+    WITH DATA
+    """
+
+def create_completion_view(**parts):
+    op.execute(COMPLETION_VIEW_SQL.format(**parts))
+    op.execute("CREATE UNIQUE INDEX ux_analysis_participant_completion_db_id ON analysis_participant_completion (participant_db_id)")
+    op.execute("CREATE INDEX ix_analysis_participant_completion_complete ON analysis_participant_completion (is_complete)")
+
+
+def upgrade():
+    # ### complete = calibrated every required video with a submitted response on it, as in export_all_data --live
+    # (counting all rows of videos made completion depend on how many videos were seeded)
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS analysis_participant_completion")
+    required = ', '.join(str(video_id) for video_id in REQUIRED_VIDEO_IDS)
+    create_completion_view(
+        videos_total=len(REQUIRED_VIDEO_IDS),
+        is_complete=f"COALESCE(c.calibrated_video_ids, ARRAY[]::integer[]) @> ARRAY[{required}]::integer[]",
+        calibration_filter="""WHERE EXISTS (
+            SELECT 1 FROM snippet_responses sr
+            JOIN snippets s ON s.id = sr.snippet_id
+            WHERE sr.participant_id = vc.participant_id
+                AND s.video_id = vc.video_id
+                AND sr.submitted_at IS NOT NULL
+        )""",
+        extra_join='',
+        # the view is a snapshot, so now() records when it was last refreshed
+        refreshed_at=',\n        now() AS refreshed_at',
+    )
+
+
+def downgrade():
+    # ### restore the count-based definition
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS analysis_participant_completion")
+    create_completion_view(
+        videos_total='t.videos_total',
+        is_complete='COALESCE(c.videos_calibrated, 0) >= t.videos_total',
+        calibration_filter='',
+        extra_join='CROSS JOIN (SELECT COUNT(*) AS videos_total FROM videos) t',
+        refreshed_at='',
+    )
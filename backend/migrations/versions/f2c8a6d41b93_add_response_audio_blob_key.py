@@ -0,0 +1,27 @@
+"""add response audio blob key
+
+Revision ID: f2c8a6d41b93
+Revises: d3a7f5e81c46
+Create Date: 2026-10-19 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'f2c8a6d41b93'
+down_revision = 'd3a7f5e81c46'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # ### pointer into the recording blob store (filled by recordings_backfill.py)
+    with op.batch_alter_table('snippet_responses', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('audio_blob_key', sa.String(length=100), nullable=True))
+
+
+def downgrade():
+    # ### remove blob pointer
+    with op.batch_alter_table('snippet_responses', schema=None) as batch_op:
+        batch_op.drop_column('audio_blob_key')
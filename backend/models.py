@@ -18,7 +18,8 @@ class Participant(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     
     # relationships
-    snippet_responses = db.relationship('SnippetResponse', backref='participant', lazy='dynamic', cascade='all, delete-orphan')
+    # children are removed by ON DELETE CASCADE, never loaded by the ORM
+    snippet_responses = db.relationship('SnippetResponse', backref='participant', lazy='dynamic', cascade='all, delete-orphan', passive_deletes=True)
     
     def to_dict(self):
         return {
@@ -78,6 +79,14 @@ class Snippet(db.Model):
     video_filename_full = db.Column(db.String(500))
     video_filename_muffled = db.Column(db.String(500))
     video_filename_balanced = db.Column(db.String(500))
+    # tracks mode: one video-only file plus an audio track per audio type
+    video_track_filename = db.Column(db.String(500))
+    audio_track_full = db.Column(db.String(500))
+    audio_track_muffled = db.Column(db.String(500))
+    audio_track_balanced = db.Column(db.String(500))
+    poster_filename = db.Column(db.String(500))
+    # adaptive streaming: {audio_type: {'hls': master.m3u8 URL, 'dash': manifest.mpd URL}}
+    stream_manifests = db.Column(JSON)
     duration = db.Column(db.Float)
     transcript_original = db.Column(db.Text)
     transcript_translated = db.Column(db.Text)
@@ -97,6 +106,10 @@ class Snippet(db.Model):
             'video_filename_full': self.video_filename_full,
             'video_filename_muffled': self.video_filename_muffled,
             'video_filename_balanced': self.video_filename_balanced,
+            'video_track_filename': self.video_track_filename,
+            'audio_tracks': self.audio_tracks(),
+            'poster_filename': self.poster_filename,
+            'stream_manifests': self.stream_manifests,
             'duration': self.duration,
             'transcript_original': self.transcript_original,
             'transcript_translated': self.transcript_translated,
@@ -104,6 +117,16 @@ class Snippet(db.Model):
             'is_calibration': self.is_calibration or False, 
         }
     
+    def audio_tracks(self):
+        """Audio track URL per audio type, or None when the snippet has no separate tracks"""
+        if not self.video_track_filename:
+            return None
+        return {
+            'full': self.audio_track_full,
+            'muffled': self.audio_track_muffled,
+            'balanced': self.audio_track_balanced,
+        }
+    
     def __repr__(self):
         return f'<Snippet {self.video_id}:{self.snippet_index}>'
 
@@ -114,10 +137,12 @@ class SnippetResponse(db.Model):
     __tablename__ = 'snippet_responses'
     
     id = db.Column(db.Integer, primary_key=True)
-    participant_id = db.Column(db.Integer, db.ForeignKey('participants.id'), nullable=False, index=True)
+    participant_id = db.Column(db.Integer, db.ForeignKey('participants.id', ondelete='CASCADE'), nullable=False, index=True)
     snippet_id = db.Column(db.Integer, db.ForeignKey('snippets.id'), nullable=False, index=True)
     audio_recording_path = db.Column(db.String(500)) # deprecated
     audio_recording_base64 = db.Column(db.Text)
+    # blob store key once the recording has moved out of the row (base64 wins while both are set)
+    audio_blob_key = db.Column(db.String(100))
     audio_mime_type = db.Column(db.String(50))
     audio_duration = db.Column(db.Float)
     mcq_answers = db.Column(JSON)
@@ -127,6 +152,11 @@ class SnippetResponse(db.Model):
     likert_confidence_conversation = db.Column(db.Integer, nullable=True)
     likert_nonlexical_preserved = db.Column(db.Integer, nullable=True)
 
+    # scored at submit time against the snippet's answer key (see scoring.py)
+    mcq_correct_mask = db.Column(db.Integer, nullable=True)  # bit i set = question i correct
+    mcq_scorable_count = db.Column(db.Integer, nullable=True, index=True)
+    mcq_correct_count = db.Column(db.Integer, nullable=True, index=True)
+
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     submitted_at = db.Column(db.DateTime, nullable=True, index=True)
     
@@ -141,6 +171,7 @@ class SnippetResponse(db.Model):
             'snippet_id': self.snippet_id,
             'audio_recording_path': self.audio_recording_path,
             'audio_recording_base64': self.audio_recording_base64,
+            'audio_blob_key': self.audio_blob_key,
             'audio_mime_type': self.audio_mime_type,
             'audio_duration': self.audio_duration,
             'mcq_answers': self.mcq_answers or [],
@@ -148,6 +179,9 @@ class SnippetResponse(db.Model):
             'likert_tone_difficulty': self.likert_tone_difficulty,
             'likert_confidence_conversation': self.likert_confidence_conversation,
             'likert_nonlexical_preserved': self.likert_nonlexical_preserved,
+            'mcq_correct_mask': self.mcq_correct_mask,
+            'mcq_scorable_count': self.mcq_scorable_count,
+            'mcq_correct_count': self.mcq_correct_count,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'submitted_at': self.submitted_at.isoformat() if self.submitted_at else None,
         }
@@ -162,7 +196,7 @@ class ParticipantAudioAssignment(db.Model):
     __tablename__ = 'participant_audio_assignments'
     
     id = db.Column(db.Integer, primary_key=True)
-    participant_id = db.Column(db.Integer, db.ForeignKey('participants.id'), nullable=False)
+    participant_id = db.Column(db.Integer, db.ForeignKey('participants.id', ondelete='CASCADE'), nullable=False)
     snippet_id = db.Column(db.Integer, db.ForeignKey('snippets.id'), nullable=False)
     audio_type = db.Column(db.String(20), nullable=False)  # 'full', 'muffled', or 'balanced'
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -188,7 +222,7 @@ class VolumeCalibration(db.Model):
     __tablename__ = 'volume_calibrations'
     
     id = db.Column(db.Integer, primary_key=True)
-    participant_id = db.Column(db.Integer, db.ForeignKey('participants.id'), nullable=False)
+    participant_id = db.Column(db.Integer, db.ForeignKey('participants.id', ondelete='CASCADE'), nullable=False)
     video_id = db.Column(db.Integer, db.ForeignKey('videos.id'), nullable=False)
     optimal_volume = db.Column(db.Float, nullable=False)  # 0.0 to 1.0
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -213,7 +247,7 @@ class VideoSession(db.Model):
     __tablename__ = 'video_sessions'
     
     id = db.Column(db.Integer, primary_key=True)
-    participant_id = db.Column(db.Integer, db.ForeignKey('participants.id'), nullable=False)
+    participant_id = db.Column(db.Integer, db.ForeignKey('participants.id', ondelete='CASCADE'), nullable=False)
     video_id = db.Column(db.Integer, db.ForeignKey('videos.id'), nullable=False)
     session_start = db.Column(db.DateTime, nullable=False)  # when first snippet opened
     session_end = db.Column(db.DateTime, nullable=True)  # when calibration submitted
@@ -237,4 +271,66 @@ class VideoSession(db.Model):
     def __repr__(self):
         return f'<VideoSession participant:{self.participant_id} video:{self.video_id}>'
 
-#----------------------------------------------------------------------#
\ No newline at end of file
+#----------------------------------------------------------------------#
+
+class BackgroundJob(db.Model):
+    """Track long-running admin operations that run outside the request"""
+    __tablename__ = 'background_jobs'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(50), nullable=False)  # e.g. 'purge_participant'
+    target = db.Column(db.String(100))
+    status = db.Column(db.String(20), nullable=False, default='pending')  # 'pending', 'running', 'done', 'failed'
+    progress = db.Column(JSON)
+    result = db.Column(JSON)
+    error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    started_at = db.Column(db.DateTime, nullable=True)
+    heartbeat_at = db.Column(db.DateTime, nullable=True)  # bumped on every progress report
+    finished_at = db.Column(db.DateTime, nullable=True)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'target': self.target,
+            'status': self.status,
+            'progress': self.progress or {},
+            'result': self.result,
+            'error': self.error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'heartbeat_at': self.heartbeat_at.isoformat() if self.heartbeat_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+        }
+    
+    def __repr__(self):
+        return f'<BackgroundJob {self.id} {self.kind}:{self.status}>'
+
+#----------------------------------------------------------------------#
+class CatalogVersion(db.Model):
+    """One row per seeder run that changed videos or snippets; the latest id is the catalogue version"""
+    __tablename__ = 'catalog_versions'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    manifest_hash = db.Column(db.String(64), nullable=False)
+    summary = db.Column(JSON)  # counts of inserted/updated/deleted rows
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    
+    @classmethod
+    def current(cls):
+        """Latest catalogue version (0 before the first seed)"""
+        return db.session.query(db.func.coalesce(db.func.max(cls.id), 0)).scalar()
+    
+    def to_dict(self):
+        return {
+            'version': self.id,
+            'manifest_hash': self.manifest_hash,
+            'summary': self.summary or {},
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+        }
+    
+    def __repr__(self):
+        return f'<CatalogVersion {self.id}>'
+
+#----------------------------------------------------------------------#
@@ -0,0 +1,265 @@
+"""
+Participant provisioning
+Collision-free participant ID allocation, bulk creation from a CSV of emails,
+and set-based removal of a participant with everything that references it
+"""
+
+import argparse
+import csv
+import hashlib
+import hmac
+import io
+import sys
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import insert
+from models import Participant
+from blob_store import blob_store_from_config, delete_unreferenced
+
+#----------------------------------------------------------------------#
+
+# format: C###L### (e.g., C205B201) -> 1000 * 26 * 1000 possible IDs
+ID_SPACE = 1000 * 26 * 1000
+
+# balanced Feistel network over 26 bits (2^26 >= ID_SPACE), cycle-walked into ID_SPACE
+FEISTEL_HALF_BITS = 13
+FEISTEL_HALF_MASK = (1 << FEISTEL_HALF_BITS) - 1
+FEISTEL_ROUNDS = 4
+
+MAX_BULK_EMAILS = 5000
+MAX_ALLOCATION_ATTEMPTS = 3
+
+# child tables purged before the participant row, each in short batched transactions
+PURGE_TABLES = [
+    'snippet_responses',
+    'participant_audio_assignments',
+    'video_sessions',
+    'volume_calibrations',
+]
+PURGE_BATCH_SIZE = 500
+
+#----------------------------------------------------------------------#
+
+def _feistel_round(key, round_index, value):
+    digest = hmac.new(key, f'{round_index}:{value}'.encode(), hashlib.sha256).digest()
+    return int.from_bytes(digest[:4], 'big') & FEISTEL_HALF_MASK
+
+def _feistel(key, value):
+    left, right = value >> FEISTEL_HALF_BITS, value & FEISTEL_HALF_MASK
+    for round_index in range(FEISTEL_ROUNDS):
+        left, right = right, left ^ _feistel_round(key, round_index, right)
+    return (left << FEISTEL_HALF_BITS) | right
+
+def permute_code(counter, key):
+    """
+    Keyed bijection on [0, ID_SPACE)
+    Distinct counters always give distinct codes, so sequential counters
+    produce random-looking IDs without any existence checks
+    """
+    if not 0 <= counter < ID_SPACE:
+        raise ValueError('Participant ID space exhausted')
+
+    value = _feistel(key, counter)
+    while value >= ID_SPACE:
+        value = _feistel(key, value)
+    return value
+
+def format_participant_id(code):
+    """Render a code in [0, ID_SPACE) as C###L###"""
+    prefix, rest = divmod(code, 26 * 1000)
+    letter, suffix = divmod(rest, 1000)
+    return f'C{prefix:03d}{chr(ord("A") + letter)}{suffix:03d}'
+
+def allocate_participant_ids(session, count):
+    """Reserve count counters from participant_code_seq in one round trip and permute them"""
+    counters = session.execute(
+        text("SELECT nextval('participant_code_seq') FROM generate_series(1, :n)"),
+        {'n': count}
+    ).scalars().all()
+
+    key = current_app.config['PARTICIPANT_ID_KEY'].encode()
+    return [format_participant_id(permute_code(counter, key)) for counter in counters]
+
+#----------------------------------------------------------------------#
+
+def parse_email_csv(content):
+    """
+    Read emails from CSV text
+    Uses the 'email' column when there is a header row, otherwise the first column
+    """
+    rows = list(csv.reader(io.StringIO(content)))
+    if not rows:
+        return []
+
+    header = [cell.strip().lower() for cell in rows[0]]
+    if 'email' in header:
+        column = header.index('email')
+        rows = rows[1:]
+    else:
+        column = 0
+
+    return [row[column] if len(row) > column else '' for row in rows if any(cell.strip() for cell in row)]
+
+def provision_participants(session, emails):
+    """
+    Create one participant per email with a single multi-row INSERT
+    Returns one result per input row:
+      { row, email, status: 'created'|'conflict'|'invalid'|'error', participant_id?, id?, error? }
+    """
+    if len(emails) > MAX_BULK_EMAILS:
+        raise ValueError(f'At most {MAX_BULK_EMAILS} emails per request')
+
+    results = []
+    pending = []
+    seen = set()
+
+    for row_number, raw_email in enumerate(emails, start=1):
+        email = (raw_email or '').strip()
+        if not email or '@' not in email:
+            results.append({'row': row_number, 'email': email, 'status': 'invalid', 'error': 'Invalid email'})
+        elif email in seen:
+            results.append({'row': row_number, 'email': email, 'status': 'conflict', 'error': 'Duplicate email in upload'})
+        else:
+            seen.add(email)
+            pending.append((row_number, email))
+
+    attempts = 0
+    while pending and attempts < MAX_ALLOCATION_ATTEMPTS:
+        attempts += 1
+
+        # emails already registered are reported, not inserted
+        existing = {email for (email,) in session.query(Participant.email).filter(
+            Participant.email.in_([email for _, email in pending])
+        )}
+        remaining = []
+        for row_number, email in pending:
+            if email in existing:
+                results.append({'row': row_number, 'email': email, 'status': 'conflict', 'error': 'Email already exists'})
+            else:
+                remaining.append((row_number, email))
+        pending = remaining
+        if not pending:
+            break
+
+        participant_ids = allocate_participant_ids(session, len(pending))
+        now = datetime.utcnow()
+        table = Participant.__table__
+        stmt = insert(table).values([
+            {'participant_id': participant_id, 'email': email, 'created_at': now}
+            for (_, email), participant_id in zip(pending, participant_ids)
+        ]).on_conflict_do_nothing().returning(table.c.id, table.c.participant_id, table.c.email)
+        inserted = {row.email: row for row in session.execute(stmt)}
+
+        # rows skipped by ON CONFLICT either raced on email (reported next pass)
+        # or hit an ID issued by the old random generator (retried with a fresh ID)
+        remaining = []
+        for row_number, email in pending:
+            if email in inserted:
+                row = inserted[email]
+                results.append({
+                    'row': row_number,
+                    'email': email,
+                    'status': 'created',
+                    'id': row.id,
+                    'participant_id': row.participant_id,
+                    'created_at': now.isoformat()
+                })
+            else:
+                remaining.append((row_number, email))
+        pending = remaining
+
+    for row_number, email in pending:
+        results.append({'row': row_number, 'email': email, 'status': 'error', 'error': 'Could not allocate a unique participant ID'})
+
+    session.commit()
+    results.sort(key=lambda result: result['row'])
+    return results
+
+def purge_participant(session, participant_db_id, report=None, batch_size=PURGE_BATCH_SIZE, store=None):
+    """
+    Delete a participant and all of its rows without loading them
+    Children go in primary-key batches so no transaction holds long locks;
+    ON DELETE CASCADE catches anything inserted mid-purge
+    Recordings in the blob store that no other response shares are removed last
+    Returns {'deleted': {table: row_count}, 'blobs_deleted': count}
+    """
+    deleted = {table: 0 for table in PURGE_TABLES}
+
+    # the keys are gone with the rows, so collect them first
+    blob_keys = [row[0] for row in session.execute(text(
+        "SELECT DISTINCT audio_blob_key FROM snippet_responses "
+        "WHERE participant_id = :pid AND audio_blob_key IS NOT NULL"
+    ), {'pid': participant_db_id})]
+    session.commit()
+
+    for table in PURGE_TABLES:
+        while True:
+            result = session.execute(text(
+                f"DELETE FROM {table} WHERE id IN "
+                f"(SELECT id FROM {table} WHERE participant_id = :pid ORDER BY id LIMIT :batch_size)"
+            ), {'pid': participant_db_id, 'batch_size': batch_size})
+            session.commit()
+
+            if result.rowcount == 0:
+                break
+            deleted[table] += result.rowcount
+            if report:
+                report(table=table, deleted=dict(deleted))
+
+    session.execute(text("DELETE FROM participants WHERE id = :pid"), {'pid': participant_db_id})
+    session.commit()
+    if report:
+        report(table='participants', deleted=dict(deleted))
+
+    blobs_deleted = 0
+    if blob_keys:
+        # the rows are already gone; a blob left behind is only wasted space
+        try:
+            store = store or blob_store_from_config(current_app.config)
+            blobs_deleted = len(delete_unreferenced(session, store, blob_keys))
+        except Exception as e:
+            session.rollback()
+            print(f"    WARNING: could not delete recordings of participant {participant_db_id}: {e}")
+
+    return {'deleted': deleted, 'blobs_deleted': blobs_deleted}
+
+#----------------------------------------------------------------------#
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Create participants in bulk from a CSV of emails',
+    )
+    parser.add_argument('csv_file', help='CSV with an email column (or one email per line)')
+    parser.add_argument('--output', default=None,
+                       help='Write created participant_id,email pairs to this CSV')
+    args = parser.parse_args()
+
+    from app import create_app
+    from models import db
+
+    with open(args.csv_file, newline='', encoding='utf-8') as f:
+        emails = parse_email_csv(f.read())
+
+    app = create_app()
+    with app.app_context():
+        try:
+            results = provision_participants(db.session, emails)
+        except Exception as e:
+            db.session.rollback()
+            print(f"\n✗ Error provisioning participants: {e}")
+            sys.exit(1)
+
+    created = [r for r in results if r['status'] == 'created']
+    print(f"  > Created {len(created)}/{len(results)} participants")
+    for result in results:
+        if result['status'] != 'created':
+            print(f"    - row {result['row']} {result['email']}: {result['error']}")
+
+    if args.output:
+        with open(args.output, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(['participant_id', 'email'])
+            for result in created:
+                writer.writerow([result['participant_id'], result['email']])
+        print(f"  > Wrote {args.output}")
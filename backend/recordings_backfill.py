@@ -0,0 +1,271 @@
+"""
+Recording backfill
+Moves audio_recording_base64 out of snippet_responses into the blob store while
+the study is live. Rows are walked in primary-key batches; blobs are written
+outside any transaction and each batch's pointer updates commit in one short
+transaction under a lock timeout, so submissions are never stuck behind the
+backfill and at most one batch of recordings is in memory. Progress is
+checkpointed after every batch and a rerun resumes where the last one stopped.
+Blobs written for rows resubmitted mid-batch are deleted again unless shared.
+Ends with a table-size report and VACUUM recommendation
+"""
+
+import argparse
+import base64
+import binascii
+import hashlib
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from blob_store import lock_blob_key, delete_unreferenced
+
+#----------------------------------------------------------------------#
+
+DEFAULT_BATCH_SIZE = 20          # rows (and recordings) held in memory at once
+DEFAULT_PAUSE_SECONDS = 0.5
+DEFAULT_CHECKPOINT = 'recordings_backfill_checkpoint.json'
+
+LOCK_TIMEOUT = '2s'
+MAX_LOCK_RETRIES = 5
+
+#----------------------------------------------------------------------#
+
+def load_checkpoint(path):
+    """Saved progress, or a fresh one (also after a completed pass, to pick up newer rows)"""
+    if os.path.exists(path):
+        with open(path, 'r') as f:
+            checkpoint = json.load(f)
+        if not checkpoint.get('completed'):
+            return checkpoint
+    return {
+        'last_id': 0,
+        'max_id': None,
+        'migrated': 0,
+        'bytes': 0,
+        'changed_during_backfill': 0,
+        'undecodable_ids': [],
+        'started_at': datetime.utcnow().isoformat(),
+        'completed': False,
+    }
+
+def save_checkpoint(path, checkpoint):
+    checkpoint['updated_at'] = datetime.utcnow().isoformat()
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'w') as f:
+        json.dump(checkpoint, f, indent=2)
+    os.replace(temp_path, path)
+
+#----------------------------------------------------------------------#
+
+def fetch_batch(session, after_id, max_id, batch_size):
+    rows = session.execute(text(
+        "SELECT id, audio_recording_base64, audio_mime_type FROM snippet_responses "
+        "WHERE id > :after_id AND id <= :max_id AND audio_recording_base64 IS NOT NULL "
+        "ORDER BY id LIMIT :batch_size"
+    ), {'after_id': after_id, 'max_id': max_id, 'batch_size': batch_size}).fetchall()
+    # end the read transaction before the slow part so no snapshot is held open
+    session.commit()
+    return rows
+
+def store_batch(store, rows):
+    """
+    Write each recording to the blob store
+    Returns ([(id, key, md5 of the base64 text, byte count)], [undecodable ids])
+    """
+    stored, undecodable = [], []
+    for row in rows:
+        try:
+            data = base64.b64decode(row.audio_recording_base64, validate=True)
+        except (binascii.Error, ValueError):
+            undecodable.append(row.id)
+            continue
+        key = store.put(data, row.audio_mime_type)
+        # postgres md5() over the same text guards against a resubmission mid-batch
+        digest = hashlib.md5(row.audio_recording_base64.encode('utf-8')).hexdigest()
+        stored.append((row.id, key, digest, len(data)))
+    return stored, undecodable
+
+def point_batch(session, store, stored):
+    """
+    Swap base64 for blob keys in one short transaction; returns the ids updated
+    Each key is locked and its blob checked first: put() may have reused a blob
+    that delete_unreferenced removed since, and such rows keep their base64
+    """
+    for attempt in range(MAX_LOCK_RETRIES):
+        try:
+            session.execute(text(f"SET LOCAL lock_timeout = '{LOCK_TIMEOUT}'"))
+            updated = []
+            for response_id, key, digest, _ in stored:
+                lock_blob_key(session, key)
+                if not store.exists(key):
+                    continue
+                result = session.execute(text(
+                    "UPDATE snippet_responses SET audio_blob_key = :key, audio_recording_base64 = NULL "
+                    "WHERE id = :id AND audio_recording_base64 IS NOT NULL "
+                    "AND md5(audio_recording_base64) = :digest"
+                ), {'key': key, 'id': response_id, 'digest': digest})
+                if result.rowcount:
+                    updated.append(response_id)
+            session.commit()
+            return updated
+        except OperationalError as e:
+            session.rollback()
+            if getattr(e.orig, 'pgcode', None) != '55P03' or attempt == MAX_LOCK_RETRIES - 1:
+                raise
+            # a submission holds the row or a purge the key; back off and retry (blob writes are idempotent)
+            time.sleep(2 ** attempt)
+
+def backfill(session, store, checkpoint_path=DEFAULT_CHECKPOINT, batch_size=DEFAULT_BATCH_SIZE,
+             pause=DEFAULT_PAUSE_SECONDS, max_mb_per_second=None, limit=None):
+    """
+    Move recordings up to the current max id into the blob store, resuming from the checkpoint
+    Rows submitted after the pass started are left for the next run
+    """
+    checkpoint = load_checkpoint(checkpoint_path)
+    if checkpoint['max_id'] is None:
+        checkpoint['max_id'] = session.execute(text("SELECT COALESCE(MAX(id), 0) FROM snippet_responses")).scalar()
+        session.commit()
+    checkpoint['store'] = store.describe()
+    print(f"  > Backfilling ids {checkpoint['last_id'] + 1}..{checkpoint['max_id']} into {store.describe()}")
+
+    processed = 0
+    while limit is None or processed < limit:
+        started = time.monotonic()
+        size = batch_size if limit is None else min(batch_size, limit - processed)
+        rows = fetch_batch(session, checkpoint['last_id'], checkpoint['max_id'], size)
+        if not rows:
+            checkpoint['completed'] = True
+            break
+
+        stored, undecodable = store_batch(store, rows)
+        updated = set(point_batch(session, store, stored)) if stored else set()
+        batch_bytes = sum(entry[3] for entry in stored)
+
+        # rows resubmitted mid-batch keep their new recording; drop the blobs written for the old one
+        orphaned = [key for response_id, key, _, _ in stored if response_id not in updated]
+        if orphaned:
+            delete_unreferenced(session, store, sorted(set(orphaned)))
+
+        checkpoint['last_id'] = rows[-1].id
+        checkpoint['migrated'] += len(updated)
+        checkpoint['bytes'] += sum(entry[3] for entry in stored if entry[0] in updated)
+        checkpoint['changed_during_backfill'] += len(orphaned)
+        checkpoint['undecodable_ids'] += undecodable
+        save_checkpoint(checkpoint_path, checkpoint)
+        processed += len(rows)
+        del rows, stored, updated
+
+        print(f"    > up to id {checkpoint['last_id']}: {checkpoint['migrated']} migrated, "
+              f"{checkpoint['bytes'] / 1e6:.1f} MB")
+
+        # throttle: fixed pause, stretched further if over the byte budget
+        wait = pause
+        if max_mb_per_second:
+            wait = max(wait, batch_bytes / (max_mb_per_second * 1e6) - (time.monotonic() - started))
+        if wait > 0:
+            time.sleep(wait)
+
+    save_checkpoint(checkpoint_path, checkpoint)
+    return checkpoint
+
+#----------------------------------------------------------------------#
+
+def vacuum_report(session):
+    """Table sizes, dead tuples and what to run now that the base64 text is gone"""
+    sizes = session.execute(text(
+        "SELECT pg_total_relation_size(c.oid) AS total_bytes, pg_relation_size(c.oid) AS heap_bytes, "
+        "COALESCE(pg_total_relation_size(NULLIF(c.reltoastrelid, 0)), 0) AS toast_bytes "
+        "FROM pg_class c WHERE c.oid = 'snippet_responses'::regclass"
+    )).mappings().one()
+    stats = session.execute(text(
+        "SELECT n_live_tup, n_dead_tup, last_vacuum, last_autovacuum "
+        "FROM pg_stat_user_tables WHERE relname = 'snippet_responses'"
+    )).mappings().first() or {}
+    remaining = session.execute(text(
+        "SELECT COUNT(*) FROM snippet_responses WHERE audio_recording_base64 IS NOT NULL"
+    )).scalar()
+    session.commit()
+
+    report = {
+        **{key: int(value) for key, value in sizes.items()},
+        'live_rows': stats.get('n_live_tup'),
+        'dead_rows': stats.get('n_dead_tup'),
+        'last_vacuum': str(stats.get('last_vacuum') or stats.get('last_autovacuum') or ''),
+        'rows_still_inline': remaining,
+        'recommendations': [
+            'VACUUM (ANALYZE, VERBOSE) snippet_responses;  -- online; makes the freed TOAST space reusable',
+            'VACUUM FULL snippet_responses;  -- returns the space to the OS but takes an ACCESS EXCLUSIVE '
+            'lock for the whole rewrite: run in a maintenance window, or use pg_repack to stay online',
+        ],
+    }
+    if remaining:
+        report['recommendations'].insert(0, f'{remaining} rows still hold base64 (submitted since the pass '
+                                            'started or undecodable): rerun the backfill first')
+    return report
+
+def print_vacuum_report(report):
+    print(f"\n  snippet_responses: {report['total_bytes'] / 1e6:.1f} MB total "
+          f"({report['heap_bytes'] / 1e6:.1f} MB heap, {report['toast_bytes'] / 1e6:.1f} MB TOAST)")
+    print(f"  Live rows {report['live_rows']}, dead rows {report['dead_rows']}, "
+          f"last vacuum {report['last_vacuum'] or 'never'}")
+    print("  Recommended:")
+    for recommendation in report['recommendations']:
+        print(f"    - {recommendation}")
+
+#----------------------------------------------------------------------#
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Move base64 recordings out of snippet_responses into the blob store (resumable)',
+    )
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                       help=f'Rows per batch (default: {DEFAULT_BATCH_SIZE})')
+    parser.add_argument('--pause', type=float, default=DEFAULT_PAUSE_SECONDS,
+                       help=f'Seconds to sleep between batches (default: {DEFAULT_PAUSE_SECONDS})')
+    parser.add_argument('--max-mb-per-second', type=float, default=None,
+                       help='Cap on recording bytes moved per second')
+    parser.add_argument('--limit', type=int, default=None, help='Stop after this many rows (this run)')
+    parser.add_argument('--checkpoint', default=DEFAULT_CHECKPOINT,
+                       help=f'Checkpoint file (default: {DEFAULT_CHECKPOINT})')
+    parser.add_argument('--restart', action='store_true', help='Ignore the checkpoint and start a new pass')
+    parser.add_argument('--report', default=None, help='Also write the VACUUM report as JSON')
+    args = parser.parse_args()
+
+    from app import create_app
+    from models import db
+    from blob_store import blob_store_from_config
+
+    if args.restart and os.path.exists(args.checkpoint):
+        os.remove(args.checkpoint)
+
+    app = create_app()
+    with app.app_context():
+        try:
+            checkpoint = backfill(db.session, blob_store_from_config(app.config), args.checkpoint,
+                                  args.batch_size, args.pause, args.max_mb_per_second, args.limit)
+            report = vacuum_report(db.session)
+        except KeyboardInterrupt:
+            db.session.rollback()
+            print(f"\n  Interrupted; progress saved to {args.checkpoint}, rerun to resume")
+            sys.exit(130)
+        except Exception as e:
+            db.session.rollback()
+            print(f"\n✗ Error backfilling recordings: {e}")
+            sys.exit(1)
+
+    state = 'complete' if checkpoint['completed'] else f"paused at id {checkpoint['last_id']}"
+    print(f"\n  Backfill {state}: {checkpoint['migrated']} recordings, {checkpoint['bytes'] / 1e6:.1f} MB moved")
+    if checkpoint['changed_during_backfill']:
+        print(f"    - {checkpoint['changed_during_backfill']} resubmitted mid-batch, left for the next pass")
+    if checkpoint['undecodable_ids']:
+        print(f"    - {len(checkpoint['undecodable_ids'])} undecodable, left in place: {checkpoint['undecodable_ids'][:20]}")
+    print_vacuum_report(report)
+
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump({'backfill': checkpoint, 'vacuum': report}, f, indent=2)
+        print(f"  > Wrote {args.report}")
@@ -0,0 +1,229 @@
+"""
+Recording archive export
+Streams every participant recording matching a filter into a tar or zip file,
+decoding audio_recording_base64 a block at a time (or streaming it from the blob
+store once backfilled) and fetching rows through a server-side cursor so memory stays bounded however many recordings there are
+An index.csv describing every file is written as the last member
+"""
+
+import argparse
+import base64
+import csv
+import io
+import sys
+import tarfile
+import zipfile
+from flask import current_app
+from sqlalchemy import and_, or_, select
+from blob_store import MIME_EXTENSIONS, blob_store_from_config
+from models import db, Participant, Video, Snippet, SnippetResponse, ParticipantAudioAssignment
+
+#----------------------------------------------------------------------#
+
+# rows held in memory at once (each carries one base64 recording)
+FETCH_BATCH_SIZE = 20
+
+# base64 characters decoded per block; must stay a multiple of 4
+DECODE_BLOCK_SIZE = 4 * 64 * 1024
+
+INDEX_COLUMNS = [
+    'filename', 'response_id', 'participant_id', 'video_id', 'snippet_index',
+    'audio_type', 'mime_type', 'audio_duration', 'submitted_at', 'bytes',
+]
+
+#----------------------------------------------------------------------#
+
+class Base64Reader:
+    """Read-only file object that decodes a base64 string on demand"""
+
+    def __init__(self, data):
+        self.data = data
+        self.position = 0
+        self.pending = b''
+
+    def read(self, size=-1):
+        while (size < 0 or len(self.pending) < size) and self.position < len(self.data):
+            block = self.data[self.position:self.position + DECODE_BLOCK_SIZE]
+            self.position += DECODE_BLOCK_SIZE
+            self.pending += base64.b64decode(block)
+
+        if size < 0:
+            chunk, self.pending = self.pending, b''
+        else:
+            chunk, self.pending = self.pending[:size], self.pending[size:]
+        return chunk
+
+class ChunkBuffer:
+    """Unseekable sink that collects written bytes until drained"""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+def decoded_size(data):
+    """Byte length of a base64 string once decoded"""
+    return len(data) * 3 // 4 - data[-2:].count('=')
+
+def recording_filename(row):
+    extension = MIME_EXTENSIONS.get((row.audio_mime_type or '').split(';')[0], 'bin')
+    audio_type = row.audio_type or 'calibration'
+    return f"{row.participant_id}/video{row.video_id}_snippet{row.snippet_index}_{audio_type}.{extension}"
+
+#----------------------------------------------------------------------#
+
+def recordings_query(participant_id=None, video_id=None, audio_type=None):
+    """Recordings matching the filter, in response id order"""
+    stmt = select(
+        SnippetResponse.id,
+        Participant.participant_id,
+        Video.video_id,
+        Snippet.snippet_index,
+        ParticipantAudioAssignment.audio_type,
+        SnippetResponse.audio_mime_type,
+        SnippetResponse.audio_duration,
+        SnippetResponse.submitted_at,
+        SnippetResponse.audio_recording_base64,
+        SnippetResponse.audio_blob_key,
+    ).join(
+        Participant, Participant.id == SnippetResponse.participant_id
+    ).join(
+        Snippet, Snippet.id == SnippetResponse.snippet_id
+    ).join(
+        Video, Video.id == Snippet.video_id
+    ).outerjoin(
+        ParticipantAudioAssignment, and_(
+            ParticipantAudioAssignment.participant_id == SnippetResponse.participant_id,
+            ParticipantAudioAssignment.snippet_id == SnippetResponse.snippet_id
+        )
+    ).where(or_(
+        SnippetResponse.audio_recording_base64.isnot(None),
+        SnippetResponse.audio_blob_key.isnot(None)
+    ))
+
+    if participant_id:
+        stmt = stmt.where(Participant.participant_id == participant_id)
+    if video_id is not None:
+        stmt = stmt.where(Video.video_id == video_id)
+    if audio_type:
+        stmt = stmt.where(ParticipantAudioAssignment.audio_type == audio_type)
+
+    return stmt.order_by(SnippetResponse.id)
+
+def open_recording(row, store):
+    """(reader, size) for a row's recording, from the row itself or the blob store"""
+    if row.audio_recording_base64 is not None:
+        return Base64Reader(row.audio_recording_base64), decoded_size(row.audio_recording_base64)
+    return store.open(row.audio_blob_key), store.size(row.audio_blob_key)
+
+def iter_archive(session, fileobj, fmt='tar', store=None, **filters):
+    """
+    Write matching recordings into an archive on fileobj
+    Yields the running file count after each member so callers can flush
+    """
+    if store is None:
+        store = blob_store_from_config(current_app.config)
+    result = session.execute(recordings_query(**filters).execution_options(yield_per=FETCH_BATCH_SIZE))
+    index_rows = []
+
+    if fmt == 'zip':
+        archive = zipfile.ZipFile(fileobj, mode='w', compression=zipfile.ZIP_STORED)
+    else:
+        archive = tarfile.open(fileobj=fileobj, mode='w|')
+
+    try:
+        for row in result:
+            filename = recording_filename(row)
+            reader, size = open_recording(row, store)
+
+            try:
+                if fmt == 'zip':
+                    with archive.open(filename, mode='w', force_zip64=True) as member:
+                        while chunk := reader.read(DECODE_BLOCK_SIZE):
+                            member.write(chunk)
+                else:
+                    info = tarfile.TarInfo(filename)
+                    info.size = size
+                    if row.submitted_at:
+                        info.mtime = int(row.submitted_at.timestamp())
+                    archive.addfile(info, reader)
+            finally:
+                if hasattr(reader, 'close'):
+                    reader.close()
+
+            index_rows.append([
+                filename, row.id, row.participant_id, row.video_id, row.snippet_index,
+                row.audio_type or '', row.audio_mime_type or '', row.audio_duration or '',
+                row.submitted_at.isoformat() if row.submitted_at else '', size,
+            ])
+            yield len(index_rows)
+
+        index = io.StringIO()
+        writer = csv.writer(index)
+        writer.writerow(INDEX_COLUMNS)
+        writer.writerows(index_rows)
+        index_bytes = index.getvalue().encode('utf-8')
+
+        if fmt == 'zip':
+            archive.writestr('index.csv', index_bytes)
+        else:
+            info = tarfile.TarInfo('index.csv')
+            info.size = len(index_bytes)
+            archive.addfile(info, io.BytesIO(index_bytes))
+    finally:
+        archive.close()
+        result.close()
+
+    yield len(index_rows)
+
+def stream_archive(session, fmt='tar', **filters):
+    """Generator of archive bytes for a streaming HTTP response"""
+    buffer = ChunkBuffer()
+    for _ in iter_archive(session, buffer, fmt, **filters):
+        data = buffer.drain()
+        if data:
+            yield data
+    data = buffer.drain()
+    if data:
+        yield data
+
+#----------------------------------------------------------------------#
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Export participant recordings to a tar or zip archive',
+    )
+    parser.add_argument('output', help='Archive path (.tar or .zip)')
+    parser.add_argument('--participant', default=None, help='Participant ID (e.g. C205B201)')
+    parser.add_argument('--video', type=int, default=None, help='Video number')
+    parser.add_argument('--audio-type', choices=['full', 'muffled', 'balanced'], default=None)
+    args = parser.parse_args()
+
+    fmt = 'zip' if args.output.lower().endswith('.zip') else 'tar'
+
+    from app import create_app
+
+    app = create_app()
+    with app.app_context():
+        try:
+            with open(args.output, 'wb') as f:
+                count = 0
+                for count in iter_archive(db.session, f, fmt, participant_id=args.participant,
+                                          video_id=args.video, audio_type=args.audio_type):
+                    if count and count % 100 == 0:
+                        print(f"  > {count} recordings written")
+        except Exception as e:
+            print(f"\n✗ Error exporting recordings: {e}")
+            sys.exit(1)
+
+        print(f"\n  Exported {count} recordings to {args.output}")
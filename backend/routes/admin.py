@@ -1,15 +1,23 @@
-import random
-import string
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import create_access_token, jwt_required, get_jwt
+from flask import Blueprint, request, jsonify, current_app, Response, stream_with_context
+from flask_jwt_extended import create_access_token, jwt_required, get_jwt, verify_jwt_in_request
 from datetime import datetime, timedelta
-from models import db, Participant
+from sqlalchemy import func, or_, select
+from models import db, Participant, SnippetResponse, VolumeCalibration, VideoSession, BackgroundJob, ParticipantAudioAssignment
+from analysis_views import refresh_analysis_views, fetch_participant_completion
+from provisioning import provision_participants, parse_email_csv, purge_participant, MAX_BULK_EMAILS
+from jobs import start_job, mark_if_stale
+from metrics import render_prometheus
+from recordings_export import stream_archive
+import hmac
 import os
 
 #----------------------------------------------------------------------#
 
 admin_bp = Blueprint('admin', __name__)
 
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
 #----------------------------------------------------------------------#
 
 @admin_bp.route('/login', methods=['POST'])
@@ -32,12 +40,90 @@ def admin_login():
 @admin_bp.route('/participants', methods=['GET'])
 @jwt_required()
 def list_all_participants():
+    """
+    Keyset-paginated participant listing with progress aggregates
+    Query params: limit, after (last id of the previous page), q (search id or email)
+    Returns: { participants: [...], next_cursor: id|null }
+    """
     claims = get_jwt()
     if claims.get('role') != 'admin':
         return jsonify({'error': 'Unauthorized'}), 403
     
-    participants = Participant.query.all()
-    return jsonify([p.to_dict() for p in participants]), 200
+    limit = min(max(request.args.get('limit', DEFAULT_PAGE_SIZE, type=int), 1), MAX_PAGE_SIZE)
+    after = request.args.get('after', type=int)
+    search = (request.args.get('q') or '').strip()
+    
+    # keyset page of participants: WHERE id > after ORDER BY id LIMIT n+1
+    page_query = Participant.query
+    if search:
+        # match the text literally: escape LIKE wildcards (and the escape char itself)
+        escaped = search.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        pattern = f'%{escaped}%'
+        page_query = page_query.filter(or_(
+            Participant.participant_id.ilike(pattern, escape='\\'),
+            Participant.email.ilike(pattern, escape='\\')
+        ))
+    if after:
+        page_query = page_query.filter(Participant.id > after)
+    page = page_query.order_by(Participant.id).limit(limit + 1).subquery()
+    page_ids = select(page.c.id)
+    
+    # per-participant aggregates, grouped only over the participants on this page
+    responses = db.session.query(
+        SnippetResponse.participant_id,
+        func.count(SnippetResponse.id).label('responses_submitted')
+    ).filter(
+        SnippetResponse.submitted_at.isnot(None),
+        SnippetResponse.participant_id.in_(page_ids)
+    ).group_by(SnippetResponse.participant_id).subquery()
+    
+    calibrations = db.session.query(
+        VolumeCalibration.participant_id,
+        func.count(VolumeCalibration.id).label('videos_calibrated')
+    ).filter(
+        VolumeCalibration.participant_id.in_(page_ids)
+    ).group_by(VolumeCalibration.participant_id).subquery()
+    
+    sessions = db.session.query(
+        VideoSession.participant_id,
+        func.sum(VideoSession.total_duration_seconds).label('total_session_seconds')
+    ).filter(
+        VideoSession.participant_id.in_(page_ids)
+    ).group_by(VideoSession.participant_id).subquery()
+    
+    rows = db.session.query(
+        page.c.id,
+        page.c.participant_id,
+        page.c.email,
+        page.c.created_at,
+        func.coalesce(responses.c.responses_submitted, 0).label('responses_submitted'),
+        func.coalesce(calibrations.c.videos_calibrated, 0).label('videos_calibrated'),
+        func.coalesce(sessions.c.total_session_seconds, 0).label('total_session_seconds'),
+    ).outerjoin(
+        responses, responses.c.participant_id == page.c.id
+    ).outerjoin(
+        calibrations, calibrations.c.participant_id == page.c.id
+    ).outerjoin(
+        sessions, sessions.c.participant_id == page.c.id
+    ).order_by(page.c.id).all()
+    
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = rows[-1].id
+    
+    return jsonify({
+        'participants': [{
+            'id': row.id,
+            'participant_id': row.participant_id,
+            'email': row.email,
+            'created_at': row.created_at.isoformat() if row.created_at else None,
+            'responses_submitted': row.responses_submitted,
+            'videos_calibrated': row.videos_calibrated,
+            'total_session_seconds': float(row.total_session_seconds or 0),
+        } for row in rows],
+        'next_cursor': next_cursor
+    }), 200
 
 @admin_bp.route('/participants', methods=['POST'])
 @jwt_required()
@@ -53,42 +139,84 @@ def admin_create_participant():
         if not email:
             return jsonify({'error': 'Email is required'}), 400
         
-        # check if email already exists
-        existing = Participant.query.filter_by(email=email).first()
-        if existing:
-            return jsonify({'error': 'Email already exists'}), 400
-        
-        # generate unique participant ID
-        while True:
-            # format: C###L### (e.g., C205B201)
-            participant_id = 'C' + ''.join(random.choices(string.digits, k=3)) + \
-                           random.choice(string.ascii_uppercase) + \
-                           ''.join(random.choices(string.digits, k=3))
-            
-            # check if this ID already exists
-            if not Participant.query.filter_by(participant_id=participant_id).first():
-                break
-        
-        participant = Participant(
-            participant_id=participant_id,
-            email=email,
-            created_at=datetime.utcnow()
-        )
-        
-        db.session.add(participant)
-        db.session.commit()
+        # IDs come from the collision-free allocator, see provisioning.py
+        result = provision_participants(db.session, [email])[0]
+        if result['status'] != 'created':
+            return jsonify({'error': result['error']}), 400
         
         return jsonify({
-            'id': participant.id,
-            'participant_id': participant.participant_id,
-            'email': participant.email,
-            'created_at': participant.created_at.isoformat()
+            'id': result['id'],
+            'participant_id': result['participant_id'],
+            'email': result['email'],
+            'created_at': result['created_at']
         }), 201
         
     except Exception as e:
         db.session.rollback()
         print(f"Error creating participant: {e}")
         return jsonify({'error': str(e)}), 500
+
+@admin_bp.route('/participants/bulk', methods=['POST'])
+@jwt_required()
+def admin_bulk_create_participants():
+    """
+    Create participants from a CSV of emails in one request
+    Accepts a multipart 'file' upload, or JSON { csv: '...' } / { emails: [...] }
+    Returns per-row results so conflicts can be fixed and re-uploaded
+    """
+    claims = get_jwt()
+    if claims.get('role') != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 403
+    
+    if 'file' in request.files:
+        try:
+            emails = parse_email_csv(request.files['file'].read().decode('utf-8-sig'))
+        except UnicodeDecodeError:
+            return jsonify({'error': 'CSV file must be UTF-8 encoded (in Excel, save as "CSV UTF-8")'}), 400
+    else:
+        data = request.get_json(silent=True)
+        if data is None:
+            data = {}
+        if not isinstance(data, dict):
+            return jsonify({'error': 'Request body must be a JSON object'}), 400
+        if 'emails' in data:
+            emails = data['emails']
+            if not isinstance(emails, list):
+                return jsonify({'error': 'emails must be a list of strings'}), 400
+            invalid = [
+                {'row': row, 'value': email}
+                for row, email in enumerate(emails, start=1)
+                if not isinstance(email, str)
+            ]
+            if invalid:
+                return jsonify({
+                    'error': f'{len(invalid)} emails are not strings',
+                    'invalid': invalid[:50]
+                }), 400
+        else:
+            csv_text = data.get('csv', '')
+            if not isinstance(csv_text, str):
+                return jsonify({'error': 'csv must be a string'}), 400
+            emails = parse_email_csv(csv_text)
+    
+    if not emails:
+        return jsonify({'error': 'No emails provided'}), 400
+    if len(emails) > MAX_BULK_EMAILS:
+        return jsonify({'error': f'At most {MAX_BULK_EMAILS} emails per request'}), 400
+    
+    try:
+        results = provision_participants(db.session, emails)
+    except Exception as e:
+        db.session.rollback()
+        print(f"Error bulk creating participants: {e}")
+        return jsonify({'error': str(e)}), 500
+    
+    created = sum(1 for r in results if r['status'] == 'created')
+    return jsonify({
+        'created': created,
+        'failed': len(results) - created,
+        'results': results
+    }), 200
     
 
 @admin_bp.route('/participants/<int:participant_db_id>', methods=['DELETE'])
@@ -100,12 +228,140 @@ def delete_participant(participant_db_id):
     
     participant = Participant.query.get_or_404(participant_db_id)
     
+    # purge runs set-based in the background; poll /jobs/<id> for progress
     try:
-        db.session.delete(participant)
-        db.session.commit()
-        return jsonify({'message': 'Participant deleted'}), 200
+        job = start_job(
+            'purge_participant',
+            participant.participant_id,
+            lambda report: purge_participant(db.session, participant_db_id, report=report)
+        )
+        return jsonify({'message': 'Participant deletion started', 'job': job.to_dict()}), 202
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+@admin_bp.route('/jobs/<int:job_id>', methods=['GET'])
+@jwt_required()
+def get_job(job_id):
+    claims = get_jwt()
+    if claims.get('role') != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 403
+    
+    job = BackgroundJob.query.get_or_404(job_id)
+    if mark_if_stale(job):
+        print(f"Job {job.id} ({job.kind}) marked failed: {job.error}")
+    return jsonify(job.to_dict()), 200
+
+@admin_bp.route('/analysis-views/refresh', methods=['POST'])
+@jwt_required()
+def refresh_views():
+    claims = get_jwt()
+    if claims.get('role') != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 403
+    
+    data = request.get_json(silent=True) or {}
+    concurrently = data.get('concurrently', True)
+    
+    try:
+        timings = refresh_analysis_views(db.session, concurrently=concurrently)
+        return jsonify({'refreshed': timings}), 200
+    except Exception as e:
+        db.session.rollback()
+        print(f"Error refreshing analysis views: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@admin_bp.route('/analysis-views/completion', methods=['GET'])
+@jwt_required()
+def participant_completion():
+    claims = get_jwt()
+    if claims.get('role') != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 403
+    
+    complete_only = request.args.get('complete_only', 'false').lower() == 'true'
+    rows = fetch_participant_completion(db.session, complete_only=complete_only)
+    
+    return jsonify([{
+        'id': row.participant_db_id,
+        'participant_id': row.participant_id,
+        'email': row.email,
+        'created_at': row.participant_created_at.isoformat() if row.participant_created_at else None,
+        'responses_submitted': row.responses_submitted,
+        'videos_calibrated': row.videos_calibrated,
+        'videos_total': row.videos_total,
+        'total_session_seconds': row.total_session_seconds,
+        'is_complete': row.is_complete,
+    } for row in rows]), 200
+
+@admin_bp.route('/accuracy', methods=['GET'])
+@jwt_required()
+def mcq_accuracy_by_audio_type():
+    """MCQ accuracy per audio type from the denormalized score columns"""
+    claims = get_jwt()
+    if claims.get('role') != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 403
+    
+    rows = db.session.query(
+        ParticipantAudioAssignment.audio_type,
+        func.count(SnippetResponse.id).label('responses'),
+        func.sum(SnippetResponse.mcq_correct_count).label('correct'),
+        func.sum(SnippetResponse.mcq_scorable_count).label('scorable')
+    ).join(
+        ParticipantAudioAssignment,
+        (ParticipantAudioAssignment.participant_id == SnippetResponse.participant_id) &
+        (ParticipantAudioAssignment.snippet_id == SnippetResponse.snippet_id)
+    ).filter(
+        SnippetResponse.submitted_at.isnot(None),
+        SnippetResponse.mcq_scorable_count > 0
+    ).group_by(ParticipantAudioAssignment.audio_type).all()
+    
+    return jsonify([{
+        'audio_type': row.audio_type,
+        'responses': row.responses,
+        'correct': int(row.correct or 0),
+        'scorable': int(row.scorable or 0),
+        'accuracy_percent': round(100 * row.correct / row.scorable, 2) if row.scorable else None,
+    } for row in rows]), 200
+
+@admin_bp.route('/recordings/archive', methods=['GET'])
+@jwt_required()
+def download_recordings_archive():
+    """
+    Stream recordings as a tar (default) or zip archive with an index.csv
+    Query params: participant_id, video_id, audio_type, format=tar|zip
+    """
+    claims = get_jwt()
+    if claims.get('role') != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 403
+    
+    fmt = request.args.get('format', 'tar')
+    if fmt not in ('tar', 'zip'):
+        return jsonify({'error': 'format must be tar or zip'}), 400
+    
+    filters = {
+        'participant_id': request.args.get('participant_id'),
+        'video_id': request.args.get('video_id', type=int),
+        'audio_type': request.args.get('audio_type'),
+    }
+    
+    mimetype = 'application/zip' if fmt == 'zip' else 'application/x-tar'
+    return Response(
+        stream_with_context(stream_archive(db.session, fmt, **filters)),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename=recordings.{fmt}'}
+    )
+
+@admin_bp.route('/metrics', methods=['GET'])
+def metrics():
+    """Prometheus text metrics; accepts METRICS_TOKEN as a bearer token or an admin JWT"""
+    metrics_token = current_app.config.get('METRICS_TOKEN')
+    # compared as bytes: str compare_digest raises on non-ASCII, which a client can send
+    supplied = request.headers.get('Authorization', '').encode('latin-1', 'replace')
+    if not (metrics_token and hmac.compare_digest(supplied, f'Bearer {metrics_token}'.encode())):
+        verify_jwt_in_request()
+        claims = get_jwt()
+        if claims.get('role') != 'admin':
+            return jsonify({'error': 'Unauthorized'}), 403
+    
+    return Response(render_prometheus(), mimetype='text/plain; version=0.0.4')
+
 #----------------------------------------------------------------------#
\ No newline at end of file
@@ -1,5 +1,7 @@
-from flask import Blueprint, request, jsonify
-from models import db, Participant, Video, Snippet, SnippetResponse
+from flask import Blueprint, request, jsonify, current_app
+from models import db, Participant, Video, Snippet, SnippetResponse, CatalogVersion
+from scoring import apply_score, sync_answer_keys
+from blob_store import blob_store_from_config, delete_unreferenced
 from datetime import datetime
 from flask_jwt_extended import jwt_required, get_jwt_identity
 import os
@@ -28,14 +30,19 @@ def create_response():
     if not snippet:
         return jsonify({'error': 'Snippet not found'}), 404
     
+    sync_answer_keys(CatalogVersion.current())
+
     # check if response already exists
     existing = SnippetResponse.query.filter_by(
         participant_id=participant.id,
         snippet_id=snippet.id
     ).first()
     
+    replaced_blob_key = None
     if existing:
+        replaced_blob_key = existing.audio_blob_key
         existing.audio_recording_base64 = data.get('audio_recording_base64')
+        existing.audio_blob_key = None  # the new recording replaces any backfilled one
         existing.audio_mime_type = data.get('audio_mime_type')
         existing.audio_recording_path = data.get('audio_recording_path') # deprecated
         existing.audio_duration = data.get('audio_duration', 0.0)
@@ -45,6 +52,7 @@ def create_response():
         existing.likert_confidence_conversation = data.get('likert_confidence_conversation')
         existing.likert_nonlexical_preserved = data.get('likert_nonlexical_preserved')
         existing.submitted_at = datetime.utcnow()
+        apply_score(existing, snippet)
     else:
         response = SnippetResponse(
             participant_id=participant.id,
@@ -60,9 +68,19 @@ def create_response():
             likert_nonlexical_preserved=data.get('likert_nonlexical_preserved'),
             submitted_at=datetime.utcnow()
         )
+        apply_score(response, snippet)
         db.session.add(response)
     
     db.session.commit()
+
+    # the resubmission replaced a backfilled recording; drop its blob unless another response shares it
+    if replaced_blob_key:
+        try:
+            delete_unreferenced(db.session, blob_store_from_config(current_app.config), [replaced_blob_key])
+        except Exception as e:
+            db.session.rollback()
+            print(f"WARNING: could not delete replaced recording {replaced_blob_key}: {e}")
+
     return jsonify({'success': True}), 201
 
 @responses_bp.route('/<int:response_id>', methods=['GET'])
@@ -106,6 +124,19 @@ def get_participant_video_responses(participant_id, video_id):
         SnippetResponse.snippet_id.in_(snippet_ids)
     ).all()
 
-    return jsonify([r.to_dict() for r in responses])
+    results = [r.to_dict() for r in responses]
+
+    # recordings moved to the blob store are returned inline as before
+    backfilled = [result for result in results if result['audio_recording_base64'] is None and result['audio_blob_key']]
+    if backfilled:
+        store = blob_store_from_config(current_app.config)
+        for result in backfilled:
+            try:
+                result['audio_recording_base64'] = base64.b64encode(store.read(result['audio_blob_key'])).decode('ascii')
+            except Exception as e:
+                # one lost recording should not hide the participant's other responses
+                print(f"WARNING: could not read recording {result['audio_blob_key']} of response {result['id']}: {e}")
+
+    return jsonify(results)
 
 #----------------------------------------------------------------------#
\ No newline at end of file
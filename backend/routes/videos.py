@@ -1,5 +1,5 @@
 from flask import Blueprint, request, jsonify
-from models import db, Video, Snippet, ParticipantAudioAssignment, Participant
+from models import db, Video, Snippet, ParticipantAudioAssignment, Participant, CatalogVersion
 from datetime import datetime
 from flask_jwt_extended import jwt_required, get_jwt_identity
 import random
@@ -10,11 +10,20 @@ videos_bp = Blueprint('videos', __name__)
 
 #----------------------------------------------------------------------#
 
+def catalog_response(payload):
+    """JSON tagged with the catalogue version, so clients revalidate and get a 304 until the next reseed"""
+    response = jsonify(payload)
+    response.set_etag(f'catalog-{CatalogVersion.current()}')
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response.make_conditional(request)
+
+#----------------------------------------------------------------------#
+
 @videos_bp.route('/', methods=['GET'])
 @jwt_required()
 def list_videos():
     videos = Video.query.all()
-    return jsonify([{
+    return catalog_response([{
         'id': v.id,
         'video_id': v.video_id,
         'title': v.title,
@@ -33,10 +42,10 @@ def get_video(video_id):
     
     snippets = Snippet.query.filter_by(video_id=video.id).order_by(Snippet.snippet_index).all()
     
-    return jsonify({
+    return catalog_response({
         **video.to_dict(),
         'snippets': [s.to_dict() for s in snippets]
-    }), 200
+    })
 
 @videos_bp.route('/<int:video_id>/snippets', methods=['GET'])
 @jwt_required()
@@ -46,12 +55,16 @@ def get_snippets(video_id):
         return jsonify({'error': 'Video not found'}), 404
     
     snippets = Snippet.query.filter_by(video_id=video.id).order_by(Snippet.snippet_index).all()
-    return jsonify([{
+    return catalog_response([{
         'id': s.id,
         'snippet_index': s.snippet_index,
         'video_filename_full': s.video_filename_full,
         'video_filename_muffled': s.video_filename_muffled,
         'video_filename_balanced': s.video_filename_balanced,
+        'video_track_filename': s.video_track_filename,
+        'audio_tracks': s.audio_tracks(),
+        'poster_filename': s.poster_filename,
+        'stream_manifests': s.stream_manifests,
         'duration': s.duration,
         'transcript_original': s.transcript_original,
         'transcript_translated': s.transcript_translated,
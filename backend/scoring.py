@@ -0,0 +1,137 @@
+"""
+MCQ scoring
+Scores submitted answers against each snippet's answer key so accuracy
+becomes a plain SQL aggregate over snippet_responses
+Run directly to backfill scores for existing responses
+"""
+
+import argparse
+import sys
+from sqlalchemy import update
+from models import db, Snippet, SnippetResponse
+
+#----------------------------------------------------------------------#
+
+BACKFILL_BATCH_SIZE = 1000
+
+# snippet_id -> tuple of correct answer indices (None = not scorable, e.g. tone questions)
+_answer_keys = {}
+# catalogue version the cached keys were built from
+_catalog_version = None
+
+#----------------------------------------------------------------------#
+
+def answer_key_for(snippet):
+    """Cached answer key for a snippet"""
+    key = _answer_keys.get(snippet.id)
+    if key is None:
+        key = tuple(q.get('correct_answer') for q in (snippet.mcq_questions or []))
+        _answer_keys[snippet.id] = key
+    return key
+
+def clear_answer_keys():
+    """Drop cached answer keys (call after snippets are reseeded)"""
+    _answer_keys.clear()
+
+def sync_answer_keys(catalog_version):
+    """Drop cached answer keys if the catalogue was reseeded since they were built (e.g. by another process)"""
+    global _catalog_version
+    if catalog_version != _catalog_version:
+        _answer_keys.clear()
+        _catalog_version = catalog_version
+
+def score_answers(answers, answer_key):
+    """
+    Compare answers against an answer key
+    Returns (correct_mask, scorable_count, correct_count); bit i of the mask
+    is set when question i was answered correctly
+    """
+    answers = answers or []
+    correct_mask = 0
+    scorable_count = 0
+    correct_count = 0
+
+    for i, expected in enumerate(answer_key):
+        if expected is None:
+            continue
+        scorable_count += 1
+        if i < len(answers) and answers[i] == expected:
+            correct_mask |= 1 << i
+            correct_count += 1
+
+    return correct_mask, scorable_count, correct_count
+
+def apply_score(response, snippet):
+    """Fill a response's score columns from its mcq_answers"""
+    response.mcq_correct_mask, response.mcq_scorable_count, response.mcq_correct_count = \
+        score_answers(response.mcq_answers, answer_key_for(snippet))
+
+#----------------------------------------------------------------------#
+
+def backfill_scores(session, rescore=False, batch_size=BACKFILL_BATCH_SIZE, snippet_ids=None):
+    """
+    Score existing responses in primary-key batches
+    Only id, snippet_id and mcq_answers are read, never the audio columns
+    snippet_ids limits the pass to responses to those snippets (e.g. after their answer keys changed)
+    Returns the number of rows updated
+    """
+    snippets = {s.id: s for s in session.query(Snippet).all()}
+    last_id = 0
+    updated = 0
+
+    while True:
+        query = session.query(
+            SnippetResponse.id, SnippetResponse.snippet_id, SnippetResponse.mcq_answers
+        ).filter(SnippetResponse.id > last_id)
+        if not rescore:
+            query = query.filter(SnippetResponse.mcq_scorable_count.is_(None))
+        if snippet_ids is not None:
+            query = query.filter(SnippetResponse.snippet_id.in_(snippet_ids))
+        rows = query.order_by(SnippetResponse.id).limit(batch_size).all()
+
+        if not rows:
+            break
+
+        params = []
+        for row in rows:
+            mask, scorable, correct = score_answers(row.mcq_answers, answer_key_for(snippets[row.snippet_id]))
+            params.append({
+                'id': row.id,
+                'mcq_correct_mask': mask,
+                'mcq_scorable_count': scorable,
+                'mcq_correct_count': correct,
+            })
+
+        session.execute(update(SnippetResponse), params)
+        session.commit()
+
+        updated += len(rows)
+        last_id = rows[-1].id
+        print(f"  > Scored {updated} responses (through id {last_id})")
+
+    return updated
+
+#----------------------------------------------------------------------#
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Backfill MCQ score columns on snippet_responses',
+    )
+    parser.add_argument('--rescore', action='store_true',
+                       help='Rescore every response, not only unscored ones')
+    parser.add_argument('--batch-size', type=int, default=BACKFILL_BATCH_SIZE,
+                       help=f'Rows per batch (default: {BACKFILL_BATCH_SIZE})')
+    args = parser.parse_args()
+
+    from app import create_app
+
+    app = create_app()
+    with app.app_context():
+        try:
+            total = backfill_scores(db.session, rescore=args.rescore, batch_size=args.batch_size)
+        except Exception as e:
+            db.session.rollback()
+            print(f"\n✗ Error backfilling scores: {e}")
+            sys.exit(1)
+
+        print(f"\n  Backfilled scores for {total} responses")
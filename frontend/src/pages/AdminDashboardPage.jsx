@@ -4,8 +4,13 @@ import { adminAPI } from '../services/api';
 import Modal from '../components/Modal';
 import ConfirmModal from '../components/ConfirmModal';
 
+const JOB_POLL_INTERVAL_MS = 1000;
+const JOB_POLL_TIMEOUT_MS = 15 * 60 * 1000;
+
 function AdminDashboardPage() {
   const [participants, setParticipants] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [search, setSearch] = useState('');
   const [showCreateModal, setShowCreateModal] = useState(false);
   const [newEmail, setNewEmail] = useState('');
   const [loading, setLoading] = useState(false);
@@ -22,15 +27,29 @@ function AdminDashboardPage() {
     loadParticipants();
   }, []);
 
-  const loadParticipants = async () => {
+  // load the first page (or the next page when append is set)
+  const loadParticipants = async (append = false) => {
     try {
-      const response = await adminAPI.listParticipants();
-      setParticipants(response.data);
+      const params = { q: search || undefined };
+      if (append && nextCursor) {
+        params.after = nextCursor;
+      }
+      const response = await adminAPI.listParticipants(params);
+      const page = response.data.participants;
+      setParticipants((prev) => (append ? [...prev, ...page] : page));
+      setNextCursor(response.data.next_cursor);
     } catch (err) {
       console.error('Error loading participants:', err);
     }
   };
 
+  const handleSearch = (e) => {
+    e.preventDefault();
+    loadParticipants();
+  };
+
+  const formatMinutes = (seconds) => `${(seconds / 60).toFixed(1)} min`;
+
   const handleCreateParticipant = async (e) => {
     e.preventDefault();
     setLoading(true);
@@ -48,9 +67,31 @@ function AdminDashboardPage() {
     }
   };
 
+  // deletion runs as a background job on the server; poll until it finishes
+  // (the server fails jobs whose worker died, the deadline covers everything else)
+  const waitForJob = async (jobId, timeoutMs = JOB_POLL_TIMEOUT_MS) => {
+    const deadline = Date.now() + timeoutMs;
+    while (Date.now() < deadline) {
+      const response = await adminAPI.getJob(jobId);
+      if (response.data.status === 'done' || response.data.status === 'failed') {
+        return response.data;
+      }
+      await new Promise((resolve) => setTimeout(resolve, JOB_POLL_INTERVAL_MS));
+    }
+    return {
+      id: jobId,
+      status: 'failed',
+      error: `Still running after ${Math.round(timeoutMs / 60000)} minutes; refresh later to check whether it finished`,
+    };
+  };
+
   const handleDelete = async () => {
     try {
-      await adminAPI.deleteParticipant(deleteConfirm.id);
+      const response = await adminAPI.deleteParticipant(deleteConfirm.id);
+      const job = await waitForJob(response.data.job.id);
+      if (job.status === 'failed') {
+        alert(`Failed to delete participant: ${job.error || 'Unknown error'}`);
+      }
       await loadParticipants();
     } catch (err) {
       alert(`Failed to delete participant: ${err.response?.data?.error || 'Unknown error'}`);
@@ -85,8 +126,23 @@ function AdminDashboardPage() {
         <div className="bg-white rounded-xl shadow-lg p-6">
           <div className="flex items-center justify-between mb-6">
             <h2 className="text-xl font-bold text-gray-800">
-              Participants ({participants.length})
+              Participants ({participants.length}{nextCursor ? '+' : ''})
             </h2>
+            <form onSubmit={handleSearch} className="flex gap-2">
+              <input
+                type="text"
+                value={search}
+                onChange={(e) => setSearch(e.target.value)}
+                placeholder="Search ID or email"
+                className="px-4 py-2 border border-gray-300 rounded-lg focus:ring-2 focus:ring-indigo-500 focus:border-transparent outline-none"
+              />
+              <button
+                type="submit"
+                className="bg-gray-200 hover:bg-gray-300 text-gray-800 font-semibold px-4 py-2 rounded-lg transition"
+              >
+                Search
+              </button>
+            </form>
             <button
               onClick={() => setShowCreateModal(true)}
               className="bg-indigo-600 hover:bg-indigo-700 text-white font-semibold px-6 py-2 rounded-lg transition"
@@ -108,6 +164,15 @@ function AdminDashboardPage() {
                   <th className="px-6 py-3 text-left text-xs font-medium text-gray-500 uppercase tracking-wider">
                     Created
                   </th>
+                  <th className="px-6 py-3 text-left text-xs font-medium text-gray-500 uppercase tracking-wider">
+                    Responses
+                  </th>
+                  <th className="px-6 py-3 text-left text-xs font-medium text-gray-500 uppercase tracking-wider">
+                    Videos Calibrated
+                  </th>
+                  <th className="px-6 py-3 text-left text-xs font-medium text-gray-500 uppercase tracking-wider">
+                    Session Time
+                  </th>
                   <th className="px-6 py-3 text-left text-xs font-medium text-gray-500 uppercase tracking-wider">
                     Actions
                   </th>
@@ -129,6 +194,11 @@ function AdminDashboardPage() {
                     <td className="px-6 py-4 whitespace-nowrap text-sm text-gray-500">
                       {new Date(p.created_at).toLocaleDateString()}
                     </td>
+                    <td className="px-6 py-4 whitespace-nowrap text-sm">{p.responses_submitted}</td>
+                    <td className="px-6 py-4 whitespace-nowrap text-sm">{p.videos_calibrated}</td>
+                    <td className="px-6 py-4 whitespace-nowrap text-sm text-gray-500">
+                      {formatMinutes(p.total_session_seconds)}
+                    </td>
                     <td className="px-6 py-4 whitespace-nowrap">
                       <button
                         onClick={() => setDeleteConfirm({ show: true, id: p.id, email: p.email })}
@@ -147,6 +217,17 @@ function AdminDashboardPage() {
                 No participants yet. Create one to get started.
               </div>
             )}
+
+            {nextCursor && (
+              <div className="text-center pt-6">
+                <button
+                  onClick={() => loadParticipants(true)}
+                  className="bg-gray-200 hover:bg-gray-300 text-gray-800 font-semibold px-6 py-2 rounded-lg transition"
+                >
+                  Load more
+                </button>
+              </div>
+            )}
           </div>
         </div>
       </div>
@@ -34,6 +34,7 @@ function VideoPlayerPage() {
   const [showSubmitConfirm, setShowSubmitConfirm] = useState(false);
   const [showCustomControls, setShowCustomControls] = useState(true);
   const videoRef = useRef(null);
+  const trackAudioRef = useRef(null);
 
   const mediaRecorderRef = useRef(null);
   const recordedChunksRef = useRef([]);
@@ -92,11 +93,19 @@ function VideoPlayerPage() {
         }
     };
 
+    // volume applies to the separate audio track too when the snippet uses one
+    const setPlaybackVolume = (value) => {
+        videoRef.current.volume = value;
+        if (trackAudioRef.current) {
+            trackAudioRef.current.volume = value;
+        }
+    };
+
     const handleVolumeChange = (e) => {
         const newVolume = parseFloat(e.target.value);
         setVolume(newVolume);
         if (videoRef.current) {
-            videoRef.current.volume = newVolume;
+            setPlaybackVolume(newVolume);
             setIsMuted(newVolume === 0);
         }
     };
@@ -104,10 +113,10 @@ function VideoPlayerPage() {
     const toggleMute = () => {
         if (videoRef.current) {
             if (isMuted) {
-                videoRef.current.volume = volume || 0.5;
+                setPlaybackVolume(volume || 0.5);
                 setIsMuted(false);
             } else {
-                videoRef.current.volume = 0;
+                setPlaybackVolume(0);
                 setIsMuted(true);
             }
         }
@@ -193,6 +202,56 @@ function VideoPlayerPage() {
     ? existingResponses[currentSnippetId]
     : null;
 
+  // tracks mode: a video-only file plus the assigned audio track, played in a hidden element
+  const assignedAudioType = currentSnippet
+    ? audioAssignments[currentSnippet.id] || "balanced"
+    : null;
+  const trackAudioSrc = currentSnippet?.video_track_filename && currentSnippet?.audio_tracks
+    ? currentSnippet.audio_tracks[assignedAudioType]
+    : null;
+
+  useEffect(() => {
+    const videoElement = videoRef.current;
+    const audio = trackAudioRef.current;
+
+    if (!videoElement || !audio || !trackAudioSrc) return;
+
+    const syncAudioToVideo = () => {
+        // keep audio synced with video playback position
+        if (Math.abs(audio.currentTime - videoElement.currentTime) > 0.3) {
+            audio.currentTime = videoElement.currentTime;
+        }
+    };
+
+    const handlePlay = () => {
+        audio.currentTime = videoElement.currentTime;
+        audio.play().catch(e => console.error("Audio play error:", e));
+    };
+
+    const handlePause = () => {
+        audio.pause();
+    };
+
+    const handleSeeked = () => {
+        audio.currentTime = videoElement.currentTime;
+    };
+
+    audio.volume = videoElement.volume;
+    videoElement.addEventListener('timeupdate', syncAudioToVideo);
+    videoElement.addEventListener('play', handlePlay);
+    videoElement.addEventListener('pause', handlePause);
+    videoElement.addEventListener('ended', handlePause);
+    videoElement.addEventListener('seeked', handleSeeked);
+
+    return () => {
+        videoElement.removeEventListener('timeupdate', syncAudioToVideo);
+        videoElement.removeEventListener('play', handlePlay);
+        videoElement.removeEventListener('pause', handlePause);
+        videoElement.removeEventListener('ended', handlePause);
+        videoElement.removeEventListener('seeked', handleSeeked);
+    };
+  }, [currentSnippetId, trackAudioSrc]);
+
   useEffect(() => {
     if (participantId && video) {
       loadExistingResponses(participantId);
@@ -644,14 +703,26 @@ const handleNext = () => {
                 onKeyDown={handleKeyDown}
                 onContextMenu={(e) => e.preventDefault()}
                 onDoubleClick={(e) => e.preventDefault()}
+                poster={currentSnippet.poster_filename || undefined}
                 src={
-                audioAssignments[currentSnippet.id] 
+                trackAudioSrc
+                    ? currentSnippet.video_track_filename
+                    : audioAssignments[currentSnippet.id] 
                     ? currentSnippet[`video_filename_${audioAssignments[currentSnippet.id]}`]
                     : currentSnippet.video_filename_balanced
                 }
             >
                 Your browser does not support the video tag.
             </video>
+
+            {trackAudioSrc && (
+                <audio
+                    ref={trackAudioRef}
+                    preload="auto"
+                    style={{ display: 'none' }}
+                    src={trackAudioSrc}
+                />
+            )}
             
             {showCustomControls && (
                 <div className="absolute bottom-0 left-0 right-0 bg-gradient-to-t from-black/90 to-transparent pt-8 pb-2 px-3">
@@ -80,9 +80,10 @@ export const responseAPI = {
 
 export const adminAPI = {
   login: (password) => api.post("/admin/login", { password }),
-  listParticipants: () => api.get("/admin/participants"),
+  listParticipants: (params = {}) => api.get("/admin/participants", { params }),
   createParticipant: (data) => api.post("/admin/participants", data),
   deleteParticipant: (id) => api.delete(`/admin/participants/${id}`),
+  getJob: (jobId) => api.get(`/admin/jobs/${jobId}`),
 };
 
 export const calibrationAPI = {
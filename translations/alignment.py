@@ -0,0 +1,140 @@
+"""
+Delay estimation between an original video and its Azure dub
+Decodes both soundtracks to low-rate mono, reduces them to energy envelopes and
+finds the offset with an FFT cross-correlation. The dub is then delayed so its
+speech trails the original by the target lag rather than by a fixed 5s
+"""
+
+import os
+import subprocess
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+from tqdm import tqdm
+from build_manifest import content_hash
+
+#----------------------------------------------------------------------#
+
+# bump when the estimator changes so cached delays are recomputed
+ALIGNMENT_VERSION = 1
+
+ALIGN_SAMPLE_RATE = 8000
+ENVELOPE_RATE = 100            # envelope frames per second (10ms)
+ANALYSIS_SECONDS = 180         # only the opening of each track is compared
+MAX_OFFSET_SECONDS = 15.0      # search window either side of zero
+
+# below this normalized correlation the estimate is ignored
+MIN_CONFIDENCE = 0.2
+
+DEFAULT_TARGET_LAG = 5.0
+MAX_DELAY_SECONDS = 10.0
+
+#----------------------------------------------------------------------#
+
+def decode_mono(path, sample_rate=ALIGN_SAMPLE_RATE, max_seconds=ANALYSIS_SECONDS):
+    """Decode an audio track to a float32 mono array through an ffmpeg pipe"""
+    result = subprocess.run([
+        'ffmpeg', '-v', 'error',
+        '-i', path,
+        '-t', str(max_seconds),
+        '-vn',
+        '-ac', '1',
+        '-ar', str(sample_rate),
+        '-f', 's16le',
+        '-'
+    ], capture_output=True)
+
+    if result.returncode != 0:
+        raise Exception(f"Audio decode failed: {result.stderr.decode(errors='replace')}")
+
+    return np.frombuffer(result.stdout, dtype=np.int16).astype(np.float32) / 32768.0
+
+def energy_envelope(samples, sample_rate=ALIGN_SAMPLE_RATE, envelope_rate=ENVELOPE_RATE):
+    """Zero-mean, unit-variance RMS envelope at envelope_rate frames per second"""
+    frame = sample_rate // envelope_rate
+    frames = len(samples) // frame
+    if frames == 0:
+        return np.zeros(0, dtype=np.float32)
+
+    rms = np.sqrt(np.mean(samples[:frames * frame].reshape(frames, frame) ** 2, axis=1))
+    envelope = np.log1p(rms * 100)
+    std = envelope.std()
+    return (envelope - envelope.mean()) / std if std > 0 else envelope - envelope.mean()
+
+def cross_correlate(reference, other):
+    """
+    Full cross-correlation via rfft; index k holds sum(reference[t] * other[t + k]),
+    with negative lags wrapped to the end of the array
+    """
+    n = 1 << int(np.ceil(np.log2(len(reference) + len(other) - 1)))
+    spectrum = np.fft.rfft(other, n) * np.conj(np.fft.rfft(reference, n))
+    return np.fft.irfft(spectrum, n)
+
+def estimate_offset(reference, other, envelope_rate=ENVELOPE_RATE, max_offset=MAX_OFFSET_SECONDS):
+    """
+    Seconds by which `other` trails `reference` (negative when it leads),
+    plus the normalized correlation at that lag as a confidence in [0, 1]
+    """
+    if len(reference) == 0 or len(other) == 0:
+        return 0.0, 0.0
+
+    correlation = cross_correlate(reference, other)
+    max_lag = min(int(max_offset * envelope_rate), len(correlation) // 2 - 1)
+
+    lags = np.arange(-max_lag, max_lag + 1)
+    window = correlation[lags]
+    best = int(np.argmax(window))
+
+    norm = np.sqrt(np.dot(reference, reference) * np.dot(other, other))
+    confidence = float(window[best] / norm) if norm > 0 else 0.0
+    return float(lags[best] / envelope_rate), max(confidence, 0.0)
+
+def choose_delay(offset, confidence, target_lag=DEFAULT_TARGET_LAG):
+    """Extra delay for the dub so it trails the original by target_lag"""
+    if confidence < MIN_CONFIDENCE:
+        return target_lag
+    return float(min(max(target_lag - offset, 0.0), MAX_DELAY_SECONDS))
+
+#----------------------------------------------------------------------#
+
+def align_pair(original_video, azure_video):
+    """Process-pool worker: estimate the dub's offset for one pair"""
+    reference = energy_envelope(decode_mono(original_video))
+    other = energy_envelope(decode_mono(azure_video))
+    offset, confidence = estimate_offset(reference, other)
+    return {'offset_seconds': round(offset, 3), 'confidence': round(confidence, 4)}
+
+def alignment_key(original_video, azure_video, manifest):
+    return (f"{content_hash(original_video, manifest)[:16]}:"
+            f"{content_hash(azure_video, manifest)[:16]}:v{ALIGNMENT_VERSION}")
+
+def align_pairs(pairs, manifest, target_lag=DEFAULT_TARGET_LAG, jobs=None):
+    """
+    Delay in seconds for each (original, azure) pair
+    Offsets are read from manifest['alignment'] when both inputs are unchanged;
+    the rest are estimated in parallel and stored back into the manifest
+    """
+    cache = manifest.setdefault('alignment', {})
+    keys = {pair: alignment_key(*pair, manifest) for pair in pairs}
+    pending = [pair for pair in pairs if keys[pair] not in cache]
+
+    print(f"\n  Alignment: {len(pairs) - len(pending)} cached, {len(pending)} to estimate")
+
+    if pending:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = {pool.submit(align_pair, *pair): pair for pair in pending}
+            for future in tqdm(as_completed(futures), total=len(futures), desc="Aligning", unit="pair"):
+                pair = futures[future]
+                name = os.path.basename(pair[0])
+                try:
+                    cache[keys[pair]] = {'video': name, **future.result()}
+                except Exception as e:
+                    print(f"    WARNING: alignment failed for {name}, using {target_lag}s: {e}")
+
+    delays = {}
+    for pair in pairs:
+        entry = cache.get(keys[pair])
+        if entry is None:
+            delays[pair] = target_lag
+        else:
+            delays[pair] = choose_delay(entry['offset_seconds'], entry['confidence'], target_lag)
+    return delays
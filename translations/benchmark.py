@@ -0,0 +1,230 @@
+"""
+Synthetic-media benchmark for the translation pipeline
+Generates deterministic clip pairs from ffmpeg lavfi sources (testsrc/testsrc2
+pictures, sine tones) and runs process_video_pair over them for every
+combination of engine, pair-level job count and x264 preset. Each combination
+runs in a fresh child process so peak RSS and timings are isolated; results
+are appended to a JSON-lines file
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+#----------------------------------------------------------------------#
+
+# (name, seconds, resolution) for each synthetic original; dubs run 10% longer
+DEFAULT_CORPUS = [
+    ('short_360p', 15, '640x360'),
+    ('medium_720p', 60, '1280x720'),
+    ('long_1080p', 180, '1920x1080'),
+]
+
+ENGINES = {
+    'single': 1,        # one libx264 process per variant
+    'segmented': 4,     # keyframe-aligned chunks encoded in parallel
+}
+
+BITEXACT_ARGS = ['-fflags', '+bitexact', '-flags:v', '+bitexact', '-flags:a', '+bitexact', '-map_metadata', '-1']
+
+#----------------------------------------------------------------------#
+
+def generate_clip(path, seconds, resolution, picture='testsrc', frequency=440):
+    """Deterministic H.264/AAC clip: a lavfi test pattern with a sine tone"""
+    result = subprocess.run([
+        'ffmpeg', '-y', '-loglevel', 'error',
+        '-f', 'lavfi', '-i', f'{picture}=size={resolution}:rate=30:duration={seconds}',
+        '-f', 'lavfi', '-i', f'sine=frequency={frequency}:sample_rate=48000:duration={seconds}',
+        '-c:v', 'libx264', '-preset', 'ultrafast', '-g', '60', '-pix_fmt', 'yuv420p',
+        '-c:a', 'aac', '-b:a', '128k',
+        '-shortest',
+    ] + BITEXACT_ARGS + [path], capture_output=True, text=True)
+
+    if result.returncode != 0:
+        raise Exception(f"Clip generation failed: {result.stderr}")
+
+def generate_corpus(corpus_dir, corpus=DEFAULT_CORPUS, scale=1.0):
+    """
+    Create original/ and azure/ clips under corpus_dir (reused when present)
+    Returns [(original_path, azure_path, original_seconds), ...]
+    """
+    os.makedirs(os.path.join(corpus_dir, 'original'), exist_ok=True)
+    os.makedirs(os.path.join(corpus_dir, 'azure'), exist_ok=True)
+
+    pairs = []
+    for name, seconds, resolution in corpus:
+        seconds = max(1, round(seconds * scale))
+        stem = f"{name}_{seconds}s"
+        original = os.path.join(corpus_dir, 'original', f'{stem}.mp4')
+        azure = os.path.join(corpus_dir, 'azure', f'{stem}.mp4')
+
+        if not os.path.exists(original):
+            print(f"  > Generating {stem} ({resolution})")
+            generate_clip(original, seconds, resolution, 'testsrc', 440)
+        if not os.path.exists(azure):
+            generate_clip(azure, round(seconds * 1.1), resolution, 'testsrc2', 660)
+        pairs.append((original, azure, seconds))
+    return pairs
+
+def ffmpeg_version():
+    try:
+        result = subprocess.run(['ffmpeg', '-version'], capture_output=True, text=True)
+        return result.stdout.splitlines()[0]
+    except (OSError, IndexError):
+        return None
+
+#----------------------------------------------------------------------#
+
+def _timed_pair(original_video, azure_video, output_dir, segments):
+    from process_azure_videos import process_video_pair
+
+    start = time.perf_counter()
+    ok = process_video_pair(original_video, azure_video, output_dir, 5.0, (1.0, 1.0), segments)
+    return {'clip': os.path.basename(original_video), 'ok': ok, 'seconds': round(time.perf_counter() - start, 3)}
+
+def run_configuration(config_path):
+    """Child-process entry point: process every pair once and write per-clip latencies"""
+    with open(config_path) as f:
+        config = json.load(f)
+
+    os.makedirs(config['output_dir'], exist_ok=True)
+    with ProcessPoolExecutor(max_workers=config['jobs']) as pool:
+        futures = [pool.submit(_timed_pair, original, azure, config['output_dir'], config['segments'])
+                   for original, azure, _ in config['pairs']]
+        clips = [future.result() for future in futures]
+
+    with open(config['result_path'], 'w') as f:
+        json.dump(clips, f)
+
+def benchmark(corpus_dir, results_path, engines, job_counts, presets, repeat=1, scale=1.0):
+    """Run every engine x jobs x preset combination and append one result line each"""
+    pairs = generate_corpus(corpus_dir, scale=scale)
+    source_seconds = sum(seconds for _, _, seconds in pairs)
+    machine = {
+        'host': platform.node(),
+        'cpu_count': os.cpu_count(),
+        'platform': platform.platform(),
+        'python': platform.python_version(),
+        'ffmpeg': ffmpeg_version(),
+    }
+
+    here = os.path.dirname(os.path.abspath(__file__))
+    results = []
+
+    for engine in engines:
+        for jobs in job_counts:
+            for preset in presets:
+                for run in range(repeat):
+                    label = f"{engine} jobs={jobs} preset={preset} run={run + 1}"
+                    print(f"\n  Running {label}...")
+
+                    with tempfile.TemporaryDirectory(prefix='bench_') as work_dir:
+                        config_path = os.path.join(work_dir, 'config.json')
+                        result_path = os.path.join(work_dir, 'clips.json')
+                        with open(config_path, 'w') as f:
+                            json.dump({
+                                'pairs': pairs,
+                                'jobs': jobs,
+                                'segments': ENGINES[engine],
+                                'output_dir': os.path.join(work_dir, 'out'),
+                                'result_path': result_path,
+                            }, f)
+
+                        start = time.perf_counter()
+                        proc = subprocess.Popen(
+                            [sys.executable, os.path.abspath(__file__), '--run-configuration', config_path],
+                            cwd=here, env={**os.environ, 'X264_PRESET': preset},
+                            stdout=subprocess.DEVNULL)
+                        # wait4 reports the peak RSS of the child and its waited-for descendants
+                        _, status, usage = os.wait4(proc.pid, 0)
+                        proc.returncode = os.waitstatus_to_exitcode(status)
+                        wall = time.perf_counter() - start
+
+                        clips = []
+                        if os.path.exists(result_path):
+                            with open(result_path) as f:
+                                clips = json.load(f)
+
+                    latencies = sorted(clip['seconds'] for clip in clips)
+                    result = {
+                        'timestamp': datetime.now().isoformat(),
+                        'engine': engine,
+                        'segments': ENGINES[engine],
+                        'jobs': jobs,
+                        'preset': preset,
+                        'run': run + 1,
+                        'returncode': proc.returncode,
+                        'clips': clips,
+                        'failed_clips': sum(1 for clip in clips if not clip['ok']),
+                        'wall_seconds': round(wall, 3),
+                        'source_seconds': source_seconds,
+                        'realtime_factor': round(source_seconds / wall, 3) if wall else None,
+                        'clips_per_minute': round(len(clips) * 60 / wall, 3) if wall else None,
+                        'latency_median_seconds': latencies[len(latencies) // 2] if latencies else None,
+                        'latency_max_seconds': latencies[-1] if latencies else None,
+                        'peak_rss_mb': round(usage.ru_maxrss / 1024, 1),
+                        'cpu_seconds': round(usage.ru_utime + usage.ru_stime, 3),
+                        'machine': machine,
+                    }
+                    results.append(result)
+
+                    with open(results_path, 'a') as f:
+                        f.write(json.dumps(result) + '\n')
+
+                    print(f"    > {wall:.1f}s wall, {result['realtime_factor']}x realtime, "
+                          f"peak RSS {result['peak_rss_mb']} MB")
+
+    print(f"\n{'='*60}")
+    print(f"{'engine':<10} {'jobs':>4} {'preset':<10} {'wall s':>8} {'x rt':>6} {'max clip s':>10} {'RSS MB':>8}")
+    for r in results:
+        print(f"{r['engine']:<10} {r['jobs']:>4} {r['preset']:<10} {r['wall_seconds']:>8.1f} "
+              f"{r['realtime_factor'] or 0:>6.2f} {r['latency_max_seconds'] or 0:>10.1f} {r['peak_rss_mb']:>8.1f}")
+    print(f"\n  Results appended to {results_path}")
+    return results
+
+#----------------------------------------------------------------------#
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Benchmark the translation pipeline on synthetic clips',
+    )
+    parser.add_argument('--corpus-dir', default='benchmark_corpus',
+                       help='Where generated clips are kept between runs (default: benchmark_corpus)')
+    parser.add_argument('--results', default='benchmark_results.jsonl',
+                       help='JSON-lines file results are appended to (default: benchmark_results.jsonl)')
+    parser.add_argument('--engines', default='single,segmented',
+                       help=f'Comma-separated engines from {sorted(ENGINES)} (default: single,segmented)')
+    parser.add_argument('--jobs', default='1',
+                       help='Comma-separated pair-level worker counts (default: 1)')
+    parser.add_argument('--presets', default='medium',
+                       help='Comma-separated libx264 presets (default: medium)')
+    parser.add_argument('--repeat', type=int, default=1, help='Runs per combination (default: 1)')
+    parser.add_argument('--scale', type=float, default=1.0,
+                       help='Multiply every clip duration, e.g. 0.2 for a quick smoke run (default: 1.0)')
+    parser.add_argument('--run-configuration', default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_configuration:
+        run_configuration(args.run_configuration)
+        sys.exit(0)
+
+    engines = [engine.strip() for engine in args.engines.split(',') if engine.strip()]
+    unknown = [engine for engine in engines if engine not in ENGINES]
+    if unknown:
+        parser.error(f"unknown engine(s): {', '.join(unknown)}")
+
+    try:
+        benchmark(args.corpus_dir, args.results, engines,
+                  [int(jobs) for jobs in args.jobs.split(',')],
+                  [preset.strip() for preset in args.presets.split(',')],
+                  repeat=args.repeat, scale=args.scale)
+    except Exception as e:
+        print(f"\n✗ Error running benchmark: {e}")
+        sys.exit(1)
@@ -0,0 +1,63 @@
+"""
+Build manifest
+JSON record kept in the output directory of per-input analysis results
+(alignment, loudness) keyed by content hash, so unchanged inputs are never re-analysed
+"""
+
+import hashlib
+import json
+import os
+
+#----------------------------------------------------------------------#
+
+MANIFEST_NAME = 'build_manifest.json'
+MANIFEST_VERSION = 1
+
+#----------------------------------------------------------------------#
+
+def manifest_path(output_dir):
+    return os.path.join(output_dir, MANIFEST_NAME)
+
+def load_manifest(output_dir):
+    """Load the manifest, starting fresh if missing, unreadable or from an older version"""
+    path = manifest_path(output_dir)
+    if os.path.exists(path):
+        try:
+            with open(path, 'r') as f:
+                manifest = json.load(f)
+            if manifest.get('version') == MANIFEST_VERSION:
+                return manifest
+        except (OSError, ValueError) as e:
+            print(f"    WARNING: ignoring unreadable manifest {path}: {e}")
+    return {'version': MANIFEST_VERSION, 'hashes': {}}
+
+def save_manifest(output_dir, manifest):
+    """Write atomically so an interrupted run never leaves a truncated manifest"""
+    os.makedirs(output_dir, exist_ok=True)
+    path = manifest_path(output_dir)
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(temp_path, path)
+
+def content_hash(path, manifest=None):
+    """
+    sha256 of a file's contents
+    With a manifest, the hash is remembered against (size, mtime) so a file is
+    only read again once it changes
+    """
+    stat = os.stat(path)
+    key = os.path.abspath(path)
+    hashes = manifest.setdefault('hashes', {}) if manifest is not None else {}
+
+    cached = hashes.get(key)
+    if cached and cached['size'] == stat.st_size and cached['mtime_ns'] == stat.st_mtime_ns:
+        return cached['sha256']
+
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+
+    hashes[key] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': digest.hexdigest()}
+    return digest.hexdigest()
@@ -0,0 +1,243 @@
+"""
+Snippet cutting from full-length recordings
+Reads a cut list (name, source, start, end per snippet) and cuts every snippet
+out of its source in parallel. Cuts are stream copies starting on the keyframe
+at or before the requested start, so nothing is re-encoded; a snippet is only
+re-encoded when the nearest keyframe is too far before its start. The real
+duration of every cut is measured with ffprobe and written to cut_manifest.json
+in the output directory, which seed_production_data.py reads directly
+"""
+
+import argparse
+import bisect
+import csv
+import json
+import os
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from tqdm import tqdm
+from build_manifest import content_hash
+from process_azure_videos import get_video_duration, VARIANT_NAMES
+from segmented_encode import get_keyframe_times, VIDEO_ENCODE_ARGS, AUDIO_ENCODE_ARGS
+from web_delivery import keyframe_args, mux_args
+
+#----------------------------------------------------------------------#
+
+CUT_MANIFEST_NAME = 'cut_manifest.json'
+CUT_MANIFEST_VERSION = 1
+
+# a stream copy may start at most this far before the requested start
+MAX_LEAD_SECONDS = 1.0
+
+CUT_LIST_COLUMNS = ['name', 'source', 'start', 'end']
+
+#----------------------------------------------------------------------#
+
+def parse_timestamp(value):
+    """Seconds from '75.5', '1:15.5' or '0:01:15.5'"""
+    seconds = 0.0
+    for part in value.strip().split(':'):
+        seconds = seconds * 60 + float(part)
+    return seconds
+
+def load_cut_list(path):
+    """
+    Cut list CSV with columns name,source,start,end
+    name is the snippet's file stem (e.g. script_1_snippet_1_enthusiastic) and
+    source a file in the sources directory; times are seconds or [h:]mm:ss
+    """
+    cuts = []
+    with open(path, newline='') as f:
+        reader = csv.DictReader(f)
+        missing = [c for c in CUT_LIST_COLUMNS if c not in (reader.fieldnames or [])]
+        if missing:
+            raise ValueError(f"cut list is missing columns: {', '.join(missing)}")
+
+        for line, row in enumerate(reader, start=2):
+            if not row['name'] or row['name'].startswith('#'):
+                continue
+            start, end = parse_timestamp(row['start']), parse_timestamp(row['end'])
+            if end <= start:
+                raise ValueError(f"line {line}: end {row['end']} is not after start {row['start']}")
+            cuts.append({'name': row['name'].strip(), 'source': row['source'].strip(),
+                         'start': start, 'end': end})
+
+    names = [cut['name'] for cut in cuts]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ValueError(f"duplicate snippet names in cut list: {', '.join(duplicates)}")
+    return cuts
+
+def load_cut_manifest(output_dir):
+    path = os.path.join(output_dir, CUT_MANIFEST_NAME)
+    if os.path.exists(path):
+        try:
+            with open(path, 'r') as f:
+                manifest = json.load(f)
+            if manifest.get('version') == CUT_MANIFEST_VERSION:
+                return manifest
+        except (OSError, ValueError) as e:
+            print(f"    WARNING: ignoring unreadable cut manifest {path}: {e}")
+    return {'version': CUT_MANIFEST_VERSION, 'hashes': {}, 'snippets': {}}
+
+def save_cut_manifest(output_dir, manifest):
+    path = os.path.join(output_dir, CUT_MANIFEST_NAME)
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(temp_path, path)
+
+#----------------------------------------------------------------------#
+
+def keyframe_before(keyframes, seconds):
+    """Latest keyframe at or before seconds (0.0 when there is none)"""
+    index = bisect.bisect_right(keyframes, seconds + 1e-3)
+    return keyframes[index - 1] if index else 0.0
+
+def cut_snippet(source_path, output_path, start, end, keyframes):
+    """
+    Cut [start, end) from source_path into output_path
+    Returns (method, actual_start): a stream copy from the preceding keyframe,
+    or an accurate re-encode when that keyframe is more than MAX_LEAD_SECONDS early
+    """
+    keyframe = keyframe_before(keyframes, start)
+    if start - keyframe <= MAX_LEAD_SECONDS:
+        method, actual_start = 'copy', keyframe
+        codec_args = ['-c', 'copy', '-avoid_negative_ts', 'make_zero']
+    else:
+        method, actual_start = 'reencode', start
+        codec_args = VIDEO_ENCODE_ARGS + keyframe_args() + AUDIO_ENCODE_ARGS
+
+    temp_path = f"{os.path.splitext(output_path)[0]}.part{os.path.splitext(output_path)[1]}"
+    result = subprocess.run([
+        'ffmpeg', '-y', '-loglevel', 'error',
+        '-ss', f'{actual_start:.3f}', '-i', source_path,
+        '-t', f'{end - actual_start:.3f}',
+        '-map', '0:v:0', '-map', '0:a:0?',
+        '-map_metadata', '0',
+    ] + codec_args + mux_args(False) + [temp_path], capture_output=True, text=True)
+
+    if result.returncode != 0:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise Exception(f"Cut failed: {result.stderr[-2000:]}")
+    os.replace(temp_path, output_path)
+    return method, actual_start
+
+#----------------------------------------------------------------------#
+
+def cut_all(cut_list_path, sources_dir='sources', output_dir='original', jobs=None, force=False):
+    """
+    Cut every snippet in the cut list into output_dir and update cut_manifest.json
+    Cuts whose source content and times are unchanged since the last run are skipped
+    Returns (manifest, failures)
+    """
+    cuts = load_cut_list(cut_list_path)
+    os.makedirs(output_dir, exist_ok=True)
+    manifest = load_cut_manifest(output_dir)
+    previous = manifest.get('snippets', {})
+
+    missing = sorted({cut['source'] for cut in cuts
+                      if not os.path.exists(os.path.join(sources_dir, cut['source']))})
+    if missing:
+        raise FileNotFoundError(f"sources not found in {sources_dir}/: {', '.join(missing)}")
+
+    # hash each source once; unchanged cuts are reused as-is
+    source_hashes = {source: content_hash(os.path.join(sources_dir, source), manifest)
+                     for source in sorted({cut['source'] for cut in cuts})}
+
+    pending = []
+    snippets = {}
+    for cut in cuts:
+        extension = os.path.splitext(cut['source'])[1].lower() or '.mp4'
+        cut['file'] = f"{cut['name']}{extension}"
+        entry = previous.get(cut['name'])
+        unchanged = (
+            entry is not None
+            and entry['source_sha256'] == source_hashes[cut['source']]
+            and entry['requested_start'] == cut['start']
+            and entry['requested_end'] == cut['end']
+            and os.path.exists(os.path.join(output_dir, entry['file']))
+        )
+        if unchanged and not force:
+            snippets[cut['name']] = entry
+        else:
+            pending.append(cut)
+
+    print(f"\n  Cut list: {len(cuts)} snippets, {len(cuts) - len(pending)} unchanged, {len(pending)} to cut")
+
+    failures = []
+    with ThreadPoolExecutor(max_workers=jobs or os.cpu_count()) as pool:
+        # keyframes are read once per source, however many snippets it yields
+        sources = sorted({cut['source'] for cut in pending})
+        keyframe_futures = {source: pool.submit(get_keyframe_times, os.path.join(sources_dir, source))
+                            for source in sources}
+
+        def cut_one(cut):
+            source_path = os.path.join(sources_dir, cut['source'])
+            output_path = os.path.join(output_dir, cut['file'])
+            method, actual_start = cut_snippet(source_path, output_path, cut['start'], cut['end'],
+                                               keyframe_futures[cut['source']].result())
+            return {
+                'file': cut['file'],
+                'source': cut['source'],
+                'source_sha256': source_hashes[cut['source']],
+                'requested_start': cut['start'],
+                'requested_end': cut['end'],
+                'start': round(actual_start, 3),
+                'duration': round(get_video_duration(output_path), 3),
+                'method': method,
+                'variants': {variant: f"{cut['name']}_{variant}.mp4" for variant in VARIANT_NAMES},
+            }
+
+        futures = {pool.submit(cut_one, cut): cut['name'] for cut in pending}
+        for future in tqdm(as_completed(futures), total=len(futures), desc="Cutting", unit="snippet"):
+            name = futures[future]
+            try:
+                snippets[name] = future.result()
+            except Exception as e:
+                failures.append((name, str(e)))
+
+    # snippets dropped from the cut list are dropped from the manifest (their files are left alone)
+    manifest['snippets'] = {cut['name']: snippets[cut['name']] for cut in cuts if cut['name'] in snippets}
+    manifest['cut_list'] = os.path.abspath(cut_list_path)
+    manifest['generated_at'] = datetime.now().isoformat()
+    save_cut_manifest(output_dir, manifest)
+
+    return manifest, failures
+
+#----------------------------------------------------------------------#
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Cut snippets out of full-length recordings from a cut list',
+    )
+    parser.add_argument('--cut-list', default='cut_list.csv',
+                       help='CSV with columns name,source,start,end (default: cut_list.csv)')
+    parser.add_argument('--sources-dir', default='sources',
+                       help='Directory of full-length recordings (default: sources)')
+    parser.add_argument('--output-dir', default='original',
+                       help='Where snippets and cut_manifest.json are written (default: original)')
+    parser.add_argument('--jobs', type=int, default=None, help='Parallel cuts (default: CPU count)')
+    parser.add_argument('--force', action='store_true', help='Re-cut snippets even when unchanged')
+    args = parser.parse_args()
+
+    try:
+        manifest, failures = cut_all(args.cut_list, args.sources_dir, args.output_dir, args.jobs, args.force)
+    except (OSError, ValueError) as e:
+        print(f"\n✗ Error: {e}")
+        sys.exit(1)
+
+    snippets = manifest['snippets'].values()
+    reencoded = [s['file'] for s in snippets if s['method'] == 'reencode']
+    print(f"\n  Cut {len(manifest['snippets'])} snippets ({len(reencoded)} re-encoded, no keyframe within "
+          f"{MAX_LEAD_SECONDS}s of the start)")
+    for name in reencoded:
+        print(f"    ~ {name}")
+    for name, error in failures:
+        print(f"  ✗ {name}: {error}")
+    print(f"  Manifest: {os.path.join(args.output_dir, CUT_MANIFEST_NAME)}")
+    if failures:
+        sys.exit(1)
@@ -0,0 +1,321 @@
+"""
+Durable job queue for spreading variant encodes across machines
+A coordinator enqueues one job per (pair, variant) into a SQLite file; workers
+on any host that mounts the same directory claim jobs under a time-limited
+lease, heartbeat while encoding, and retry failures up to max_attempts.
+A job whose worker dies is picked up again once its lease expires
+
+SQLite locking relies on the filesystem's POSIX locks, so the queue file must
+live on a share that supports them (local disk, NFSv4, SMB with locking), and
+input/output paths must resolve to the same files on every host
+"""
+
+import argparse
+import json
+import os
+import socket
+import sqlite3
+import sys
+import threading
+import time
+import traceback
+from multiprocessing import Process
+from alignment import align_pairs, DEFAULT_TARGET_LAG
+from build_manifest import load_manifest, save_manifest, content_hash
+from loudness import pair_gains, DEFAULT_TARGET_LUFS
+from process_azure_videos import match_original_to_azure, create_variant, VARIANT_NAMES
+
+#----------------------------------------------------------------------#
+
+DEFAULT_QUEUE_NAME = 'job_queue.sqlite3'
+
+LEASE_SECONDS = 300            # a claim expires unless renewed within this time
+HEARTBEAT_SECONDS = 60
+POLL_SECONDS = 5.0
+MAX_ATTEMPTS = 3
+RETRY_BACKOFF_SECONDS = 30     # multiplied by the attempt number
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL UNIQUE,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 3,
+    not_before REAL NOT NULL DEFAULT 0,
+    lease_owner TEXT,
+    lease_expires REAL,
+    error TEXT,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS ix_jobs_status ON jobs (status, not_before);
+"""
+
+#----------------------------------------------------------------------#
+
+class JobQueue:
+    """Job table in a SQLite file; every method is a short transaction"""
+
+    def __init__(self, path):
+        self.path = path
+        self.conn = sqlite3.connect(path, timeout=60, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def _transaction(self):
+        # IMMEDIATE takes the write lock up front so two workers never claim the same row
+        self.conn.execute("BEGIN IMMEDIATE")
+
+    def enqueue(self, kind, key, payload, max_attempts=MAX_ATTEMPTS, force=False):
+        """
+        Add a job unless one with this key exists
+        Finished or failed jobs are only requeued with force=True; keys include
+        input hashes so changed inputs always produce new jobs
+        Returns True when the job was (re)queued
+        """
+        now = time.time()
+        self._transaction()
+        try:
+            row = self.conn.execute("SELECT id, status FROM jobs WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.conn.execute(
+                    "INSERT INTO jobs (kind, key, payload, max_attempts, created_at) VALUES (?, ?, ?, ?, ?)",
+                    (kind, key, json.dumps(payload), max_attempts, now))
+                queued = True
+            elif force and row['status'] in ('done', 'failed'):
+                self.conn.execute(
+                    "UPDATE jobs SET status = 'queued', attempts = 0, not_before = 0, error = NULL, "
+                    "payload = ?, lease_owner = NULL, lease_expires = NULL WHERE id = ?",
+                    (json.dumps(payload), row['id']))
+                queued = True
+            else:
+                queued = False
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        return queued
+
+    def claim(self, worker_id, lease_seconds=LEASE_SECONDS):
+        """Lease the oldest runnable job (queued, or leased with an expired lease); None if idle"""
+        now = time.time()
+        self._transaction()
+        try:
+            # expired leases that have used up their attempts will never run again
+            self.conn.execute(
+                "UPDATE jobs SET status = 'failed', finished_at = ?, "
+                "error = COALESCE(error, 'lease expired') "
+                "WHERE status = 'leased' AND lease_expires < ? AND attempts >= max_attempts",
+                (now, now))
+
+            row = self.conn.execute(
+                "SELECT * FROM jobs "
+                "WHERE (status = 'queued' AND not_before <= ?) "
+                "   OR (status = 'leased' AND lease_expires < ?) "
+                "ORDER BY id LIMIT 1",
+                (now, now)).fetchone()
+
+            if row is not None:
+                self.conn.execute(
+                    "UPDATE jobs SET status = 'leased', attempts = attempts + 1, lease_owner = ?, "
+                    "lease_expires = ?, started_at = ? WHERE id = ?",
+                    (worker_id, now + lease_seconds, now, row['id']))
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+
+        if row is None:
+            return None
+        job = dict(row)
+        job['payload'] = json.loads(job['payload'])
+        job['attempts'] += 1
+        return job
+
+    def heartbeat(self, job_id, worker_id, lease_seconds=LEASE_SECONDS):
+        """Extend a lease; False if the lease was lost to another worker"""
+        cursor = self.conn.execute(
+            "UPDATE jobs SET lease_expires = ? WHERE id = ? AND lease_owner = ? AND status = 'leased'",
+            (time.time() + lease_seconds, job_id, worker_id))
+        return cursor.rowcount == 1
+
+    def complete(self, job_id, worker_id):
+        self.conn.execute(
+            "UPDATE jobs SET status = 'done', finished_at = ?, error = NULL, lease_expires = NULL "
+            "WHERE id = ? AND lease_owner = ?",
+            (time.time(), job_id, worker_id))
+
+    def fail(self, job_id, worker_id, error):
+        """Requeue with backoff while attempts remain, otherwise mark failed"""
+        now = time.time()
+        self.conn.execute(
+            "UPDATE jobs SET "
+            "status = CASE WHEN attempts < max_attempts THEN 'queued' ELSE 'failed' END, "
+            "not_before = ? + attempts * ?, "
+            "finished_at = CASE WHEN attempts < max_attempts THEN NULL ELSE ? END, "
+            "error = ?, lease_owner = NULL, lease_expires = NULL "
+            "WHERE id = ? AND lease_owner = ?",
+            (now, RETRY_BACKOFF_SECONDS, now, error[-4000:], job_id, worker_id))
+
+    def counts(self):
+        rows = self.conn.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status").fetchall()
+        return {row['status']: row['n'] for row in rows}
+
+    def failures(self):
+        return self.conn.execute(
+            "SELECT key, attempts, error FROM jobs WHERE status = 'failed' ORDER BY id").fetchall()
+
+#----------------------------------------------------------------------#
+
+def enqueue_corpus(queue_path, original_dir='original', azure_dir='azure', translated_dir='translated',
+                   delay_seconds=DEFAULT_TARGET_LAG, align=False, normalize=False,
+                   target_lufs=DEFAULT_TARGET_LUFS, segments=1, jobs=None, force=False):
+    """Queue one job per pair and variant; analysis stages run here, on the coordinator"""
+    os.makedirs(translated_dir, exist_ok=True)
+    pairs, _ = match_original_to_azure(original_dir, azure_dir)
+
+    manifest = load_manifest(translated_dir)
+    delays = align_pairs(pairs, manifest, target_lag=delay_seconds, jobs=jobs) if align else {}
+    gains = pair_gains(pairs, manifest, target_lufs=target_lufs, jobs=jobs) if normalize else {}
+
+    queue = JobQueue(queue_path)
+    queued = 0
+    try:
+        for original_video, azure_video in pairs:
+            pair = (original_video, azure_video)
+            payload = {
+                'original_video': os.path.abspath(original_video),
+                'azure_video': os.path.abspath(azure_video),
+                'translated_dir': os.path.abspath(translated_dir),
+                'delay_seconds': delays.get(pair, delay_seconds),
+                'gains': list(gains.get(pair, (1.0, 1.0))),
+                'segments': segments,
+            }
+            inputs = f"{content_hash(original_video, manifest)[:16]}:{content_hash(azure_video, manifest)[:16]}"
+            settings = f"{payload['delay_seconds']:.3f}:{payload['gains'][0]}:{payload['gains'][1]}"
+            for variant_name in VARIANT_NAMES:
+                key = f"{os.path.basename(original_video)}:{variant_name}:{inputs}:{settings}"
+                if queue.enqueue('variant', key, {**payload, 'variant_name': variant_name}, force=force):
+                    queued += 1
+    finally:
+        queue.close()
+        save_manifest(translated_dir, manifest)
+
+    print(f"\n  Queued {queued} jobs ({len(pairs)} pairs) in {queue_path}")
+    return queued
+
+def run_job(job):
+    if job['kind'] == 'variant':
+        create_variant(**job['payload'])
+    else:
+        raise ValueError(f"Unknown job kind: {job['kind']}")
+
+def run_worker(queue_path, worker_id=None, exit_when_idle=False, lease_seconds=LEASE_SECONDS):
+    """Claim and run jobs until interrupted (or until the queue is empty with exit_when_idle)"""
+    worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+    queue = JobQueue(queue_path)
+    print(f"  Worker {worker_id} started")
+
+    try:
+        while True:
+            job = queue.claim(worker_id, lease_seconds)
+            if job is None:
+                if exit_when_idle:
+                    break
+                time.sleep(POLL_SECONDS)
+                continue
+
+            print(f"  [{worker_id}] {job['key']} (attempt {job['attempts']}/{job['max_attempts']})")
+
+            # renew the lease from a separate connection while the encode runs
+            stop = threading.Event()
+            def beat():
+                beat_queue = JobQueue(queue_path)
+                try:
+                    while not stop.wait(HEARTBEAT_SECONDS):
+                        if not beat_queue.heartbeat(job['id'], worker_id, lease_seconds):
+                            print(f"  [{worker_id}] WARNING: lost lease on {job['key']}")
+                            break
+                finally:
+                    beat_queue.close()
+            heartbeat = threading.Thread(target=beat, daemon=True)
+            heartbeat.start()
+
+            start = time.time()
+            try:
+                run_job(job)
+            except Exception as e:
+                stop.set()
+                queue.fail(job['id'], worker_id, f"{e}\n{traceback.format_exc()}")
+                print(f"  [{worker_id}] ✗ {job['key']}: {str(e)[:200]}")
+            else:
+                stop.set()
+                queue.complete(job['id'], worker_id)
+                print(f"  [{worker_id}] ✓ {job['key']} in {time.time() - start:.1f}s")
+            heartbeat.join()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        queue.close()
+
+#----------------------------------------------------------------------#
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Distribute variant encodes through a shared SQLite job queue',
+    )
+    parser.add_argument('--queue', default=os.path.join('translated', DEFAULT_QUEUE_NAME),
+                       help=f'Queue file on shared storage (default: translated/{DEFAULT_QUEUE_NAME})')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    enqueue_parser = commands.add_parser('enqueue', help='Queue every matched pair')
+    enqueue_parser.add_argument('--original-dir', default='original')
+    enqueue_parser.add_argument('--azure-dir', default='azure')
+    enqueue_parser.add_argument('--translated-dir', default='translated')
+    enqueue_parser.add_argument('--delay', type=float, default=DEFAULT_TARGET_LAG)
+    enqueue_parser.add_argument('--align', action='store_true')
+    enqueue_parser.add_argument('--normalize', action='store_true')
+    enqueue_parser.add_argument('--target-lufs', type=float, default=DEFAULT_TARGET_LUFS)
+    enqueue_parser.add_argument('--segments', type=int, default=1)
+    enqueue_parser.add_argument('--jobs', type=int, default=None, help='Parallel analysis workers')
+    enqueue_parser.add_argument('--force', action='store_true', help='Requeue finished and failed jobs')
+
+    work_parser = commands.add_parser('work', help='Run worker processes on this machine')
+    work_parser.add_argument('--workers', type=int, default=1, help='Worker processes (default: 1)')
+    work_parser.add_argument('--exit-when-idle', action='store_true', help='Stop once no job is runnable')
+
+    commands.add_parser('status', help='Show job counts and failures')
+    args = parser.parse_args()
+
+    try:
+        if args.command == 'enqueue':
+            enqueue_corpus(args.queue, args.original_dir, args.azure_dir, args.translated_dir,
+                           delay_seconds=args.delay, align=args.align, normalize=args.normalize,
+                           target_lufs=args.target_lufs, segments=args.segments, jobs=args.jobs,
+                           force=args.force)
+        elif args.command == 'work':
+            workers = [Process(target=run_worker, args=(args.queue,),
+                               kwargs={'exit_when_idle': args.exit_when_idle})
+                       for _ in range(args.workers)]
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+        else:
+            queue = JobQueue(args.queue)
+            print(f"\n  Jobs: {queue.counts()}")
+            for row in queue.failures():
+                print(f"    ✗ {row['key']} ({row['attempts']} attempts): {(row['error'] or '').splitlines()[0][:200]}")
+            queue.close()
+    except KeyboardInterrupt:
+        pass
+    except Exception as e:
+        print(f"\n✗ Error: {e}")
+        sys.exit(1)
@@ -0,0 +1,106 @@
+"""
+Loudness analysis and EBU R128 gain correction
+The first (measurement) pass of ffmpeg's loudnorm runs once per input, in
+parallel, and is cached in the build manifest by content hash. The mix then
+applies a plain linear gain per track instead of re-analysing anything
+"""
+
+import json
+import os
+import subprocess
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from tqdm import tqdm
+from build_manifest import content_hash
+
+#----------------------------------------------------------------------#
+
+# bump when the measurement changes so cached values are recomputed
+LOUDNESS_VERSION = 1
+
+DEFAULT_TARGET_LUFS = -23.0    # EBU R128 programme loudness
+MAX_TRUE_PEAK = -1.0           # dBTP ceiling after gain
+MAX_GAIN_DB = 20.0             # never boost or cut more than this
+
+# integrated loudness at or below this is treated as silence (no correction)
+SILENCE_LUFS = -70.0
+
+#----------------------------------------------------------------------#
+
+def measure_loudness(path):
+    """Integrated loudness, true peak and LRA of a file's first audio stream"""
+    result = subprocess.run([
+        'ffmpeg', '-hide_banner', '-nostats',
+        '-i', path,
+        '-vn',
+        '-af', f'loudnorm=I={DEFAULT_TARGET_LUFS}:TP={MAX_TRUE_PEAK}:print_format=json',
+        '-f', 'null', '-'
+    ], capture_output=True, text=True)
+
+    if result.returncode != 0:
+        raise Exception(f"Loudness analysis failed: {result.stderr[-500:]}")
+
+    # loudnorm prints its JSON block last on stderr
+    start = result.stderr.rfind('{')
+    end = result.stderr.rfind('}')
+    if start < 0 or end < start:
+        raise Exception("Loudness analysis produced no measurement")
+    stats = json.loads(result.stderr[start:end + 1])
+
+    return {
+        'integrated_lufs': float(stats['input_i']),
+        'true_peak_dbtp': float(stats['input_tp']),
+        'lra': float(stats['input_lra']),
+        'threshold': float(stats['input_thresh']),
+    }
+
+def gain_for(measurement, target_lufs=DEFAULT_TARGET_LUFS):
+    """Linear gain that brings a measurement to target_lufs without clipping"""
+    integrated = measurement['integrated_lufs']
+    if integrated <= SILENCE_LUFS:
+        return 1.0
+
+    gain_db = target_lufs - integrated
+    gain_db = min(gain_db, MAX_TRUE_PEAK - measurement['true_peak_dbtp'])
+    gain_db = max(min(gain_db, MAX_GAIN_DB), -MAX_GAIN_DB)
+    return round(10 ** (gain_db / 20), 4)
+
+#----------------------------------------------------------------------#
+
+def analyze_loudness(paths, manifest, jobs=None):
+    """
+    Loudness measurement for each path
+    Cached in manifest['loudness'] by content hash; only new or changed
+    inputs are measured, with ffmpeg processes run in parallel
+    """
+    cache = manifest.setdefault('loudness', {})
+    keys = {path: f"{content_hash(path, manifest)[:16]}:v{LOUDNESS_VERSION}" for path in set(paths)}
+    pending = [path for path, key in keys.items() if key not in cache]
+
+    print(f"\n  Loudness: {len(keys) - len(pending)} cached, {len(pending)} to measure")
+
+    if pending:
+        # each worker just waits on an ffmpeg process, so threads are enough
+        with ThreadPoolExecutor(max_workers=jobs or os.cpu_count()) as pool:
+            futures = {pool.submit(measure_loudness, path): path for path in pending}
+            for future in tqdm(as_completed(futures), total=len(futures), desc="Measuring", unit="file"):
+                path = futures[future]
+                try:
+                    cache[keys[path]] = {'file': os.path.basename(path), **future.result()}
+                except Exception as e:
+                    print(f"    WARNING: loudness analysis failed for {os.path.basename(path)}: {e}")
+
+    return {path: cache.get(key) for path, key in keys.items()}
+
+def pair_gains(pairs, manifest, target_lufs=DEFAULT_TARGET_LUFS, jobs=None):
+    """(original_gain, azure_gain) for each pair; 1.0 where a measurement is missing"""
+    measurements = analyze_loudness([path for pair in pairs for path in pair], manifest, jobs)
+
+    gains = {}
+    for original_video, azure_video in pairs:
+        original = measurements.get(original_video)
+        azure = measurements.get(azure_video)
+        gains[(original_video, azure_video)] = (
+            gain_for(original, target_lufs) if original else 1.0,
+            gain_for(azure, target_lufs) if azure else 1.0,
+        )
+    return gains
@@ -0,0 +1,145 @@
+"""
+Adaptive streaming packaging
+Re-encodes each variant into a small bitrate ladder and segments it with
+ffmpeg's DASH muxer, which also writes HLS playlists over the same fMP4
+segments, so every clip gets manifest.mpd and master.m3u8 from one pass.
+Rungs taller than the source are skipped
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from tqdm import tqdm
+import profiler
+
+#----------------------------------------------------------------------#
+
+# (height, video bitrate) from lowest to highest
+BITRATE_LADDER = [
+    (360, '800k'),
+    (540, '1600k'),
+    (720, '3000k'),
+    (1080, '5000k'),
+]
+AUDIO_BITRATE = '128k'
+SEGMENT_SECONDS = 4            # a multiple of the 2s keyframe interval
+PACKAGE_DIR_NAME = 'packaged'
+PACKAGE_MANIFEST_NAME = 'packaging_manifest.json'
+
+#----------------------------------------------------------------------#
+
+def get_video_height(video_path):
+    result = subprocess.run([
+        'ffprobe', '-v', 'error',
+        '-select_streams', 'v:0',
+        '-show_entries', 'stream=height',
+        '-of', 'default=noprint_wrappers=1:nokey=1',
+        video_path
+    ], capture_output=True, text=True, check=True)
+    return int(result.stdout.strip())
+
+def ladder_for(source_height):
+    """Ladder rungs no taller than the source (always at least the lowest)"""
+    rungs = [rung for rung in BITRATE_LADDER if rung[0] <= source_height]
+    return rungs or BITRATE_LADDER[:1]
+
+def package_video(video_path, output_dir, preset=None):
+    """
+    Encode the ladder and write output_dir/manifest.mpd plus output_dir/master.m3u8
+    Returns the list of heights packaged
+    """
+    rungs = ladder_for(get_video_height(video_path))
+    os.makedirs(output_dir, exist_ok=True)
+
+    split = ''.join(f'[v{i}]' for i in range(len(rungs)))
+    filters = [f'[0:v]split={len(rungs)}{split}']
+    filters += [f'[v{i}]scale=-2:{height}[v{i}out]' for i, (height, _) in enumerate(rungs)]
+
+    cmd = ['ffmpeg', '-y', '-i', video_path, '-filter_complex', ';'.join(filters)]
+    for i, (height, bitrate) in enumerate(rungs):
+        cmd += ['-map', f'[v{i}out]',
+                f'-b:v:{i}', bitrate, f'-maxrate:v:{i}', bitrate,
+                f'-bufsize:v:{i}', f'{int(bitrate[:-1]) * 2}k']
+    cmd += ['-map', '0:a?',
+            '-c:v', 'libx264', '-preset', preset or os.getenv('X264_PRESET', 'medium'),
+            '-force_key_frames', f'expr:gte(t,n_forced*{SEGMENT_SECONDS})',
+            '-c:a', 'aac', '-b:a', AUDIO_BITRATE,
+            '-f', 'dash',
+            '-seg_duration', str(SEGMENT_SECONDS),
+            '-use_template', '1', '-use_timeline', '1',
+            '-adaptation_sets', 'id=0,streams=v id=1,streams=a',
+            '-hls_playlist', '1', '-hls_master_name', 'master.m3u8',
+            '-init_seg_name', 'init-$RepresentationID$.m4s',
+            '-media_seg_name', 'chunk-$RepresentationID$-$Number%05d$.m4s',
+            os.path.join(output_dir, 'manifest.mpd')]
+
+    result = profiler.run_ffmpeg(cmd, 'encode', os.path.basename(output_dir))
+    if result.returncode != 0:
+        raise Exception(f"Packaging failed: {result.stderr[-2000:]}")
+    return [height for height, _ in rungs]
+
+#----------------------------------------------------------------------#
+
+def package_directory(translated_dir, base_url='', jobs=2, force=False):
+    """
+    Package every variant MP4 in translated_dir into translated_dir/packaged/<name>/
+    Writes packaging_manifest.json mapping each variant file to its HLS and DASH URLs
+    (relative to base_url) for the seeder; already-packaged variants are skipped
+    """
+    package_root = os.path.join(translated_dir, PACKAGE_DIR_NAME)
+    videos = sorted(
+        f for f in os.listdir(translated_dir)
+        if f.lower().endswith('.mp4') and not f.endswith(('_video.mp4', '.web.mp4'))
+    )
+
+    def package(filename):
+        name = os.path.splitext(filename)[0]
+        output_dir = os.path.join(package_root, name)
+        if force or not os.path.exists(os.path.join(output_dir, 'master.m3u8')):
+            package_video(os.path.join(translated_dir, filename), output_dir)
+        prefix = f"{base_url.rstrip('/')}/{PACKAGE_DIR_NAME}/{name}" if base_url else f"{PACKAGE_DIR_NAME}/{name}"
+        return filename, {'hls': f"{prefix}/master.m3u8", 'dash': f"{prefix}/manifest.mpd"}
+
+    manifest = {}
+    failures = []
+    # each ffmpeg run already encodes several rungs on many threads, so keep the pool small
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        futures = {pool.submit(package, filename): filename for filename in videos}
+        for future in tqdm(as_completed(futures), total=len(futures), desc="Packaging", unit="file"):
+            try:
+                filename, urls = future.result()
+                manifest[filename] = urls
+            except Exception as e:
+                failures.append((futures[future], str(e)))
+
+    os.makedirs(package_root, exist_ok=True)
+    with open(os.path.join(translated_dir, PACKAGE_MANIFEST_NAME), 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+    return manifest, failures
+
+#----------------------------------------------------------------------#
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Package translated variants as HLS/DASH with a bitrate ladder',
+    )
+    parser.add_argument('--translated-dir', default='translated',
+                       help='Directory of encoded variants (default: translated)')
+    parser.add_argument('--base-url', default='',
+                       help='URL prefix the packaged/ directory will be served from (e.g. the CDN base)')
+    parser.add_argument('--jobs', type=int, default=2, help='Variants packaged at once (default: 2)')
+    parser.add_argument('--force', action='store_true', help='Repackage variants that already have manifests')
+    args = parser.parse_args()
+
+    manifest, failures = package_directory(args.translated_dir, args.base_url, args.jobs, args.force)
+    for name, error in failures:
+        print(f"  ✗ {name}: {error}")
+
+    print(f"\n  Packaged {len(manifest)} variants into {os.path.join(args.translated_dir, PACKAGE_DIR_NAME)}/")
+    print(f"  URLs: {os.path.join(args.translated_dir, PACKAGE_MANIFEST_NAME)}")
+    if failures:
+        sys.exit(1)
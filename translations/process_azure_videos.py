@@ -2,7 +2,26 @@ import os
 import subprocess
 import argparse
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 from tqdm import tqdm
+from alignment import align_pairs, DEFAULT_TARGET_LAG
+from build_manifest import load_manifest, save_manifest
+from loudness import pair_gains, DEFAULT_TARGET_LUFS
+from segmented_encode import encode_segmented
+import profiler
+from web_delivery import keyframe_args, mux_args, extract_poster, poster_path_for
+
+#----------------------------------------------------------------------#
+
+# (name, original volume, translated volume, description) for the mixed variants
+MIX_VARIANTS = [
+    ("muffled", 0.3, 1.0, "30% Spanish + 100% English (delayed)"),
+    ("balanced", 0.7, 1.0, "70% Spanish + 100% English (delayed)")
+]
+VARIANT_NAMES = ['muffled', 'balanced', 'full']
+
+# libx264 speed/quality preset for every encode (overridable for benchmarking)
+X264_PRESET = os.getenv('X264_PRESET', 'medium')
 
 #----------------------------------------------------------------------#
 
@@ -10,7 +29,8 @@ def validate_video_file(video_path):
     """Check if video has audio stream"""
     cmd = ['ffprobe', '-v', 'error', '-select_streams', 'a:0', 
            '-show_entries', 'stream=codec_type', '-of', 'csv=p=0', video_path]
-    result = subprocess.run(cmd, capture_output=True, text=True)
+    with profiler.stage('probe'):
+        result = subprocess.run(cmd, capture_output=True, text=True)
     return 'audio' in result.stdout
 
 def get_audio_duration(audio_path):
@@ -22,7 +42,8 @@ def get_audio_duration(audio_path):
         audio_path
     ]
     
-    result = subprocess.run(probe_cmd, capture_output=True, text=True, check=True)
+    with profiler.stage('probe'):
+        result = subprocess.run(probe_cmd, capture_output=True, text=True, check=True)
     return float(result.stdout.strip())
 
 def get_video_duration(video_path):
@@ -34,46 +55,76 @@ def get_video_duration(video_path):
         video_path
     ]
     
-    result = subprocess.run(probe_cmd, capture_output=True, text=True, check=True)
+    with profiler.stage('probe'):
+        result = subprocess.run(probe_cmd, capture_output=True, text=True, check=True)
     return float(result.stdout.strip())
 
 def extract_audio_from_video(video_path, output_audio_path):
     """Extract audio from video file as WAV"""
-    result = subprocess.run([
-        'ffmpeg', '-y', '-loglevel', 'error',
-        '-i', video_path,
-        '-vn',
-        '-acodec', 'pcm_s16le',
-        '-ar', '16000',
-        '-ac', '1',
-        output_audio_path
-    ], capture_output=True, text=True)
+    with profiler.stage('extract'):
+        result = subprocess.run([
+            'ffmpeg', '-y', '-loglevel', 'error',
+            '-i', video_path,
+            '-vn',
+            '-acodec', 'pcm_s16le',
+            '-ar', '16000',
+            '-ac', '1',
+            output_audio_path
+        ], capture_output=True, text=True)
     
     if result.returncode != 0:
         raise Exception(f"Audio extraction failed: {result.stderr}")
 
-def create_video_with_audio_mix(original_video_path, translated_video_path, 
-                                 output_path, original_volume, translated_volume, delay_seconds=5.0):
+def plan_durations(original_video, azure_video, delay_seconds=5.0):
     """
-    Create video with mixed audio tracks
-    Delays translated audio by delay_seconds relative to original
-    Extends video with still frame if needed to fit delayed audio
+    Durations every output of a pair is built to: the original, or the delayed
+    dub, whichever is longer. Probed once per pair and passed to each encoder
+    Returns { azure_duration, audio_duration, target_duration, extension_needed }
     """
-    # get durations
-    original_video_duration = get_video_duration(original_video_path)
-    translated_video_duration = get_video_duration(translated_video_path)
+    original_duration = get_video_duration(original_video)
+    azure_duration = get_video_duration(azure_video)
     
     # extract translated audio to check its duration
-    temp_audio = f"/tmp/temp_translated_audio_{os.getpid()}.wav"
-    extract_audio_from_video(translated_video_path, temp_audio)
-    translated_audio_duration = get_audio_duration(temp_audio)
+    temp_audio = f"/tmp/check_audio_{os.getpid()}.wav"
+    extract_audio_from_video(azure_video, temp_audio)
+    audio_duration = get_audio_duration(temp_audio)
     os.remove(temp_audio)
     
-    # calculate target duration: max of original video or (delay + translated audio)
-    target_duration = max(original_video_duration, delay_seconds + translated_audio_duration)
+    target_duration = max(original_duration, delay_seconds + audio_duration)
+    return {
+        'azure_duration': azure_duration,
+        'audio_duration': audio_duration,
+        'target_duration': target_duration,
+        'extension_needed': target_duration - azure_duration,
+    }
+
+def create_video_with_audio_mix(original_video_path, translated_video_path, 
+                                 output_path, original_volume, translated_volume, delay_seconds=5.0,
+                                 segments=1, plan=None):
+    """
+    Create video with mixed audio tracks
+    Delays translated audio by delay_seconds relative to original
+    Extends video with still frame if needed to fit delayed audio
+    With segments > 1 the video is encoded in parallel keyframe-aligned chunks
+    plan is the pair's plan_durations() result (probed here when omitted)
+    """
+    plan = plan or plan_durations(original_video_path, translated_video_path, delay_seconds)
+    translated_video_duration = plan['azure_duration']
+    target_duration = plan['target_duration']
     
     # check if we need to extend the translated video
-    extension_needed = target_duration - translated_video_duration
+    extension_needed = plan['extension_needed']
+    
+    if segments > 1:
+        audio_filter = (
+            f'[1:a]volume={original_volume}[a_orig];'
+            f'[0:a]adelay={int(delay_seconds * 1000)}|{int(delay_seconds * 1000)},volume={translated_volume}[a_trans];'
+            f'[a_orig][a_trans]amix=inputs=2:duration=longest[aout]'
+        )
+        encode_segmented(translated_video_path, translated_video_duration,
+                         [translated_video_path, original_video_path], audio_filter, output_path,
+                         target_duration, extension_needed if extension_needed > 0.5 else 0.0, segments)
+        return
     
     # build ffmpeg command
     if extension_needed > 0.5:
@@ -102,69 +153,32 @@ def create_video_with_audio_mix(original_video_path, translated_video_path,
         '-map', '[aout]',
         '-c:v', 'libx264',
         '-crf', '23',
-        '-preset', 'medium',
+        '-preset', X264_PRESET,
+        *keyframe_args(),
         '-c:a', 'aac',
         '-b:a', '128k',
+        *mux_args(),
         '-t', str(target_duration),
         output_path
     ]
     
-    result = subprocess.run(cmd, capture_output=True, text=True)
+    result = profiler.run_ffmpeg(cmd, 'encode', os.path.basename(output_path))
     
     if result.returncode != 0:
         raise Exception(f"Failed to create output video: {result.stderr}")
 
-def process_video_pair(original_video, azure_video, translated_dir, delay_seconds=5.0):
+def create_full_translation(original_video, azure_video, output_path, translated_volume=1.0,
+                            delay_seconds=5.0, plan=None):
     """
-    Process a pair of original and Azure-translated videos
-    Creates muffled and balanced variants with delayed translated audio
+    Create the full-translation variant: Azure video with only its own audio, delayed
+    Extends video with still frame if needed to fit delayed audio
+    Also writes the clip's poster frame next to the output
     """
-    base_name = os.path.splitext(os.path.basename(original_video))[0]
-    
-    print(f"\n  Processing: {base_name}")
-    
-    if not validate_video_file(original_video):
-        print(f"    WARNING: Original video has no audio, skipping...")
-        return False
-    
-    if not validate_video_file(azure_video):
-        print(f"    WARNING: Azure video has no audio, skipping...")
-        return False
-    
-    # check duration extension needed
-    original_duration = get_video_duration(original_video)
-    azure_duration = get_video_duration(azure_video)
-    
-    temp_audio = f"/tmp/check_audio_{os.getpid()}.wav"
-    extract_audio_from_video(azure_video, temp_audio)
-    audio_duration = get_audio_duration(temp_audio)
-    os.remove(temp_audio)
-    
-    target_duration = max(original_duration, delay_seconds + audio_duration)
-    extension_needed = target_duration - azure_duration
-    
-    if extension_needed > 0:
-        print(f"    > Video will be extended by ~{extension_needed:.1f}s (delay: {delay_seconds}s + audio: {audio_duration:.1f}s)")
-    
-    # create variants
-    variants = [
-        ("muffled", 0.3, 1.0, "30% Spanish + 100% English (delayed)"),
-        ("balanced", 0.7, 1.0, "70% Spanish + 100% English (delayed)")
-    ]
-    
-    for variant_name, orig_vol, trans_vol, description in variants:
-        output_path = os.path.join(translated_dir, f"{base_name}_{variant_name}.mp4")
-        print(f"      Creating {variant_name} ({description})...")
-        try:
-            create_video_with_audio_mix(original_video, azure_video, 
-                                        output_path, orig_vol, trans_vol, delay_seconds)
-        except Exception as e:
-            print(f"      ERROR: {e}")
-            return False
-    
-    # for full variant, extend Azure video and delay audio
-    full_output = os.path.join(translated_dir, f"{base_name}_full.mp4")
-    print(f"      Creating full translation (100% English, delayed {delay_seconds}s)...")
+    plan = plan or plan_durations(original_video, azure_video, delay_seconds)
+    azure_duration = plan['azure_duration']
+    audio_duration = plan['audio_duration']
+    target_duration = plan['target_duration']
+    extension_needed = plan['extension_needed']
     
     if extension_needed > 0.5:
         cmd = [
@@ -172,16 +186,18 @@ def process_video_pair(original_video, azure_video, translated_dir, delay_second
             '-i', azure_video,
             '-filter_complex',
             f'[0:v]tpad=stop_mode=clone:stop_duration={extension_needed}[v];'
-            f'[0:a]adelay={int(delay_seconds * 1000)}|{int(delay_seconds * 1000)}[a]',
+            f'[0:a]adelay={int(delay_seconds * 1000)}|{int(delay_seconds * 1000)},volume={translated_volume}[a]',
             '-map', '[v]',
             '-map', '[a]',
             '-c:v', 'libx264',
             '-crf', '23',
-            '-preset', 'medium',
+            '-preset', X264_PRESET,
+            *keyframe_args(),
             '-c:a', 'aac',
             '-b:a', '128k',
+            *mux_args(),
             '-t', str(target_duration),
-            full_output
+            output_path
         ]
     else:
         # still need to add delay even if no extension needed
@@ -190,40 +206,213 @@ def process_video_pair(original_video, azure_video, translated_dir, delay_second
             'ffmpeg', '-y',
             '-i', azure_video,
             '-filter_complex',
-            f'[0:a]adelay={int(delay_seconds * 1000)}|{int(delay_seconds * 1000)}[a]',
+            f'[0:a]adelay={int(delay_seconds * 1000)}|{int(delay_seconds * 1000)},volume={translated_volume}[a]',
             '-map', '0:v',
             '-map', '[a]',
             '-c:v', 'libx264',
             '-crf', '23',
-            '-preset', 'medium',
+            '-preset', X264_PRESET,
+            *keyframe_args(),
             '-c:a', 'aac',
             '-b:a', '128k',
+            *mux_args(),
             '-t', str(max(azure_duration, target_with_delay)),
-            full_output
+            output_path
         ]
     
-    result = subprocess.run(cmd, capture_output=True, text=True)
+    result = profiler.run_ffmpeg(cmd, 'encode', os.path.basename(output_path))
     if result.returncode != 0:
-        print(f"      WARNING: Failed to process video: {result.stderr}")
+        raise Exception(result.stderr)
+    
+    # all variants share the same picture, so one poster per clip comes from here
+    try:
+        with profiler.stage('write', 'poster'):
+            extract_poster(output_path, poster_path_for(original_video, os.path.dirname(output_path)))
+    except Exception as e:
+        print(f"      WARNING: {e}")
+
+def create_variant(original_video, azure_video, translated_dir, variant_name,
+                   delay_seconds=5.0, gains=(1.0, 1.0), segments=1, plan=None):
+    """Build a single named variant (muffled, balanced or full) for a pair"""
+    original_gain, azure_gain = gains
+    output_path = variant_outputs(original_video, translated_dir)[VARIANT_NAMES.index(variant_name)]
+    
+    if variant_name == 'full':
+        create_full_translation(original_video, azure_video, output_path, azure_gain, delay_seconds, plan)
+        return output_path
+    
+    _, orig_vol, trans_vol, _ = next(v for v in MIX_VARIANTS if v[0] == variant_name)
+    create_video_with_audio_mix(original_video, azure_video, output_path,
+                                orig_vol * original_gain, trans_vol * azure_gain,
+                                delay_seconds, segments, plan)
+    return output_path
+
+def track_outputs(original_video, translated_dir):
+    """Output paths for tracks mode: one video-only MP4 plus an audio rendition per variant"""
+    base_name = os.path.splitext(os.path.basename(original_video))[0]
+    outputs = {'video': os.path.join(translated_dir, f"{base_name}_video.mp4")}
+    for variant in VARIANT_NAMES:
+        outputs[variant] = os.path.join(translated_dir, f"{base_name}_{variant}.m4a")
+    return outputs
+
+def create_track_set(original_video, azure_video, translated_dir, delay_seconds=5.0, gains=(1.0, 1.0),
+                     plan=None):
+    """
+    Tracks mode: encode the picture once as a video-only MP4 and render each
+    variant's audio as its own AAC file on the same timeline
+    The player pairs the video with the participant's assigned audio track
+    """
+    original_gain, azure_gain = gains
+    outputs = track_outputs(original_video, translated_dir)
+    delay_ms = int(delay_seconds * 1000)
+    
+    plan = plan or plan_durations(original_video, azure_video, delay_seconds)
+    target_duration = plan['target_duration']
+    extension_needed = plan['extension_needed']
+    
+    video_cmd = ['ffmpeg', '-y', '-i', azure_video]
+    if extension_needed > 0.5:
+        video_cmd += ['-vf', f'tpad=stop_mode=clone:stop_duration={extension_needed}']
+    video_cmd += [
+        '-map', '0:v', '-an',
+        '-c:v', 'libx264',
+        '-crf', '23',
+        '-preset', X264_PRESET,
+        *keyframe_args(),
+        *mux_args(),
+        '-t', str(target_duration),
+        outputs['video']
+    ]
+    
+    audio_cmds = {}
+    for variant_name, orig_vol, trans_vol, _ in MIX_VARIANTS:
+        audio_cmds[variant_name] = [
+            'ffmpeg', '-y',
+            '-i', azure_video,
+            '-i', original_video,
+            '-filter_complex',
+            f'[1:a]volume={orig_vol * original_gain}[a_orig];'
+            f'[0:a]adelay={delay_ms}|{delay_ms},volume={trans_vol * azure_gain}[a_trans];'
+            f'[a_orig][a_trans]amix=inputs=2:duration=longest[aout]',
+            '-map', '[aout]',
+            '-c:a', 'aac', '-b:a', '128k',
+            *mux_args(),
+            '-t', str(target_duration),
+            outputs[variant_name]
+        ]
+    audio_cmds['full'] = [
+        'ffmpeg', '-y',
+        '-i', azure_video,
+        '-filter_complex', f'[0:a]adelay={delay_ms}|{delay_ms},volume={azure_gain}[aout]',
+        '-map', '[aout]',
+        '-c:a', 'aac', '-b:a', '128k',
+        *mux_args(),
+        '-t', str(target_duration),
+        outputs['full']
+    ]
+    
+    # the audio renders are cheap next to the single video encode, so run them alongside it
+    with ThreadPoolExecutor(max_workers=1 + len(audio_cmds)) as pool:
+        futures = {pool.submit(profiler.run_ffmpeg, video_cmd, 'encode', os.path.basename(outputs['video'])): 'video'}
+        for name, cmd in audio_cmds.items():
+            futures[pool.submit(profiler.run_ffmpeg, cmd, 'mix', os.path.basename(outputs[name]))] = name
+        for future, name in futures.items():
+            result = future.result()
+            if result.returncode != 0:
+                raise Exception(f"Failed to create {name} track: {result.stderr}")
+    
+    try:
+        with profiler.stage('write', 'poster'):
+            extract_poster(outputs['video'], poster_path_for(original_video, translated_dir))
+    except Exception as e:
+        print(f"      WARNING: {e}")
+    
+    return outputs
+
+def process_video_pair(original_video, azure_video, translated_dir, delay_seconds=5.0, gains=(1.0, 1.0),
+                       segments=1, tracks=False):
+    """
+    Process a pair of original and Azure-translated videos
+    Creates muffled and balanced variants with delayed translated audio
+    gains are linear loudness corrections for (original, azure), applied on top
+    of each variant's mix volumes; segments > 1 enables chunked encoding of the mixes
+    tracks=True writes one video-only MP4 and three audio tracks instead (see create_track_set)
+    """
+    original_gain, azure_gain = gains
+    base_name = os.path.splitext(os.path.basename(original_video))[0]
+    
+    print(f"\n  Processing: {base_name}")
+    
+    if not validate_video_file(original_video):
+        print(f"    WARNING: Original video has no audio, skipping...")
+        return False
+    
+    if not validate_video_file(azure_video):
+        print(f"    WARNING: Azure video has no audio, skipping...")
+        return False
+    
+    # check duration extension needed (once; every encoder below reuses the plan)
+    plan = plan_durations(original_video, azure_video, delay_seconds)
+    
+    if plan['extension_needed'] > 0:
+        print(f"    > Video will be extended by ~{plan['extension_needed']:.1f}s "
+              f"(delay: {delay_seconds}s + audio: {plan['audio_duration']:.1f}s)")
+    
+    if tracks:
+        print(f"      Creating video track and {len(VARIANT_NAMES)} audio tracks...")
+        try:
+            create_track_set(original_video, azure_video, translated_dir, delay_seconds, gains, plan)
+        except Exception as e:
+            print(f"      ERROR: {e}")
+            return False
+        print(f"    > Created tracks for {base_name}")
+        return True
+    
+    # create variants
+    for variant_name, orig_vol, trans_vol, description in MIX_VARIANTS:
+        output_path = os.path.join(translated_dir, f"{base_name}_{variant_name}.mp4")
+        print(f"      Creating {variant_name} ({description})...")
+        try:
+            create_video_with_audio_mix(original_video, azure_video, 
+                                        output_path, orig_vol * original_gain,
+                                        trans_vol * azure_gain, delay_seconds, segments, plan)
+        except Exception as e:
+            print(f"      ERROR: {e}")
+            return False
+    
+    # for full variant, extend Azure video and delay audio
+    full_output = os.path.join(translated_dir, f"{base_name}_full.mp4")
+    print(f"      Creating full translation (100% English, delayed {delay_seconds}s)...")
+    
+    try:
+        create_full_translation(original_video, azure_video, full_output, azure_gain, delay_seconds, plan)
+    except Exception as e:
+        print(f"      WARNING: Failed to process video: {e}")
         return False
     
     print(f"    > Created 3 variants for {base_name}")
     return True
 
 
+def normalize_name(filename):
+    """Remove underscores, convert to lowercase for matching"""
+    base = os.path.splitext(filename)[0]
+    normalized = base.replace('_', '').lower()
+    return normalized
+
+def variant_outputs(original_video, translated_dir):
+    """Output paths of the three variants for an original video"""
+    base_name = os.path.splitext(os.path.basename(original_video))[0]
+    return [os.path.join(translated_dir, f"{base_name}_{variant}.mp4")
+            for variant in VARIANT_NAMES]
+
 def match_original_to_azure(original_dir, azure_dir):
     """
     Match original videos with their Azure-translated counterparts
     Normalizes filenames by removing underscores and converting to lowercase
     Returns list of (original_path, azure_path) tuples
     """
-    
-    def normalize_name(filename):
-        """Remove underscores, convert to lowercase for matching"""
-        base = os.path.splitext(filename)[0]
-        normalized = base.replace('_', '').lower()
-        return normalized
-    
+
     # get all videos from original directory
     original_videos = {}
     for root, dirs, files in os.walk(original_dir):
@@ -271,10 +460,19 @@ def match_original_to_azure(original_dir, azure_dir):
     
     return pairs, unmatched_azure
 
-def process_all_azure_videos(original_dir='original', azure_dir='azure', translated_dir='translated'):
+def process_all_azure_videos(original_dir='original', azure_dir='azure', translated_dir='translated',
+                             delay_seconds=DEFAULT_TARGET_LAG, align=False, jobs=None,
+                             normalize=False, target_lufs=DEFAULT_TARGET_LUFS, segments=1,
+                             report=False, verify=False, tracks=False):
     """
     Process all Azure-translated videos
     Creates muffled and balanced variants
+    With align=True each pair's delay is estimated from the audio so the dub
+    trails the original by delay_seconds; otherwise delay_seconds is applied as-is
+    With normalize=True both tracks are gain-corrected to target_lufs before mixing
+    With report=True per-stage timings and encode stats go to a run report in translated_dir
+    With verify=True every output is checked afterwards (see verify_outputs.py)
+    With tracks=True each pair becomes one video-only MP4 plus three audio tracks
     """
     os.makedirs(azure_dir, exist_ok=True)
     os.makedirs(translated_dir, exist_ok=True)
@@ -295,14 +493,36 @@ def process_all_azure_videos(original_dir='original', azure_dir='azure', transla
         return
     
     print(f"\n  Matched pairs: {len(pairs)}")
-    print(f"  Variants per video: 3 (muffled, balanced, full)")
-    print(f"  Total output videos: {len(pairs) * 3}")
+    if tracks:
+        print(f"  Outputs per video: 1 video track + {len(VARIANT_NAMES)} audio tracks ({', '.join(VARIANT_NAMES)})")
+        print(f"  Total output files: {len(pairs) * (1 + len(VARIANT_NAMES))}")
+    else:
+        print(f"  Variants per video: {len(VARIANT_NAMES)} ({', '.join(VARIANT_NAMES)})")
+        print(f"  Total output videos: {len(pairs) * len(VARIANT_NAMES)}")
     
     if unmatched:
         print(f"\n  Unmatched Azure videos ({len(unmatched)}):")
         for name in unmatched:
             print(f"    - {name}")
     
+    if report:
+        profiler.start_run({
+            'pairs': len(pairs), 'delay_seconds': delay_seconds, 'align': align,
+            'normalize': normalize, 'target_lufs': target_lufs, 'segments': segments, 'jobs': jobs,
+        })
+    
+    delays = {}
+    gains = {}
+    if align or normalize:
+        manifest = load_manifest(translated_dir)
+        if align:
+            with profiler.stage('align'):
+                delays = align_pairs(pairs, manifest, target_lag=delay_seconds, jobs=jobs)
+        if normalize:
+            with profiler.stage('loudness'):
+                gains = pair_gains(pairs, manifest, target_lufs=target_lufs, jobs=jobs)
+        save_manifest(translated_dir, manifest)
+    
     print(f"\n  Variants to be created:")
     
     # process each pair
@@ -311,7 +531,12 @@ def process_all_azure_videos(original_dir='original', azure_dir='azure', transla
     
     for original_video, azure_video in tqdm(pairs, desc="Overall Progress", unit="pair"):
         try:
-            if process_video_pair(original_video, azure_video, translated_dir):
+            pair_delay = delays.get((original_video, azure_video), delay_seconds)
+            pair_gain = gains.get((original_video, azure_video), (1.0, 1.0))
+            with profiler.clip(os.path.basename(original_video)):
+                ok = process_video_pair(original_video, azure_video, translated_dir, pair_delay, pair_gain,
+                                        segments, tracks)
+            if ok:
                 successfully_processed += 1
         except Exception as e:
             print(f"\n  ERROR processing {os.path.basename(original_video)}: {e}")
@@ -324,13 +549,27 @@ def process_all_azure_videos(original_dir='original', azure_dir='azure', transla
     print(f"PROCESSING COMPLETE")
     print(f"{'='*60}")
     print(f"  Successfully processed: {successfully_processed}/{len(pairs)} video pairs")
-    print(f"  Total variants created: {successfully_processed * 3} videos")
+    if tracks:
+        print(f"  Total tracks created: {successfully_processed} video + "
+              f"{successfully_processed * len(VARIANT_NAMES)} audio")
+    else:
+        print(f"  Total variants created: {successfully_processed * len(VARIANT_NAMES)} videos")
     print(f"  Output directory: {translated_dir}/")
     
     if failed_videos:
         print(f"\n  Failed videos ({len(failed_videos)}):")
         for video in failed_videos:
             print(f"    - {video}")
+    
+    if verify:
+        from verify_outputs import verify_outputs
+        manifest = load_manifest(translated_dir)
+        with profiler.stage('verify'):
+            verify_outputs(pairs, translated_dir, delays, manifest, jobs, delay_seconds, tracks=tracks)
+        save_manifest(translated_dir, manifest)
+    
+    if report:
+        profiler.write_report(profiler.finish_run(), translated_dir)
 
 if __name__ == '__main__':
     parser = argparse.ArgumentParser(
@@ -344,7 +583,35 @@ if __name__ == '__main__':
                        help='Directory containing Azure-translated videos (default: azure)')
     parser.add_argument('--translated-dir', default='translated',
                        help='Output directory for all variants (default: translated)')
+    parser.add_argument('--delay', type=float, default=DEFAULT_TARGET_LAG,
+                       help=f'Seconds the English audio trails the Spanish (default: {DEFAULT_TARGET_LAG})')
+    parser.add_argument('--align', action='store_true',
+                       help='Estimate each pair\'s offset by cross-correlation (cached in the build manifest)')
+    parser.add_argument('--jobs', type=int, default=None,
+                       help='Parallel workers for analysis stages (default: CPU count)')
+    parser.add_argument('--normalize', action='store_true',
+                       help='Gain-correct both tracks to --target-lufs (measurements cached in the build manifest)')
+    parser.add_argument('--target-lufs', type=float, default=DEFAULT_TARGET_LUFS,
+                       help=f'Integrated loudness target for --normalize (default: {DEFAULT_TARGET_LUFS})')
+    parser.add_argument('--segments', type=int, default=1,
+                       help='Encode each mix as up to N keyframe-aligned chunks in parallel (default: 1)')
+    parser.add_argument('--fragmented', action='store_true',
+                       help='Write fragmented MP4 instead of faststart MP4')
+    parser.add_argument('--tracks', action='store_true',
+                       help='Write one video-only MP4 and an audio track per variant instead of three MP4s')
+    parser.add_argument('--verify', action='store_true',
+                       help='Check every output afterwards (streams, duration, faststart, audio onset)')
+    parser.add_argument('--report', action='store_true',
+                       help='Profile each stage and write run_report_<time>.json/.csv to the output directory')
     
     args = parser.parse_args()
     
-    process_all_azure_videos(args.original_dir, args.azure_dir, args.translated_dir)
\ No newline at end of file
+    if args.fragmented:
+        # read at encode time, including by worker processes started later
+        os.environ['FRAGMENTED_MP4'] = '1'
+    
+    process_all_azure_videos(args.original_dir, args.azure_dir, args.translated_dir,
+                             delay_seconds=args.delay, align=args.align, jobs=args.jobs,
+                             normalize=args.normalize, target_lufs=args.target_lufs,
+                             segments=args.segments, report=args.report, verify=args.verify,
+                             tracks=args.tracks)
\ No newline at end of file
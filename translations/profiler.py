@@ -0,0 +1,197 @@
+"""
+Pipeline stage profiler
+Records wall time per stage (probe, extract, mix, encode, write) for each clip
+and, for every ffmpeg encode, the fps / speed reported through -progress plus
+the process's own CPU time (wait4 rusage). Writes a JSON and CSV run report
+Everything is a no-op unless a run has been started with start_run()
+"""
+
+import csv
+import json
+import os
+import subprocess
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+#----------------------------------------------------------------------#
+
+STAGES = ['probe', 'extract', 'mix', 'encode', 'write']
+
+CSV_COLUMNS = [
+    'clip', 'stage', 'label', 'seconds', 'cpu_user_seconds', 'cpu_system_seconds',
+    'frames', 'fps', 'speed', 'out_seconds', 'returncode',
+]
+
+_active = None
+
+#----------------------------------------------------------------------#
+
+class RunProfiler:
+    """Events collected over one pipeline run"""
+
+    def __init__(self, settings=None):
+        self.settings = settings or {}
+        self.started_at = datetime.now()
+        self.start = time.perf_counter()
+        self.events = []
+        self.clip_name = None
+        self.lock = threading.Lock()
+
+    def add(self, stage, seconds, **extra):
+        with self.lock:
+            self.events.append({'clip': self.clip_name, 'stage': stage, 'seconds': round(seconds, 3), **extra})
+
+    @contextmanager
+    def clip(self, name):
+        """Attribute stages run inside the block to clip `name`"""
+        previous, self.clip_name = self.clip_name, name
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add('total', time.perf_counter() - start)
+            self.clip_name = previous
+
+    def summary(self, top=10):
+        stage_totals = {}
+        clip_totals = {}
+        for event in self.events:
+            if event['stage'] == 'total':
+                clip_totals[event['clip']] = event['seconds']
+            else:
+                stage_totals[event['stage']] = round(stage_totals.get(event['stage'], 0.0) + event['seconds'], 3)
+
+        encodes = [e for e in self.events if 'returncode' in e]
+        return {
+            'stage_totals': stage_totals,
+            'slowest_clips': sorted(clip_totals.items(), key=lambda item: -item[1])[:top],
+            'slowest_encodes': sorted(encodes, key=lambda e: -e['seconds'])[:top],
+        }
+
+#----------------------------------------------------------------------#
+
+def start_run(settings=None):
+    global _active
+    _active = RunProfiler(settings)
+    return _active
+
+def finish_run():
+    global _active
+    profiler, _active = _active, None
+    return profiler
+
+@contextmanager
+def clip(name):
+    if _active is None:
+        yield
+    else:
+        with _active.clip(name):
+            yield
+
+@contextmanager
+def stage(name, label=None):
+    """Time a block as stage `name` of the current clip"""
+    if _active is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _active.add(name, time.perf_counter() - start, label=label)
+
+def _parse_progress(progress):
+    """Final values from ffmpeg -progress key=value output"""
+    def number(key):
+        try:
+            return float(progress[key])
+        except (KeyError, ValueError):
+            return None
+
+    out_us = number('out_time_us') or number('out_time_ms')
+    speed = progress.get('speed', '').rstrip('x').strip()
+    return {
+        'frames': int(number('frame')) if number('frame') is not None else None,
+        'fps': number('fps'),
+        'speed': float(speed) if speed not in ('', 'N/A') else None,
+        'out_seconds': round(out_us / 1e6, 3) if out_us is not None else None,
+    }
+
+def run_ffmpeg(cmd, stage_name='encode', label=None):
+    """
+    subprocess.run(cmd, capture_output=True, text=True) for an ffmpeg command
+    While profiling, adds -progress and records encode statistics and CPU time
+    """
+    if _active is None:
+        return subprocess.run(cmd, capture_output=True, text=True)
+
+    cmd = cmd[:1] + ['-progress', 'pipe:1', '-nostats'] + cmd[1:]
+    start = time.perf_counter()
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+
+    # drain stderr on a thread so neither pipe can fill and block ffmpeg
+    stderr = []
+    reader = threading.Thread(target=lambda: stderr.append(proc.stderr.read()), daemon=True)
+    reader.start()
+
+    progress = {}
+    for line in proc.stdout:
+        key, _, value = line.strip().partition('=')
+        if key:
+            progress[key] = value
+    reader.join()
+
+    _, status, usage = os.wait4(proc.pid, 0)
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    proc.stdout.close()
+    proc.stderr.close()
+
+    _active.add(stage_name, time.perf_counter() - start, label=label,
+                cpu_user_seconds=round(usage.ru_utime, 3), cpu_system_seconds=round(usage.ru_stime, 3),
+                returncode=proc.returncode, **_parse_progress(progress))
+
+    return subprocess.CompletedProcess(cmd, proc.returncode, '', ''.join(stderr))
+
+#----------------------------------------------------------------------#
+
+def write_report(profiler, output_dir, top=10):
+    """Write run_report_<timestamp>.json/.csv into output_dir and print a summary"""
+    os.makedirs(output_dir, exist_ok=True)
+    stamp = profiler.started_at.strftime('%Y%m%d_%H%M%S')
+    json_path = os.path.join(output_dir, f'run_report_{stamp}.json')
+    csv_path = os.path.join(output_dir, f'run_report_{stamp}.csv')
+    summary = profiler.summary(top)
+
+    with open(json_path, 'w') as f:
+        json.dump({
+            'started_at': profiler.started_at.isoformat(),
+            'total_seconds': round(time.perf_counter() - profiler.start, 3),
+            'settings': profiler.settings,
+            'summary': summary,
+            'events': profiler.events,
+        }, f, indent=2)
+
+    with open(csv_path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_COLUMNS, extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(profiler.events)
+
+    print(f"\n  Time by stage:")
+    for name in STAGES + sorted(set(summary['stage_totals']) - set(STAGES)):
+        if name in summary['stage_totals']:
+            print(f"    {name:<10} {summary['stage_totals'][name]:>10.1f}s")
+
+    print(f"\n  Slowest clips:")
+    for name, seconds in summary['slowest_clips']:
+        print(f"    {seconds:>8.1f}s  {name}")
+
+    print(f"\n  Slowest encodes:")
+    for event in summary['slowest_encodes']:
+        print(f"    {event['seconds']:>8.1f}s  {event['clip']} / {event['label']} "
+              f"({event['fps'] or 0:.1f} fps, {event['speed'] or 0:.2f}x)")
+
+    print(f"\n  Run report: {json_path}")
+    print(f"              {csv_path}")
+    return json_path, csv_path
@@ -0,0 +1,134 @@
+"""
+Segment-parallel encoding
+Splits a source video at keyframes, encodes each segment with libx264 as its own
+ffmpeg process and joins the results with the concat demuxer (stream copy).
+Audio is rendered once over the full timeline alongside the video segments and
+muxed in at the end, so segment boundaries never produce audio seams
+"""
+
+import os
+import shutil
+import subprocess
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+import profiler
+from web_delivery import keyframe_args, mux_args
+
+#----------------------------------------------------------------------#
+
+# segments shorter than this are not worth a separate encoder process
+MIN_SEGMENT_SECONDS = 10.0
+
+VIDEO_ENCODE_ARGS = ['-c:v', 'libx264', '-crf', '23', '-preset', os.getenv('X264_PRESET', 'medium')]
+AUDIO_ENCODE_ARGS = ['-c:a', 'aac', '-b:a', '128k']
+
+#----------------------------------------------------------------------#
+
+def get_keyframe_times(video_path):
+    """Presentation times of the video stream's keyframes, read from packet flags (no decoding)"""
+    with profiler.stage('probe'):
+        result = subprocess.run([
+            'ffprobe', '-v', 'error',
+            '-select_streams', 'v:0',
+            '-show_entries', 'packet=pts_time,flags',
+            '-of', 'csv=p=0',
+            video_path
+        ], capture_output=True, text=True, check=True)
+
+    times = []
+    for line in result.stdout.splitlines():
+        pts_time, _, flags = line.partition(',')
+        if 'K' in flags and pts_time not in ('', 'N/A'):
+            times.append(float(pts_time))
+    return sorted(times)
+
+def plan_segments(keyframes, duration, segments):
+    """
+    Up to `segments` (start, end) ranges covering [0, duration), each starting on
+    a keyframe close to an even split and no shorter than MIN_SEGMENT_SECONDS
+    """
+    segments = max(1, min(segments, int(duration // MIN_SEGMENT_SECONDS)))
+    cuts = [0.0]
+    for i in range(1, segments):
+        target = duration * i / segments
+        candidates = [t for t in keyframes if t - cuts[-1] >= MIN_SEGMENT_SECONDS
+                      and duration - t >= MIN_SEGMENT_SECONDS]
+        if not candidates:
+            break
+        cut = min(candidates, key=lambda t: abs(t - target))
+        if cut > cuts[-1]:
+            cuts.append(cut)
+
+    return [(start, end) for start, end in zip(cuts, cuts[1:] + [duration])]
+
+def _run(cmd, what, stage, label):
+    result = profiler.run_ffmpeg(cmd, stage, label)
+    if result.returncode != 0:
+        raise Exception(f"{what} failed: {result.stderr[-2000:]}")
+
+def _encode_segment(video_path, start, end, output_path, extension, threads, last):
+    """
+    Encode [start, end) of the video stream
+    The last segment runs to the end of the input and carries any still-frame extension
+    """
+    cmd = ['ffmpeg', '-y', '-loglevel', 'error', '-ss', f'{start:.6f}', '-i', video_path, '-an']
+    if not last:
+        cmd += ['-t', f'{end - start:.6f}']
+    elif extension > 0:
+        cmd += ['-vf', f'tpad=stop_mode=clone:stop_duration={extension}']
+    cmd += VIDEO_ENCODE_ARGS + keyframe_args() + ['-threads', str(threads), output_path]
+    _run(cmd, f"Segment encode {start:.1f}-{end:.1f}s", 'encode', os.path.basename(output_path))
+
+def _encode_audio(audio_inputs, audio_filter, target_duration, output_path):
+    cmd = ['ffmpeg', '-y', '-loglevel', 'error']
+    for path in audio_inputs:
+        cmd += ['-i', path]
+    cmd += ['-filter_complex', audio_filter, '-map', '[aout]'] + AUDIO_ENCODE_ARGS
+    cmd += ['-t', str(target_duration), output_path]
+    _run(cmd, "Audio mix", 'mix', 'audio')
+
+#----------------------------------------------------------------------#
+
+def encode_segmented(video_path, video_duration, audio_inputs, audio_filter, output_path,
+                     target_duration, extension=0.0, segments=4):
+    """
+    Encode video_path's picture in parallel segments and mux it with one audio render
+    audio_inputs/audio_filter describe the audio job: ffmpeg inputs in order and a
+    filter_complex whose output pad is [aout]
+    Returns the number of video segments used
+    """
+    plan = plan_segments(get_keyframe_times(video_path), video_duration, segments)
+    threads = max(1, (os.cpu_count() or 1) // len(plan))
+
+    work_dir = tempfile.mkdtemp(prefix='segmented_encode_')
+    try:
+        segment_paths = [os.path.join(work_dir, f'segment_{i:03d}.mp4') for i in range(len(plan))]
+        audio_path = os.path.join(work_dir, 'audio.m4a')
+
+        with ThreadPoolExecutor(max_workers=len(plan) + 1) as pool:
+            futures = [pool.submit(_encode_audio, audio_inputs, audio_filter, target_duration, audio_path)]
+            for i, (start, end) in enumerate(plan):
+                futures.append(pool.submit(_encode_segment, video_path, start, end, segment_paths[i],
+                                           extension, threads, i == len(plan) - 1))
+            for future in futures:
+                future.result()
+
+        list_path = os.path.join(work_dir, 'segments.txt')
+        with open(list_path, 'w') as f:
+            for path in segment_paths:
+                f.write(f"file '{path}'\n")
+
+        _run([
+            'ffmpeg', '-y', '-loglevel', 'error',
+            '-f', 'concat', '-safe', '0', '-i', list_path,
+            '-i', audio_path,
+            '-map', '0:v', '-map', '1:a',
+            '-c', 'copy',
+            *mux_args(),
+            '-t', str(target_duration),
+            output_path
+        ], "Segment concat", 'write', os.path.basename(output_path))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    return len(plan)
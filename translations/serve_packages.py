@@ -0,0 +1,119 @@
+"""
+Local HTTP server for packaged HLS/DASH output
+Serves a directory with streaming MIME types, byte-range support and CORS so
+players (hls.js, dash.js, Safari) can be pointed at it in tests or from the
+dev frontend without uploading anything to the CDN
+"""
+
+import argparse
+import os
+import re
+import threading
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+#----------------------------------------------------------------------#
+
+STREAMING_TYPES = {
+    '.m3u8': 'application/vnd.apple.mpegurl',
+    '.mpd': 'application/dash+xml',
+    '.m4s': 'video/iso.segment',
+    '.mp4': 'video/mp4',
+    '.m4a': 'audio/mp4',
+}
+
+RANGE_PATTERN = re.compile(r'bytes=(\d*)-(\d*)$')
+
+#----------------------------------------------------------------------#
+
+class StreamingRequestHandler(SimpleHTTPRequestHandler):
+    """Static files with streaming MIME types, CORS and single byte ranges"""
+
+    extensions_map = {**SimpleHTTPRequestHandler.extensions_map, **STREAMING_TYPES}
+
+    def end_headers(self):
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Access-Control-Expose-Headers', 'Content-Length, Content-Range')
+        self.send_header('Accept-Ranges', 'bytes')
+        super().end_headers()
+
+    def do_OPTIONS(self):
+        self.send_response(204)
+        self.send_header('Access-Control-Allow-Headers', 'Range')
+        self.end_headers()
+
+    def send_head(self):
+        match = RANGE_PATTERN.match(self.headers.get('Range', ''))
+        path = self.translate_path(self.path)
+        if not match or not os.path.isfile(path):
+            return super().send_head()
+
+        size = os.path.getsize(path)
+        start, end = match.groups()
+        if start:
+            start, end = int(start), min(int(end), size - 1) if end else size - 1
+        else:
+            start, end = max(size - int(end or 0), 0), size - 1
+        if start > end:
+            self.send_error(416, 'Requested Range Not Satisfiable')
+            return None
+
+        f = open(path, 'rb')
+        f.seek(start)
+        self.send_response(206)
+        self.send_header('Content-Type', self.guess_type(path))
+        self.send_header('Content-Range', f'bytes {start}-{end}/{size}')
+        self.send_header('Content-Length', str(end - start + 1))
+        self.end_headers()
+        self.range_remaining = end - start + 1
+        return f
+
+    def copyfile(self, source, outputfile):
+        remaining = getattr(self, 'range_remaining', None)
+        if remaining is None:
+            return super().copyfile(source, outputfile)
+        while remaining > 0:
+            chunk = source.read(min(64 * 1024, remaining))
+            if not chunk:
+                break
+            outputfile.write(chunk)
+            remaining -= len(chunk)
+        self.range_remaining = None
+
+    def log_message(self, format, *args):
+        if not getattr(self.server, 'quiet', False):
+            super().log_message(format, *args)
+
+def start_server(directory, host='127.0.0.1', port=0, quiet=True):
+    """
+    Serve directory on a background thread (port=0 picks a free port)
+    Returns (server, base_url); call server.shutdown() when done
+    """
+    handler = partial(StreamingRequestHandler, directory=directory)
+    server = ThreadingHTTPServer((host, port), handler)
+    server.quiet = quiet
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+#----------------------------------------------------------------------#
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Serve packaged HLS/DASH output locally',
+    )
+    parser.add_argument('--directory', default='translated',
+                       help='Directory to serve; packaged/ lives inside it (default: translated)')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8088)
+    args = parser.parse_args()
+
+    handler = partial(StreamingRequestHandler, directory=args.directory)
+    server = ThreadingHTTPServer((args.host, args.port), handler)
+    print(f"Serving {args.directory}/ at http://{args.host}:{args.port}/ (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -0,0 +1,251 @@
+"""
+Output verification for translated variants
+Checks every {base}_{variant}.mp4 in parallel: readable container, video and
+audio streams, duration close to the planned target, and that the dub does not
+start before the applied delay: by audio onset for the full variant, and by
+cross-correlating against the Azure dub for the muffled and balanced mixes
+(where the original audio starts at 0). A moov atom after mdat (no progressive
+playback) is reported as a warning, since outputs from before faststart was
+added lack it. Results are cached in the build manifest by the output's
+content hash, so unchanged files are not probed again. In tracks mode the
+video-only MP4 gets the picture checks and each .m4a the audio checks
+"""
+
+import argparse
+import json
+import os
+import struct
+import subprocess
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+from tqdm import tqdm
+from alignment import align_pairs, decode_mono, energy_envelope, estimate_offset, DEFAULT_TARGET_LAG, \
+    ALIGN_SAMPLE_RATE, MIN_CONFIDENCE
+from build_manifest import load_manifest, save_manifest, content_hash
+from process_azure_videos import match_original_to_azure, variant_outputs, track_outputs, VARIANT_NAMES
+
+#----------------------------------------------------------------------#
+
+# bump when the checks change so cached results are recomputed
+VERIFY_VERSION = 3
+
+DURATION_TOLERANCE = 1.0       # seconds either side of the planned duration
+ONSET_TOLERANCE = 0.25         # full variant audio may start this early
+ONSET_FRAME_SECONDS = 0.05
+SILENCE_DBFS = -50.0           # RMS below this counts as silence
+DUB_ANALYSIS_SECONDS = 60      # opening compared when locating the dub in a mix
+
+#----------------------------------------------------------------------#
+
+def probe(path):
+    """ffprobe format and streams as a dict"""
+    result = subprocess.run([
+        'ffprobe', '-v', 'error',
+        '-show_entries', 'format=duration:stream=codec_type,codec_name,duration',
+        '-of', 'json',
+        path
+    ], capture_output=True, text=True)
+
+    if result.returncode != 0:
+        raise Exception(f"ffprobe could not read file: {result.stderr.strip()}")
+    return json.loads(result.stdout)
+
+def top_level_boxes(path, limit=64):
+    """Types of the file's top-level MP4 boxes, in order"""
+    boxes = []
+    file_size = os.path.getsize(path)
+    with open(path, 'rb') as f:
+        offset = 0
+        while offset < file_size and len(boxes) < limit:
+            f.seek(offset)
+            header = f.read(8)
+            if len(header) < 8:
+                break
+            size, box_type = struct.unpack('>I4s', header)
+            if size == 1:
+                size = struct.unpack('>Q', f.read(8))[0]
+            elif size == 0:
+                size = file_size - offset
+            if size < 8:
+                break
+            boxes.append(box_type.decode('latin-1'))
+            offset += size
+    return boxes
+
+def audio_onset(path, max_seconds):
+    """Seconds until the audio first rises above SILENCE_DBFS (None if silent throughout)"""
+    samples = decode_mono(path, max_seconds=max_seconds)
+    frame = int(ALIGN_SAMPLE_RATE * ONSET_FRAME_SECONDS)
+    frames = len(samples) // frame
+    if frames == 0:
+        return None
+
+    rms = np.sqrt(np.mean(samples[:frames * frame].reshape(frames, frame) ** 2, axis=1))
+    loud = np.nonzero(20 * np.log10(np.maximum(rms, 1e-10)) > SILENCE_DBFS)[0]
+    return round(float(loud[0] * ONSET_FRAME_SECONDS), 3) if len(loud) else None
+
+def dub_offset(path, azure_video, delay_seconds):
+    """
+    Where the Azure dub starts inside a mixed variant, by envelope cross-correlation
+    Returns (seconds, confidence)
+    """
+    seconds = delay_seconds + DUB_ANALYSIS_SECONDS
+    reference = energy_envelope(decode_mono(azure_video, max_seconds=DUB_ANALYSIS_SECONDS))
+    mixed = energy_envelope(decode_mono(path, max_seconds=seconds))
+    offset, confidence = estimate_offset(reference, mixed)
+    return round(offset, 3), round(confidence, 4)
+
+def planned_duration(original_video, azure_video, delay_seconds):
+    """Duration process_video_pair aims for: the original or the delayed dub, whichever is longer"""
+    original = float(probe(original_video)['format']['duration'])
+    azure = probe(azure_video)
+    audio = next((s for s in azure['streams'] if s['codec_type'] == 'audio'), {})
+    audio_duration = float(audio.get('duration') or azure['format']['duration'])
+    return max(original, delay_seconds + audio_duration)
+
+#----------------------------------------------------------------------#
+
+def pair_outputs(original_video, translated_dir, tracks=False):
+    """[(variant name, path), ...] for a pair; tracks mode adds ('video', video-only MP4)"""
+    if tracks:
+        outputs = track_outputs(original_video, translated_dir)
+        return [('video', outputs['video'])] + [(name, outputs[name]) for name in VARIANT_NAMES]
+    return list(zip(VARIANT_NAMES, variant_outputs(original_video, translated_dir)))
+
+def verify_output(path, variant_name, original_video, azure_video, delay_seconds):
+    """Process-pool worker: run every check on one output; returns a result dict"""
+    problems = []
+    warnings = []
+    result = {'file': os.path.basename(path), 'variant': variant_name}
+
+    try:
+        info = probe(path)
+    except Exception as e:
+        return {**result, 'ok': False, 'problems': [str(e)]}
+
+    # tracks mode splits the picture (variant 'video') from the audio (.m4a)
+    needs_video = not path.lower().endswith('.m4a')
+    needs_audio = variant_name != 'video'
+
+    codec_types = [s['codec_type'] for s in info.get('streams', [])]
+    if needs_video and 'video' not in codec_types:
+        problems.append('no video stream')
+    if needs_audio and 'audio' not in codec_types:
+        problems.append('no audio stream')
+
+    duration = float(info.get('format', {}).get('duration') or 0)
+    expected = planned_duration(original_video, azure_video, delay_seconds)
+    result['duration'] = round(duration, 3)
+    result['planned_duration'] = round(expected, 3)
+    if abs(duration - expected) > DURATION_TOLERANCE:
+        problems.append(f'duration {duration:.2f}s, planned {expected:.2f}s')
+
+    boxes = top_level_boxes(path)
+    result['faststart'] = 'moov' in boxes and ('mdat' not in boxes or boxes.index('moov') < boxes.index('mdat'))
+    if not result['faststart']:
+        warnings.append('moov atom after mdat (no progressive playback)')
+
+    if needs_audio and 'audio' in codec_types:
+        onset = audio_onset(path, delay_seconds + 5)
+        result['audio_onset'] = onset
+        if onset is None:
+            problems.append('audio silent at the start of the clip')
+        elif variant_name == 'full' and onset < delay_seconds - ONSET_TOLERANCE:
+            problems.append(f'audio starts at {onset:.2f}s, before the {delay_seconds:.2f}s delay')
+
+        if variant_name != 'full':
+            # the original audio starts at 0 in the mixes, so find the dub itself
+            offset, confidence = dub_offset(path, azure_video, delay_seconds)
+            result['dub_offset'] = offset
+            result['dub_offset_confidence'] = confidence
+            if confidence < MIN_CONFIDENCE:
+                warnings.append(f'dub not located in the mix (confidence {confidence:.2f}), delay not checked')
+            elif offset < delay_seconds - ONSET_TOLERANCE:
+                problems.append(f'dub starts at {offset:.2f}s, before the {delay_seconds:.2f}s delay')
+
+    return {**result, 'ok': not problems, 'problems': problems, 'warnings': warnings}
+
+def verify_outputs(pairs, translated_dir, delays=None, manifest=None, jobs=None,
+                   default_delay=DEFAULT_TARGET_LAG, tracks=False):
+    """
+    Verify every variant of every pair (the video and audio tracks with tracks=True);
+    returns the list of result dicts
+    Passing results are cached in manifest['verification'] by content hash
+    """
+    delays = delays or {}
+    own_manifest = manifest is None
+    if own_manifest:
+        manifest = load_manifest(translated_dir)
+    cache = manifest.setdefault('verification', {})
+
+    results = []
+    pending = {}
+    for pair in pairs:
+        delay = delays.get(pair, default_delay)
+        for variant_name, path in pair_outputs(pair[0], translated_dir, tracks):
+            if not os.path.exists(path):
+                results.append({'file': os.path.basename(path), 'variant': variant_name,
+                                'ok': False, 'problems': ['missing']})
+                continue
+            key = f"{content_hash(path, manifest)[:16]}:{delay:.3f}:v{VERIFY_VERSION}"
+            if key in cache:
+                results.append(cache[key])
+            else:
+                pending[key] = (path, variant_name, pair[0], pair[1], delay)
+
+    print(f"\n  Verification: {len(results)} cached or missing, {len(pending)} to check")
+
+    if pending:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = {pool.submit(verify_output, *args): key for key, args in pending.items()}
+            for future in tqdm(as_completed(futures), total=len(futures), desc="Verifying", unit="file"):
+                key = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    result = {'file': os.path.basename(pending[key][0]), 'variant': pending[key][1],
+                              'ok': False, 'problems': [f'verification error: {e}']}
+                if result['ok']:
+                    cache[key] = result
+                results.append(result)
+
+    if own_manifest:
+        save_manifest(translated_dir, manifest)
+
+    failed = [r for r in results if not r['ok']]
+    print(f"  Verified {len(results) - len(failed)}/{len(results)} outputs")
+    for r in failed:
+        print(f"    ✗ {r['file']}: {'; '.join(r['problems'])}")
+    for r in results:
+        if r.get('warnings'):
+            print(f"    ! {r['file']}: {'; '.join(r['warnings'])}")
+    return results
+
+#----------------------------------------------------------------------#
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Verify translated variants (streams, duration, audio/dub onset; faststart as a warning)',
+    )
+    parser.add_argument('--original-dir', default='original')
+    parser.add_argument('--azure-dir', default='azure')
+    parser.add_argument('--translated-dir', default='translated')
+    parser.add_argument('--delay', type=float, default=DEFAULT_TARGET_LAG,
+                       help=f'Delay the variants were built with (default: {DEFAULT_TARGET_LAG})')
+    parser.add_argument('--align', action='store_true',
+                       help='Expect the per-pair delays from the alignment cache instead of --delay')
+    parser.add_argument('--tracks', action='store_true',
+                       help='Verify tracks-mode outputs (video-only MP4 + .m4a per variant)')
+    parser.add_argument('--jobs', type=int, default=None, help='Parallel workers (default: CPU count)')
+    args = parser.parse_args()
+
+    pairs, _ = match_original_to_azure(args.original_dir, args.azure_dir)
+    manifest = load_manifest(args.translated_dir)
+    delays = align_pairs(pairs, manifest, target_lag=args.delay, jobs=args.jobs) if args.align else {}
+
+    results = verify_outputs(pairs, args.translated_dir, delays, manifest, args.jobs, args.delay, args.tracks)
+    save_manifest(args.translated_dir, manifest)
+
+    if any(not r['ok'] for r in results):
+        sys.exit(1)
@@ -0,0 +1,269 @@
+"""
+Watch-folder mode for the Azure translation pipeline
+Watches original/ and azure/ (inotify when inotify_simple is installed, polling
+otherwise), waits until new or changed files stop growing, and runs only the
+affected pairs on a process pool. Progress is written to a JSON status file
+"""
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from alignment import align_pairs, DEFAULT_TARGET_LAG
+from build_manifest import load_manifest, save_manifest
+from loudness import pair_gains, DEFAULT_TARGET_LUFS
+from process_azure_videos import normalize_name, variant_outputs, process_video_pair
+
+try:
+    from inotify_simple import INotify, flags
+except ImportError:
+    INotify = None
+
+#----------------------------------------------------------------------#
+
+VIDEO_EXTENSIONS = ('.mp4', '.avi', '.mov', '.mkv')
+
+DEBOUNCE_SECONDS = 10.0        # a file must be unchanged this long before it is used
+POLL_INTERVAL = 5.0            # rescan period without inotify (and inotify read timeout)
+STATUS_NAME = 'watch_status.json'
+RECENT_JOBS = 50               # finished jobs kept in the status file
+
+#----------------------------------------------------------------------#
+
+def scan_videos(directory, recursive=False):
+    """{path: (size, mtime_ns)} for every video in directory"""
+    found = {}
+    if not os.path.isdir(directory):
+        return found
+
+    walker = os.walk(directory) if recursive else [(directory, None, os.listdir(directory))]
+    for root, _, files in walker:
+        for file in files:
+            if file.lower().endswith(VIDEO_EXTENSIONS) and not file.startswith('.'):
+                path = os.path.join(root, file)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                found[path] = (stat.st_size, stat.st_mtime_ns)
+    return found
+
+def outputs_up_to_date(pair, translated_dir):
+    """True when every variant exists and is newer than both inputs"""
+    newest_input = max(os.path.getmtime(path) for path in pair)
+    for output in variant_outputs(pair[0], translated_dir):
+        if not os.path.exists(output) or os.path.getmtime(output) < newest_input:
+            return False
+    return True
+
+def run_pair_job(original_video, azure_video, translated_dir, delay_seconds, gains, segments):
+    """Process-pool worker: build one pair's variants and report timing"""
+    started = time.time()
+    try:
+        ok = process_video_pair(original_video, azure_video, translated_dir, delay_seconds, gains, segments)
+        error = None if ok else 'process_video_pair reported failure'
+    except Exception as e:
+        ok, error = False, str(e)
+    return {'ok': ok, 'error': error, 'started_at': started, 'finished_at': time.time()}
+
+#----------------------------------------------------------------------#
+
+class FolderWatcher:
+    """Debounced change detection over the original and azure directories"""
+
+    def __init__(self, original_dir, azure_dir, debounce=DEBOUNCE_SECONDS):
+        self.original_dir = original_dir
+        self.azure_dir = azure_dir
+        self.debounce = debounce
+        self.inotify = None
+        self.seen = {}          # path -> (stat, time the stat was first observed)
+
+        if INotify is not None:
+            self.inotify = INotify()
+            mask = flags.CREATE | flags.CLOSE_WRITE | flags.MOVED_TO | flags.MODIFY | flags.DELETE
+            for root, _, _ in os.walk(original_dir):
+                self.inotify.add_watch(root, mask)
+            self.inotify.add_watch(azure_dir, mask)
+
+    @property
+    def mode(self):
+        return 'inotify' if self.inotify else 'polling'
+
+    def wait(self, timeout=POLL_INTERVAL):
+        """Block until something changes on disk or timeout elapses"""
+        if self.inotify:
+            self.inotify.read(timeout=int(timeout * 1000))
+        else:
+            time.sleep(timeout)
+
+    def stable_files(self):
+        """
+        Rescan both directories; returns ({normalized name: path} for originals,
+        {normalized name: path} for azure) containing only files whose size and
+        mtime have been unchanged for the debounce period
+        """
+        now = time.time()
+        current = {**scan_videos(self.original_dir, recursive=True), **scan_videos(self.azure_dir)}
+
+        for path in list(self.seen):
+            if path not in current:
+                del self.seen[path]
+        for path, stat in current.items():
+            if path not in self.seen or self.seen[path][0] != stat:
+                self.seen[path] = (stat, now)
+
+        originals, azure = {}, {}
+        for path, (stat, since) in self.seen.items():
+            if now - since < self.debounce:
+                continue
+            if path.startswith(os.path.join(self.azure_dir, '')):
+                azure[normalize_name(os.path.basename(path))] = path
+            else:
+                originals.setdefault(normalize_name(os.path.basename(path)), path)
+        return originals, azure
+
+    def stat(self, path):
+        return self.seen[path][0]
+
+#----------------------------------------------------------------------#
+
+def watch(original_dir='original', azure_dir='azure', translated_dir='translated', jobs=None,
+          delay_seconds=DEFAULT_TARGET_LAG, align=False, normalize=False,
+          target_lufs=DEFAULT_TARGET_LUFS, segments=1, debounce=DEBOUNCE_SECONDS):
+    """Run until interrupted, rebuilding pairs whose inputs are new or changed"""
+    os.makedirs(original_dir, exist_ok=True)
+    os.makedirs(azure_dir, exist_ok=True)
+    os.makedirs(translated_dir, exist_ok=True)
+
+    watcher = FolderWatcher(original_dir, azure_dir, debounce)
+    status_path = os.path.join(translated_dir, STATUS_NAME)
+    status = {
+        'started_at': datetime.now().isoformat(),
+        'mode': watcher.mode,
+        'completed': 0,
+        'failed': 0,
+        'recent': [],
+    }
+
+    built = {}          # pair -> input stats the last job was submitted with
+    running = {}        # future -> (pair, stats, submitted_at)
+
+    print(f"\n{'='*60}")
+    print(f"WATCHING FOR AZURE TRANSLATIONS ({watcher.mode})")
+    print(f"{'='*60}")
+    print(f"  Original videos: {original_dir}/")
+    print(f"  Azure translations: {azure_dir}/")
+    print(f"  Output: {translated_dir}/")
+    print(f"  Status file: {status_path}")
+
+    def write_status():
+        status['updated_at'] = datetime.now().isoformat()
+        status['queue_depth'] = sum(1 for future in running if not future.running())
+        status['running'] = [os.path.basename(pair[0]) for future, (pair, _, _) in running.items()
+                             if future.running()]
+        temp_path = f"{status_path}.tmp"
+        with open(temp_path, 'w') as f:
+            json.dump(status, f, indent=2)
+        os.replace(temp_path, status_path)
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        try:
+            while True:
+                originals, azure = watcher.stable_files()
+                in_flight = {pair for pair, _, _ in running.values()}
+
+                changed = []
+                for name, azure_video in azure.items():
+                    original_video = originals.get(name)
+                    if original_video is None:
+                        continue
+                    pair = (original_video, azure_video)
+                    stats = (watcher.stat(original_video), watcher.stat(azure_video))
+                    if pair in in_flight or built.get(pair) == stats:
+                        continue
+                    if pair not in built and outputs_up_to_date(pair, translated_dir):
+                        built[pair] = stats
+                        continue
+                    changed.append((pair, stats))
+
+                if changed:
+                    pairs = [pair for pair, _ in changed]
+                    delays, gains = {}, {}
+                    if align or normalize:
+                        manifest = load_manifest(translated_dir)
+                        if align:
+                            delays = align_pairs(pairs, manifest, target_lag=delay_seconds, jobs=jobs)
+                        if normalize:
+                            gains = pair_gains(pairs, manifest, target_lufs=target_lufs, jobs=jobs)
+                        save_manifest(translated_dir, manifest)
+
+                    for pair, stats in changed:
+                        print(f"  + Queued {os.path.basename(pair[0])}")
+                        future = pool.submit(run_pair_job, *pair, translated_dir,
+                                             delays.get(pair, delay_seconds), gains.get(pair, (1.0, 1.0)),
+                                             segments)
+                        running[future] = (pair, stats, time.time())
+
+                for future in [future for future in running if future.done()]:
+                    pair, stats, submitted_at = running.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        result = {'ok': False, 'error': str(e), 'started_at': None, 'finished_at': time.time()}
+
+                    name = os.path.basename(pair[0])
+                    # failed pairs are retried only once an input changes again
+                    built[pair] = stats
+                    if result['ok']:
+                        status['completed'] += 1
+                        print(f"  ✓ {name}")
+                    else:
+                        status['failed'] += 1
+                        print(f"  ✗ {name}: {result['error']}")
+
+                    status['recent'].insert(0, {
+                        'video': name,
+                        'ok': result['ok'],
+                        'error': result['error'],
+                        'queued_seconds': round((result['started_at'] or submitted_at) - submitted_at, 2),
+                        'run_seconds': round(result['finished_at'] - (result['started_at'] or submitted_at), 2),
+                        'finished_at': datetime.fromtimestamp(result['finished_at']).isoformat(),
+                    })
+                    del status['recent'][RECENT_JOBS:]
+
+                write_status()
+                watcher.wait(1.0 if running else POLL_INTERVAL)
+        except KeyboardInterrupt:
+            print("\n  Stopping; waiting for running jobs to finish...")
+            pool.shutdown(wait=True, cancel_futures=True)
+
+#----------------------------------------------------------------------#
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Watch for new Azure translations and build their variants',
+    )
+    parser.add_argument('--original-dir', default='original',
+                       help='Directory containing original Spanish videos (default: original)')
+    parser.add_argument('--azure-dir', default='azure',
+                       help='Directory containing Azure-translated videos (default: azure)')
+    parser.add_argument('--translated-dir', default='translated',
+                       help='Output directory for all variants (default: translated)')
+    parser.add_argument('--jobs', type=int, default=None,
+                       help='Pairs built in parallel (default: CPU count)')
+    parser.add_argument('--debounce', type=float, default=DEBOUNCE_SECONDS,
+                       help=f'Seconds a file must stay unchanged before use (default: {DEBOUNCE_SECONDS})')
+    parser.add_argument('--delay', type=float, default=DEFAULT_TARGET_LAG,
+                       help=f'Seconds the English audio trails the Spanish (default: {DEFAULT_TARGET_LAG})')
+    parser.add_argument('--align', action='store_true', help='Estimate each pair\'s offset by cross-correlation')
+    parser.add_argument('--normalize', action='store_true', help='Gain-correct both tracks to --target-lufs')
+    parser.add_argument('--target-lufs', type=float, default=DEFAULT_TARGET_LUFS)
+    parser.add_argument('--segments', type=int, default=1,
+                       help='Encode each mix as up to N keyframe-aligned chunks (default: 1)')
+    args = parser.parse_args()
+
+    watch(args.original_dir, args.azure_dir, args.translated_dir, jobs=args.jobs,
+          delay_seconds=args.delay, align=args.align, normalize=args.normalize,
+          target_lufs=args.target_lufs, segments=args.segments, debounce=args.debounce)
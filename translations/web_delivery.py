@@ -0,0 +1,115 @@
+"""
+Web-delivery settings for encoded snippets
+Every encode gets a fixed keyframe interval (short seeks need small range reads)
+and faststart muxing, or fragmented MP4 when FRAGMENTED_MP4=1, so browsers can
+start playback from the first bytes. Also extracts poster frames, and can remux
+an existing output directory in place without re-encoding
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from tqdm import tqdm
+
+#----------------------------------------------------------------------#
+
+KEYFRAME_INTERVAL_SECONDS = 2
+POSTER_AT_SECONDS = 1.0
+POSTER_SUFFIX = '_poster.jpg'
+
+#----------------------------------------------------------------------#
+
+def fragmented_enabled():
+    return os.getenv('FRAGMENTED_MP4') == '1'
+
+def keyframe_args():
+    """Force a keyframe every KEYFRAME_INTERVAL_SECONDS whatever the source frame rate"""
+    return ['-force_key_frames', f'expr:gte(t,n_forced*{KEYFRAME_INTERVAL_SECONDS})']
+
+def mux_args(fragmented=None):
+    """MP4 muxer flags: moov up front, or fragments starting at each keyframe"""
+    if fragmented is None:
+        fragmented = fragmented_enabled()
+    if fragmented:
+        return ['-movflags', '+frag_keyframe+empty_moov+default_base_moof']
+    return ['-movflags', '+faststart']
+
+def poster_path_for(original_video, translated_dir):
+    base_name = os.path.splitext(os.path.basename(original_video))[0]
+    return os.path.join(translated_dir, f"{base_name}{POSTER_SUFFIX}")
+
+def extract_poster(video_path, poster_path, at_seconds=POSTER_AT_SECONDS):
+    """Write one JPEG frame from video_path (first frame if the clip is shorter than at_seconds)"""
+    for seek in (at_seconds, 0):
+        result = subprocess.run([
+            'ffmpeg', '-y', '-loglevel', 'error',
+            '-ss', str(seek), '-i', video_path,
+            '-frames:v', '1', '-q:v', '3',
+            poster_path
+        ], capture_output=True, text=True)
+        if result.returncode == 0 and os.path.exists(poster_path):
+            return poster_path
+    raise Exception(f"Poster extraction failed: {result.stderr}")
+
+#----------------------------------------------------------------------#
+
+def remux_for_web(path, fragmented=False):
+    """Rewrite an existing MP4 in place with web muxing (stream copy; keyframes are unchanged)"""
+    temp_path = f"{path}.web.mp4"
+    result = subprocess.run([
+        'ffmpeg', '-y', '-loglevel', 'error',
+        '-i', path,
+        '-map', '0', '-c', 'copy',
+    ] + mux_args(fragmented) + [temp_path], capture_output=True, text=True)
+
+    if result.returncode != 0:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise Exception(f"Remux failed: {result.stderr}")
+    os.replace(temp_path, path)
+
+def optimize_directory(translated_dir, fragmented=False, posters=True, jobs=None):
+    """Remux every variant in translated_dir and add missing posters; returns failures"""
+    videos = sorted(
+        os.path.join(translated_dir, f) for f in os.listdir(translated_dir)
+        if f.lower().endswith('.mp4') and not f.endswith('.web.mp4')
+    )
+
+    def optimize(path):
+        remux_for_web(path, fragmented)
+        if posters and path.endswith('_full.mp4'):
+            poster = path[:-len('_full.mp4')] + POSTER_SUFFIX
+            if not os.path.exists(poster):
+                extract_poster(path, poster)
+
+    failures = []
+    with ThreadPoolExecutor(max_workers=jobs or os.cpu_count()) as pool:
+        futures = {pool.submit(optimize, path): path for path in videos}
+        for future in tqdm(futures, desc="Optimizing", unit="file"):
+            try:
+                future.result()
+            except Exception as e:
+                failures.append((os.path.basename(futures[future]), str(e)))
+    return failures
+
+#----------------------------------------------------------------------#
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Remux existing variants for web delivery and generate poster frames',
+    )
+    parser.add_argument('--translated-dir', default='translated',
+                       help='Directory of encoded variants (default: translated)')
+    parser.add_argument('--fragmented', action='store_true', help='Write fragmented MP4 instead of faststart')
+    parser.add_argument('--no-posters', action='store_true', help='Skip poster frame generation')
+    parser.add_argument('--jobs', type=int, default=None, help='Parallel remuxes (default: CPU count)')
+    args = parser.parse_args()
+
+    failures = optimize_directory(args.translated_dir, args.fragmented, not args.no_posters, args.jobs)
+    for name, error in failures:
+        print(f"  ✗ {name}: {error}")
+    if failures:
+        sys.exit(1)
+    print(f"\n  Optimized {args.translated_dir}/ (keyframe spacing is only changed by re-encoding)")